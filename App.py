@@ -1,466 +1,85 @@
-import anthropic
-import json
+import csv
 import gradio as gr
-import re
+import json
 import os
-import time
-from dotenv import load_dotenv
-
-# Charger les variables d'environnement du fichier .env
-load_dotenv()
+import unicodedata
+from starlette.routing import Route
 
-# Récupérer la clé API
-api_key = os.getenv("ANTHROPIC_API_KEY")
-if not api_key:
-    raise ValueError("La clé API ANTHROPIC_API_KEY n'est pas définie dans le fichier .env")
+from api import metrics_endpoint
+from core import (
+    METRICS_ENABLED,
+    MAX_INFLIGHT_REQUESTS,
+    add_translation_pair,
+    lexicon_state,
+    lexicon_watcher,
+    multilingual_chat_with_loading,
+    process_response,
+    read_texts_from_file,
+    translate_french_to_soussou,
+    translate_soussou_to_french,
+    translate_texts_to_file,
+)
 
-# Initialiser le client Claude
-client = anthropic.Anthropic(api_key=api_key)
-
-# Charger le dataset soussou-français
-try:
-    with open('clean_big_data_soussou_francais.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    soussou_to_french = {item["soussou"]: item["francais"] for item in data}
-    french_to_soussou = {item["francais"]: item["soussou"] for item in data}
-    print(f"Dataset chargé avec succès: {len(data)} entrées")
-except Exception as e:
-    print(f"Erreur lors du chargement du dataset: {e}")
-    # Dataset minimal pour démonstration si le chargement échoue
-    soussou_to_french = {
-        "Tana": "Bonjour",
-        "I mɛri?": "Comment vas-tu?",
-        "Minden?": "Où?",
-        "Munfera?": "Pourquoi?",
-    }
-    french_to_soussou = {v: k for k, v in soussou_to_french.items()}
+# Taille maximale de la file Gradio
+QUEUE_MAX_SIZE = int(os.getenv("NENE_QUEUE_MAX_SIZE", "1000"))
 
-# Enrichir le dictionnaire avec des mots supplémentaires
-additional_words = {
-    "Merci": "Tantina",
-    "Au revoir": "I tanga",
-    "Oui": "Iyo",
-    "Non": "Ade",
-    "Bien": "Fan",
-    "Pays": "Bɔxi",
-    "Ville": "Taa belebele",
-    "Capital": "Xunyi",
-    "Président": "Mangɛ",
-    "Peuple": "Mixie",
-    "Langue": "Xui",
-    "Culture": "Namunɛ",
-    "Tradition": "Namu ki",
-    "Travail": "Wali",
-    "École": "Xaranyi",
-    "Étudiant": "Xarande",
-    "Professeur": "Xaranma",
-    "Livre": "Buki",
-    "Eau": "Ye",
-    "Nourriture": "Donse",
-    "Maison": "Banxi",
-}
+# Voyelles de base (après retrait des accents) pour ranger les caractères du clavier
+KEYBOARD_VOWELS = set("aeiouɛɔǝ")
 
-# Mettre à jour les dictionnaires
-french_to_soussou.update(additional_words)
-soussou_to_french.update({v: k for k, v in additional_words.items()})
-
-# Dictionnaire multilingue pour les questions-réponses prédéfinies
-qa_pairs = {
-    # Questions sur la Guinée en soussou
-    "Guinée mangɛ nde ra?": {
-        "french": "Le président actuel de la Guinée est le Général Mamadi Doumbouya, qui dirige le pays depuis le coup d'État de septembre 2021 en tant que président de la transition.",
-        "english": "The current president of Guinea is General Mamadi Doumbouya, who has been leading the country since the coup d'état in September 2021 as the transitional president.",
-        "soussou": "Guinée mangɛ na yi sàre findexi Général Mamadi Doumbouya nan na, naxan na yamare ti kabi septembre kike 2021 ɲɛ, a findexi mangɛya masarafe nan na."
-    },
-    "Guinée xunyi minden na?": {
-        "french": "La capitale de la Guinée est Conakry, située sur la côte atlantique du pays.",
-        "english": "The capital of Guinea is Conakry, located on the Atlantic coast of the country.",
-        "soussou": "Guinée xunyi findexi Conakry nan na, naxan na baa dɛ ra bɔxi sɛnbɛ ma."
-    },
-    "Guinée xaranyi xungbe minden na?": {
-        "french": "La plus grande université de Guinée est l'Université Gamal Abdel Nasser de Conakry (UGANC), fondée en 1962.",
-        "english": "The largest university in Guinea is the Gamal Abdel Nasser University of Conakry (UGANC), founded in 1962.",
-        "soussou": "Guinée xaranyi xungbe findexi Gamal Abdel Nasser Conakry (UGANC) nan na, naxan ti ɲɛ 1962 kui."
-    },
-    "Guinée xulun yeri na?": {
-        "french": "La monnaie de la Guinée est le Franc Guinéen (GNF).",
-        "english": "The currency of Guinea is the Guinean Franc (GNF).",
-        "soussou": "Guinée xulun findexi Franc Guinéen (GNF) nan na."
-    },
-    "Munse Guinée rasabatixi?": {
-        "french": "La Guinée a obtenu son indépendance de la France le 2 octobre 1958, sous la direction de Sékou Touré.",
-        "english": "Guinea gained independence from France on October 2, 1958, under the leadership of Sékou Touré.",
-        "soussou": "Guinée a xa yɛtɛ sɔtɔ Faransi bɛlɛxɛ 2 octobre 1958, Sékou Touré xa mangɛya bun ma."
-    },
-    "Guinée xa bɔxi xungbo di?": {
-        "french": "La superficie de la Guinée est de 245 857 km².",
-        "english": "The area of Guinea is 245,857 square kilometers.",
-        "soussou": "Guinée xa bɔxi xungbo findexi kilomɛtiri wuli kɛmɛ firin tongo naani nun suuli kɛmɛ solomasaxan tongo suuli nun solofere (245 857 km²) nan na."
-    },
-    "Mixie yeri na Guinée kui?": {
-        "french": "La population de la Guinée est d'environ 13,5 millions d'habitants selon les dernières estimations.",
-        "english": "The population of Guinea is approximately 13.5 million according to the latest estimates.",
-        "soussou": "Mixie naxan na Guinée kui findexi mixi wulu miliyɔn fu nun saxan nun a tagi (13,5 millions) nan na, xasabi dɔnxɛ ra."
-    },
-    "Xui mundun falama Guinée kui?": {
-        "french": "La langue officielle de la Guinée est le français, mais plusieurs langues nationales sont parlées comme le soussou, le peul, le malinké, le kissi, le toma et le guerzé.",
-        "english": "The official language of Guinea is French, but several national languages are spoken such as Susu, Fula, Malinke, Kissi, Toma, and Guerzé.",
-        "soussou": "Guinée kui, xui xungbe findexi faransɛ nan na, kɔnɔ bɔxi xui wuyaxi fan falama alɔ soso, fula, malinke, kissi, toma, nun gerzé."
-    },
-    "Xure xungbe mundun kelima Guinée?": {
-        "french": "Le fleuve Niger, l'un des plus importants d'Afrique, prend sa source dans les montagnes du Fouta-Djallon en Guinée.",
-        "english": "The Niger River, one of Africa's most important rivers, has its source in the Fouta Djallon mountains in Guinea.",
-        "soussou": "Joliba (Xure Niger), naxan findexi Afrika xure xungbe nde ra, a kelima Futa-Jallon geyae nan kui Guinée bɔxi ma."
-    },
-    "Manse Guinée xa kurunba kilɔn keren sɔtɔ mu?": {
-        "french": "Les principales ressources naturelles de la Guinée sont la bauxite (parmi les plus grandes réserves mondiales), le fer, l'or, le diamant et d'autres minerais précieux.",
-        "english": "Guinea's main natural resources are bauxite (among the world's largest reserves), iron, gold, diamonds, and other precious minerals.",
-        "soussou": "Guinée xa kurunba xungbe findexi bɔxita (bauxite) nan na (naxan findexi dunia bɔxita ragata xungbe nde ra), wure, xɛma, diyaman, nun gɛmɛ tofanyi gbɛtɛe."
-    },
-    "Guinée dɔxɔ sɛgɛ yeri na?": {
-        "french": "La Guinée est divisée en quatre régions naturelles: la Basse-Guinée (ou Guinée Maritime), la Moyenne-Guinée (Fouta-Djallon), la Haute-Guinée et la Guinée Forestière.",
-        "english": "Guinea is divided into four natural regions: Lower Guinea (or Maritime Guinea), Middle Guinea (Fouta Djallon), Upper Guinea, and Forest Guinea.",
-        "soussou": "Guinée bɔxi yitaxunxi dɔxɔ sɛgɛ naani nan na: Baa Guinée (xa ma Guinée Maritime), Tagi Guinée (Futa-Jallon), Kore Guinée, nun Fɔrɛti Guinée."
-    },
-    "Boxi mundun na Guinée rabilinma?": {
-        "french": "La Guinée est entourée par six pays: la Guinée-Bissau, le Sénégal, le Mali, la Côte d'Ivoire, le Liberia et la Sierra Leone.",
-        "english": "Guinea is surrounded by six countries: Guinea-Bissau, Senegal, Mali, Ivory Coast, Liberia, and Sierra Leone.",
-        "soussou": "Bɔxi senni nan Guinée rabilinma: Guinée-Bissau, Senegal, Mali, Côte d'Ivoire, Liberia, nun Sierra Leone."
-    },
-    "Donkin yire fanyi na Guinée?": {
-        "french": "Parmi les sites touristiques remarquables de Guinée, on trouve les chutes de Kinkon, le Mont Nimba (site du patrimoine mondial de l'UNESCO), les îles de Loos, le Voile de la Mariée à Kindia, et le Fouta-Djallon avec ses paysages montagneux spectaculaires.",
-        "english": "Among Guinea's remarkable tourist sites are the Kinkon Falls, Mount Nimba (UNESCO World Heritage Site), the Loos Islands, the Bride's Veil in Kindia, and the Fouta Djallon with its spectacular mountainous landscapes.",
-        "soussou": "Donkin yire fanyi naxee na Guinée kui: Kinkon ye birama, Nimba geya (naxan findexi UNESCO dunia kɛ barama yire nde ra), Loos surie, Ginɛ dugi dukubi Kindia, nun Futa-Jallon xa geya tofanyi."
-    },
-    "Guinée donma munse ma dunia kui?": {
-        "french": "La Guinée est connue internationalement pour ses immenses ressources minières, particulièrement la bauxite (environ un tiers des réserves mondiales), mais aussi pour sa riche culture musicale avec des artistes comme Mory Kanté et son instrument traditionnel, la kora.",
-        "english": "Guinea is internationally known for its vast mineral resources, particularly bauxite (about one-third of the world's reserves), but also for its rich musical culture with artists like Mory Kanté and the traditional kora instrument.",
-        "soussou": "Guinée kolonxi dunia kui a xa bɔxi bun naafuli xungbe nan ma, gbengbenyi bɔxita (bauxite) naxan yataxi dunia bɔxita birin saxande ra, a man kolonxi a xa fare namunɛ fan ma nun a xa fare mixie alɔ Mory Kanté nun a xa kora maxase."
-    },
-    "Gninima mundun na Guinée xa xui xungbe ra?": {
-        "french": "Les plus grands groupes ethniques de Guinée sont les Peuls (40%), les Malinkés (30%), les Soussous (20%), ainsi que plusieurs autres groupes minoritaires comme les Kissis, les Tomas et les Guerzés.",
-        "english": "The largest ethnic groups in Guinea are the Fula (40%), the Malinke (30%), the Susu (20%), as well as several other minority groups such as the Kissi, Toma, and Guerzé.",
-        "soussou": "Gninima xungbe naxee na Guinée xa xui ra e findexi Fulae (40%), Malinkee (30%), Sosoe (20%), nun gninima doonie gbɛtɛe alɔ Kissie, Tomae, nun Gerzée."
-    },
-    "Nènè munki ra?": {
-        "french": "Nènè est le premier LLM open source dédié aux langues locales guinéennes, développé par une équipe de jeunes ingénieurs guinéens passionnés et visionnaires. Ce projet révolutionnaire utilise l'intelligence artificielle pour préserver et valoriser notre patrimoine linguistique. Nènè permet aux Guinéens d'interagir avec la technologie moderne dans leurs langues maternelles, facilitant ainsi l'accès au savoir et aux services numériques pour tous.",
-        "english": "Nènè project is the first open-source LLM dedicated to Guinean local languages, developed by a team of passionate and visionary young Guinean engineers. This revolutionary project uses artificial intelligence to preserve and enhance our linguistic heritage. Nènè allows Guineans to interact with modern technology in their native languages, facilitating access to knowledge and digital services for all.",
-        "soussou": "Nènè findexi LLM singefe nan na naxan na open source ki ma, a rafalaxi Guinée xui xungbee bɛ, gineli fonike kɔnxɛfɔrie nan a rafalaxi, e xaxili tixi yare ma. Yi wali nɛɛnɛ xungbe fatanxi xaxilima suusa nan ma, alɔɔxi won ma xui kolonya ragata nun a xa tide ite fee ma. Nènè a niyaxi Guineekae nɔma fala tide fewalafe ra sɛnbɛma se nɛɛnɛe ra e gbe xui kui, na nan a niyama birin nɔma fe kolonyie nun kɔmpita walie masɔtɔ sɔɔnɛya ra."
-    }
-}
-
-# Système de traduction avancé soussou-français
-def translate_soussou_to_french(text):
-    # Vérifier d'abord les phrases complètes
-    if text in soussou_to_french:
-        return soussou_to_french[text]
-    
-    # Traduction par segments
-    segments = re.split(r'([.!?])', text)
-    translated_segments = []
-    
-    for segment in segments:
-        if segment in ['.', '!', '?']:
-            translated_segments.append(segment)
-            continue
-            
-        segment = segment.strip()
-        if not segment:
-            continue
-            
-        if segment in soussou_to_french:
-            translated_segments.append(soussou_to_french[segment])
-        else:
-            # Traduction mot à mot pour les segments inconnus
-            words = segment.split()
-            translated_words = []
-            
-            for word in words:
-                if word in soussou_to_french:
-                    translated_words.append(soussou_to_french[word])
-                else:
-                    translated_words.append(word)
-            
-            translated_segments.append(" ".join(translated_words))
-    
-    return "".join(translated_segments)
-
-# Système de traduction français-soussou
-def translate_french_to_soussou(text):
-    # Vérifier d'abord les phrases complètes
-    if text in french_to_soussou:
-        return french_to_soussou[text]
-    
-    # Traduction par segments
-    segments = re.split(r'([.!?])', text)
-    translated_segments = []
-    
-    for segment in segments:
-        if segment in ['.', '!', '?']:
-            translated_segments.append(segment)
-            continue
-            
-        segment = segment.strip()
-        if not segment:
-            continue
-            
-        if segment in french_to_soussou:
-            translated_segments.append(french_to_soussou[segment])
-        else:
-            # Traduction mot à mot pour les segments inconnus
-            words = segment.split()
-            translated_words = []
-            
-            for word in words:
-                word_lower = word.lower()
-                if word_lower in french_to_soussou:
-                    translated_words.append(french_to_soussou[word_lower])
-                else:
-                    translated_words.append(word)
-            
-            translated_segments.append(" ".join(translated_words))
-    
-    return "".join(translated_segments)
+# Onglets du clavier et classe CSS de leurs touches
+KEYBOARD_TABS = {"Voyelles": "vowel", "Consonnes": "consonant", "Tons": "tone", "Majuscules": "capital"}
 
-# Traitement avec Claude (version corrigée)
-def process_with_claude(text, language="french", system_prompt=None):
-    try:
-        # Vérifier que le texte n'est pas vide
-        if not text or text.strip() == "":
-            # Retourner un message par défaut si le texte est vide
-            if language == "english":
-                return "I need more information to help you. Could you please provide more details?"
-            else:
-                return "J'ai besoin de plus d'informations pour vous aider. Pourriez-vous fournir plus de détails?"
-        
-        # Configuration du message pour Claude
-        if language == "english":
-            # Pour avoir des réponses en anglais
-            if system_prompt:
-                system_prompt += " Please respond in English."
-            else:
-                system_prompt = "Please respond in English."
-        
-        # Configuration du message pour Claude
-        messages = [{"role": "user", "content": text}]
-        
-        # Ajouter un system prompt si fourni
-        if system_prompt:
-            response = client.messages.create(
-                model="claude-3-7-sonnet-20250219",
-                max_tokens=1000,
-                system=system_prompt,
-                messages=messages
-            )
+# Caractères spéciaux de data/special_chars.json rangés par onglet du clavier
+def keyboard_layout(chars):
+    layout = {tab: [] for tab in KEYBOARD_TABS}
+    for char in dict.fromkeys(chars):
+        if unicodedata.combining(char):
+            layout["Tons"].append(char)
+        elif char.isupper():
+            layout["Majuscules"].append(char)
+        elif unicodedata.normalize("NFD", char)[0] in KEYBOARD_VOWELS:
+            layout["Voyelles"].append(char)
         else:
-            response = client.messages.create(
-                model="claude-3-7-sonnet-20250219",
-                max_tokens=1000,
-                messages=messages
-            )
-        
-        return response.content[0].text
-    except Exception as e:
-        if language == "english":
-            return f"Error communicating with Claude: {str(e)}"
-        else:
-            return f"Erreur lors de la communication avec Claude: {str(e)}"
+            layout["Consonnes"].append(char)
+    return {tab: tab_chars for tab, tab_chars in layout.items() if tab_chars}
 
-# Fonction principale pour les questions-réponses avec effet de chargement
-def multilingual_chat_with_loading(question, history, output_language):
-    if not question.strip():  # Ignorer les messages vides
-        return history
-    
-    # Créer une nouvelle copie de l'historique pour éviter de modifier l'original
-    new_history = history.copy() if history else []
-    
-    # Ajouter la question de l'utilisateur à l'historique
-    new_history.append([question, "⏳ Traitement en cours..."])
-    
-    # Retourner immédiatement l'historique avec le message de chargement
-    return new_history
-
-# Fonction pour traiter la réponse réelle avec support multilingue
-def process_response(question, history, output_language):
-    if not history:
-        return history
-    
-    # Détecter si la question est en soussou
-    is_soussou = question in qa_pairs or any(word in soussou_to_french for word in question.split())
-    
-    # Préparer la réponse
-    response = ""
-    
-    # Questions prédéfinies
-    if question in qa_pairs:
-        if output_language == "Français":
-            response = qa_pairs[question]["french"]
-        elif output_language == "English":
-            response = qa_pairs[question]["english"]
-        elif output_language == "Soussou":
-            response = qa_pairs[question]["soussou"]
-    
-    # Traitement pour les questions en soussou
-    elif is_soussou:
-        # Traduire la question en français
-        french_question = translate_soussou_to_french(question)
-        
-        # Obtenir la réponse dans la langue demandée
-        if output_language == "Français":
-            system_prompt = """Tu es un assistant spécialisé dans la culture, l'histoire et la géographie de la Guinée.
-            Fournis des réponses précises, complètes et actualisées. Si tu ne connais pas la réponse exacte, indique-le clairement."""
-            
-            response = process_with_claude(french_question, "french", system_prompt)
-        elif output_language == "English":
-            system_prompt = """You are an assistant specialized in the culture, history, and geography of Guinea.
-            Provide accurate, complete, and up-to-date answers. If you don't know the exact answer, clearly state it."""
-            
-            response = process_with_claude(french_question, "english", system_prompt)
-        elif output_language == "Soussou":
-            # Obtenir d'abord la réponse en français puis la traduire en soussou
-            system_prompt = """Tu es un assistant spécialisé dans la culture, l'histoire et la géographie de la Guinée.
-            Fournis des réponses précises, complètes et actualisées. Si tu ne connais pas la réponse exacte, indique-le clairement."""
-            
-            french_response = process_with_claude(french_question, "french", system_prompt)
-            response = translate_french_to_soussou(french_response)
-    
-    # Pour les questions en français ou anglais (on les passe directement à Claude)
-    else:
-        if output_language == "Français":
-            system_prompt = """Tu es un assistant spécialisé dans la culture, l'histoire et la géographie de la Guinée.
-            Fournis des réponses précises, complètes et actualisées. Si tu ne connais pas la réponse exacte, indique-le clairement."""
-            response = process_with_claude(question, "french", system_prompt)
-        elif output_language == "English":
-            system_prompt = """You are an assistant specialized in the culture, history, and geography of Guinea.
-            Provide accurate, complete, and up-to-date answers. If you don't know the exact answer, clearly state it."""
-            response = process_with_claude(question, "english", system_prompt)
-        elif output_language == "Soussou":
-            # Obtenir la réponse en français puis la traduire en soussou
-            system_prompt = """Tu es un assistant spécialisé dans la culture, l'histoire et la géographie de la Guinée.
-            Fournis des réponses précises, complètes et actualisées. Si tu ne connais pas la réponse exacte, indique-le clairement."""
-            french_response = process_with_claude(question, "french", system_prompt)
-            response = translate_french_to_soussou(french_response)
-    
-    # Mettre à jour le dernier message avec la réponse
-    history[-1][1] = response
-    
-    # Simuler un petit délai pour montrer le traitement
-    time.sleep(0.5)
-    
-    return history
-
-# Fonction pour ajouter une nouvelle traduction au dictionnaire
-def add_translation_pair(soussou_text, french_text):
-    """Ajoute une nouvelle paire de traduction au dictionnaire"""
-    
-    if not soussou_text or not french_text:
-        return "Les deux champs doivent être remplis"
-    
-    # Ajouter aux dictionnaires en mémoire
-    soussou_to_french[soussou_text] = french_text
-    french_to_soussou[french_text] = soussou_text
-    
-    # Enregistrer dans un fichier JSON
-    try:
-        # Charger le fichier existant s'il existe
-        try:
-            with open('clean_big_data_soussou_francais.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            data = []
-        
-        # Vérifier si cette paire existe déjà
-        exists = False
-        for item in data:
-            if item.get("soussou") == soussou_text:
-                item["francais"] = french_text
-                exists = True
-                break
-        
-        # Ajouter si n'existe pas
-        if not exists:
-            data.append({"soussou": soussou_text, "francais": french_text})
-        
-        # Enregistrer dans le fichier
-        with open('clean_big_data_soussou_francais.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        return "Traduction ajoutée avec succès !"
-    except Exception as e:
-        return f"Erreur lors de l'enregistrement : {str(e)}"
-
-# Fonction pour ajouter un caractère au texte (pour le clavier soussou)
-def add_char_to_text(char, current_text):
-    # Si le texte est None, initialiser à une chaîne vide
-    if current_text is None:
-        current_text = ""
-    return current_text + char
+# Insertion d'un caractère à la position du curseur, entièrement dans le navigateur
+# (aucun aller-retour serveur : les clics ne passent pas par la file Gradio)
+def insert_char_js(textbox_id, char):
+    return f"""() => {{
+        const field = document.querySelector({json.dumps('#' + textbox_id + ' textarea, #' + textbox_id + ' input')});
+        if (!field) return;
+        const start = field.selectionStart ?? field.value.length;
+        const end = field.selectionEnd ?? start;
+        field.setRangeText({json.dumps(char)}, start, end, "end");
+        field.dispatchEvent(new Event("input", {{bubbles: true}}));
+        field.focus();
+    }}"""
 
 # NOUVEAU: Fonction pour créer un clavier soussou interactif
 def create_soussou_keyboard(textbox_component):
     """
     Crée un clavier soussou interactif avec des boutons pour les caractères spéciaux
+    (le champ `textbox_component` doit avoir un elem_id)
     """
-    # Caractères spéciaux soussous organisés par catégories
-    special_chars = {
-        "voyelles": ["ɛ", "ɔ", "ǝ", "ẽ", "ã"],
-        "consonnes": ["ɲ", "ŋ", "ɗ", "ƴ"],
-        "tons": ["́", "̀", "̂", "̌", "̄"],
-        "majuscules": ["Ɛ", "Ɔ", "Ǝ", "Ɲ", "Ŋ", "Ɗ", "Ƴ"]
-    }
-    
     with gr.Accordion("🔤 Clavier Soussou", open=True, elem_id="soussou-keyboard") as keyboard_container:
         # Organisation en onglets pour un clavier plus compact
-        with gr.Tabs() as tabs:
-            # Onglet voyelles
-            with gr.TabItem("Voyelles") as vowels_tab:
-                with gr.Row():
-                    for char in special_chars["voyelles"]:
-                        btn = gr.Button(char, elem_classes=["keyboard-key", "vowel"])
-                        btn.click(
-                            fn=add_char_to_text,
-                            inputs=[gr.Textbox(value=char, visible=False), textbox_component],
-                            outputs=textbox_component
-                        )
-            
-            # Onglet consonnes
-            with gr.TabItem("Consonnes") as consonants_tab:
-                with gr.Row():
-                    for char in special_chars["consonnes"]:
-                        btn = gr.Button(char, elem_classes=["keyboard-key", "consonant"])
-                        btn.click(
-                            fn=add_char_to_text, 
-                            inputs=[gr.Textbox(value=char, visible=False), textbox_component],
-                            outputs=textbox_component
-                        )
-            
-            # Onglet tons et accents
-            with gr.TabItem("Tons") as tones_tab:
-                with gr.Row():
-                    for char in special_chars["tons"]:
-                        btn = gr.Button(char, elem_classes=["keyboard-key", "tone"])
-                        btn.click(
-                            fn=add_char_to_text,
-                            inputs=[gr.Textbox(value=char, visible=False), textbox_component],
-                            outputs=textbox_component
-                        )
-                # Guide d'utilisation des tons
-                gr.Markdown("""
-                **Utilisation des tons:** Tapez d'abord la voyelle, puis cliquez sur le ton.
-                Exemple: pour écrire "è", tapez "e" puis cliquez sur "`̀`"
-                """)
-            
-            # Onglet majuscules
-            with gr.TabItem("Majuscules") as caps_tab:
-                with gr.Row():
-                    for char in special_chars["majuscules"]:
-                        btn = gr.Button(char, elem_classes=["keyboard-key", "capital"])
-                        btn.click(
-                            fn=add_char_to_text,
-                            inputs=[gr.Textbox(value=char, visible=False), textbox_component],
-                            outputs=textbox_component
-                        )
+        with gr.Tabs():
+            for tab, chars in keyboard_layout(lexicon_state["special_chars"]).items():
+                with gr.TabItem(tab):
+                    with gr.Row():
+                        for char in chars:
+                            # Les tons s'affichent sur un cercle pointillé pour rester visibles
+                            label = "◌" + char if unicodedata.combining(char) else char
+                            btn = gr.Button(label, elem_classes=["keyboard-key", KEYBOARD_TABS[tab]])
+                            btn.click(fn=None, js=insert_char_js(textbox_component.elem_id, char))
+                    
+                    if tab == "Tons":
+                        # Guide d'utilisation des tons
+                        gr.Markdown("""
+                        **Utilisation des tons:** Tapez d'abord la voyelle, puis cliquez sur le ton.
+                        Exemple: pour écrire "è", tapez "e" puis cliquez sur "`̀`"
+                        """)
     
     return keyboard_container
 
@@ -1028,6 +647,7 @@ with gr.Blocks(css=modern_css(), theme=gr.themes.Soft(primary_hue="orange"), tit
             # Champ de texte et clavier soussou intégré
             msg = gr.Textbox(
                 placeholder="Posez votre question en soussou, français ou anglais...",
+                elem_id="chat-input",
                 show_label=False,
                 elem_classes=["input-textbox"],
                 lines=2
@@ -1073,6 +693,7 @@ with gr.Blocks(css=modern_css(), theme=gr.themes.Soft(primary_hue="orange"), tit
                 # Entrée de texte à traduire avec clavier soussou
                 source_text = gr.Textbox(
                     lines=5,
+                    elem_id="translation-input",
                     placeholder="Entrez le texte à traduire...",
                     label="Texte source",
                     elem_classes=["input-textbox"]
@@ -1135,6 +756,58 @@ with gr.Blocks(css=modern_css(), theme=gr.themes.Soft(primary_hue="orange"), tit
                     fn=perform_translation,
                     label="Exemples de traduction"
                 )
+                
+                # Traduction par lot : plusieurs lignes collées ou un fichier, résultat en CSV
+                with gr.Accordion("📄 Traduction par lot / Batch translation", open=False):
+                    gr.Markdown("Collez un texte par ligne, ou importez un fichier `.txt` (une phrase par ligne) ou `.csv` (colonne `texte` ou première colonne).")
+                    batch_text = gr.Textbox(
+                        lines=6,
+                        placeholder="Une phrase par ligne...",
+                        label="Textes à traduire",
+                        elem_classes=["input-textbox"]
+                    )
+                    batch_file = gr.File(label="Fichier à traduire", file_types=[".txt", ".csv"], type="filepath")
+                    
+                    with gr.Row():
+                        batch_text_btn = gr.Button("Traduire les lignes", variant="primary", elem_classes=["primary-button"])
+                        batch_file_btn = gr.Button("Traduire le fichier", elem_classes=["secondary-button"])
+                    
+                    batch_status = gr.Markdown()
+                    batch_output = gr.File(label="Traductions (CSV)")
+                
+                # Traduction des lignes collées
+                def perform_batch_translation(text, source, target):
+                    texts = [line for line in (text or "").splitlines() if line.strip()]
+                    if not texts:
+                        yield "Veuillez entrer au moins une ligne à traduire", None
+                        return
+                    yield from translate_texts_to_file(texts, source, target)
+                
+                # Traduction d'un fichier importé
+                def perform_file_translation(path, source, target):
+                    if not path:
+                        yield "Veuillez importer un fichier .txt ou .csv", None
+                        return
+                    try:
+                        texts = read_texts_from_file(path)
+                    except (OSError, UnicodeDecodeError, csv.Error) as e:
+                        yield f"Erreur lors de la lecture du fichier : {str(e)}", None
+                        return
+                    yield from translate_texts_to_file(texts, source, target)
+                
+                batch_text_btn.click(
+                    fn=perform_batch_translation,
+                    inputs=[batch_text, source_lang, target_lang],
+                    outputs=[batch_status, batch_output],
+                    api_name="translate_batch"
+                )
+                
+                batch_file_btn.click(
+                    fn=perform_file_translation,
+                    inputs=[batch_file, source_lang, target_lang],
+                    outputs=[batch_status, batch_output],
+                    api_name="translate_file"
+                )
         
         # Onglet Contribution
         with gr.TabItem("👥 Contribuer"):
@@ -1146,6 +819,7 @@ with gr.Blocks(css=modern_css(), theme=gr.themes.Soft(primary_hue="orange"), tit
                 with gr.Row():
                     new_soussou = gr.Textbox(
                         placeholder="Mot ou phrase en soussou",
+                        elem_id="contribution-soussou",
                         label="Soussou",
                         elem_classes=["input-textbox"]
                     )
@@ -1212,17 +886,20 @@ with gr.Blocks(css=modern_css(), theme=gr.themes.Soft(primary_hue="orange"), tit
     gr.HTML(footer_html)
     
     # Fonction en deux étapes pour montrer l'animation de chargement
-    def submit_workflow(message, chat_history, language):
+    # (générateur asynchrone : Gradio affiche chaque état intermédiaire sans bloquer de thread)
+    async def submit_workflow(message, chat_history, language, request: gr.Request = None):
         if not message.strip():
-            return chat_history, message
+            yield chat_history, message
+            return
         
         # Étape 1: Ajouter le message à l'historique avec indication de chargement
         history = multilingual_chat_with_loading(message, chat_history, language)
+        yield history, ""
         
-        # Étape 2: Traiter la réponse réelle
-        processed_history = process_response(message, history, language)
-        
-        return processed_history, ""
+        # Étape 2: Traiter la réponse réelle au fil de l'eau
+        session = request.session_hash if request else None
+        async for processed_history in process_response(message, history, language, session):
+            yield processed_history, ""
     
     # Connexion des boutons de chat
     submit_btn.click(
@@ -1240,6 +917,12 @@ with gr.Blocks(css=modern_css(), theme=gr.themes.Soft(primary_hue="orange"), tit
     
     clear_btn.click(lambda: None, None, chatbot, queue=False)
 
+# Routes ajoutées à l'application FastAPI de Gradio, avant les siennes (mesures au format Prometheus)
+def extra_routes():
+    return [Route("/metrics", metrics_endpoint)] if METRICS_ENABLED else []
+
 # Lancer l'application
 if __name__ == "__main__":
-    demo.launch(share=True)
\ No newline at end of file
+    lexicon_watcher.start()
+    demo.queue(default_concurrency_limit=MAX_INFLIGHT_REQUESTS, max_size=QUEUE_MAX_SIZE)
+    demo.launch(share=True, app_kwargs={"routes": extra_routes()})
\ No newline at end of file
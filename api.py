@@ -0,0 +1,200 @@
+"""
+API HTTP/JSON de Nènè, indépendante de l'interface Gradio.
+
+    python api.py --host 0.0.0.0 --port 8000 --workers 4
+
+Routes (corps et réponses en JSON, erreurs sous la forme {"error": message}) :
+  POST /translate        {"text", "source", "target"} -> {"translation"}
+  POST /translate/batch  {"texts": [...], "source", "target"} -> {"translations": [...]}
+  POST /chat             {"question", "language", "history": [[question, réponse], ...], "session", "stream"}
+                         -> {"answer"} ; avec "stream": true, flux SSE d'événements "status" (étape en
+                         cours), "delta" (texte à ajouter), "replace" (texte complet à afficher), puis
+                         "done" (réponse finale)
+  POST /contribute       {"soussou", "french"} -> {"status": "ok"}
+  GET  /health           -> {"status": "ok", "entries", "qa_pairs"}
+  GET  /metrics          mesures au format Prometheus
+Langues : "soussou", "french", "english" (traduction : soussou <-> french uniquement).
+
+Les routes appellent les fonctions de core.py, comme l'interface, sans passer par la file d'événements
+de Gradio. Chaque worker a son propre lexique en mémoire et surveille les sources de data/ : une
+contribution reçue par un worker est écrite dans le journal, puis chargée par les autres au
+rechargement à chaud suivant. Le budget de jetons et les mesures de /metrics sont propres à chaque worker.
+"""
+import argparse
+import json
+import os
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import core
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+
+# Codes de langue de l'API -> libellés utilisés par l'interface et par core.py
+LANGUAGES = {"soussou": "Soussou", "french": "Français", "english": "English"}
+
+# Nombre maximal de textes par requête /translate/batch
+MAX_BATCH_TEXTS = int(os.getenv("NENE_API_MAX_BATCH", "10000"))
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def read_json(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(400, "Corps JSON invalide")
+    if not isinstance(body, dict):
+        raise HTTPException(400, "Le corps doit être un objet JSON")
+    return body
+
+
+def text_field(body, name, required=True):
+    value = body.get(name)
+    if value is None and not required:
+        return None
+    if not isinstance(value, str) or (required and not value.strip()):
+        raise HTTPException(400, f"Champ « {name} » manquant ou invalide")
+    return value
+
+
+def language_field(body, name, default=None):
+    code = body.get(name, default)
+    if code not in LANGUAGES:
+        raise HTTPException(400, f"Langue « {name} » inconnue : {', '.join(LANGUAGES)}")
+    return LANGUAGES[code]
+
+
+def translation_direction(body):
+    source, target = language_field(body, "source"), language_field(body, "target")
+    if core.translation_function(source, target) is None:
+        raise HTTPException(400, "Traduction disponible uniquement entre soussou et français")
+    return source, target
+
+
+async def translate(request):
+    body = await read_json(request)
+    text = text_field(body, "text")
+    source, target = translation_direction(body)
+    return JSONResponse({"translation": core.translation_function(source, target)(text)})
+
+
+async def translate_batch(request):
+    body = await read_json(request)
+    texts = body.get("texts")
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        raise HTTPException(400, "Champ « texts » manquant ou invalide (liste de chaînes)")
+    if len(texts) > MAX_BATCH_TEXTS:
+        raise HTTPException(413, f"Au plus {MAX_BATCH_TEXTS} textes par requête")
+    source, target = translation_direction(body)
+    # Traduction locale gourmande en calcul : hors de la boucle d'événements
+    translations = await run_in_threadpool(core.translate_batch, texts, source, target)
+    return JSONResponse({"translations": translations})
+
+
+def chat_history(body):
+    history = body.get("history") or []
+    if not isinstance(history, list) or not all(
+        isinstance(turn, list) and len(turn) == 2 and all(isinstance(part, str) for part in turn) for turn in history
+    ):
+        raise HTTPException(400, "Champ « history » invalide (liste de paires [question, réponse])")
+    return history
+
+
+async def chat(request):
+    body = await read_json(request)
+    question = text_field(body, "question")
+    language = language_field(body, "language", "french")
+    history = core.multilingual_chat_with_loading(question, chat_history(body), language)
+    # Sans identifiant de session, le budget de jetons est décompté par adresse du client
+    session = text_field(body, "session", required=False) or f"client:{request.client.host if request.client else '-'}"
+    answers = core.process_response(question, history, language, session)
+
+    if not body.get("stream"):
+        answer = ""
+        async for updated in answers:
+            answer = updated[-1][1]
+        return JSONResponse({"answer": answer})
+
+    async def events():
+        shown = ""
+        async for updated in answers:
+            partial = updated[-1][1]
+            if partial.startswith("⏳"):
+                yield _sse("status", {"text": partial})
+            elif partial.startswith(shown):
+                if partial != shown:
+                    yield _sse("delta", {"text": partial[len(shown):]})
+                shown = partial
+            else:
+                yield _sse("replace", {"text": partial})
+                shown = partial
+        yield _sse("done", {"answer": shown})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+async def contribute(request):
+    body = await read_json(request)
+    soussou, french = text_field(body, "soussou"), text_field(body, "french")
+    try:
+        # Écriture verrouillée du journal : hors de la boucle d'événements
+        await run_in_threadpool(core.contribute, soussou, french)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    except Exception as e:
+        raise HTTPException(500, f"Erreur lors de l'enregistrement : {e}")
+    return JSONResponse({"status": "ok"})
+
+
+async def health(request):
+    state = core.lexicon_state
+    return JSONResponse({"status": "ok", "entries": state["entries"], "qa_pairs": len(state["qa_pairs"])})
+
+
+# Mesures au format Prometheus (également servies par l'interface, voir App.py)
+async def metrics_endpoint(request):
+    return Response(core.metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+async def http_error(request, error):
+    return JSONResponse({"error": error.detail}, status_code=error.status_code)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    core.lexicon_watcher.start()
+    yield
+    core.lexicon_watcher.stop()
+
+
+routes = [
+    Route("/translate", translate, methods=["POST"]),
+    Route("/translate/batch", translate_batch, methods=["POST"]),
+    Route("/chat", chat, methods=["POST"]),
+    Route("/contribute", contribute, methods=["POST"]),
+    Route("/health", health),
+]
+if core.METRICS_ENABLED:
+    routes.append(Route("/metrics", metrics_endpoint))
+
+app = Starlette(routes=routes, exception_handlers={HTTPException: http_error}, lifespan=lifespan)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="API HTTP/JSON de Nènè")
+    parser.add_argument("--host", default=os.getenv("NENE_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("NENE_API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("NENE_API_WORKERS", "1")))
+    args = parser.parse_args()
+
+    # Chaque worker importe ce module et charge son lexique depuis l'instantané
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers, log_level="info")
@@ -0,0 +1,157 @@
+"""
+Vérifie l'API HTTP/JSON (api.py) avec le client de test de Starlette, contre le faux serveur local.
+
+    python benchmarks/api_check.py
+
+Scénarios : corps invalides refusés avec une erreur 400 {"error": ...}, limite de taille de
+/translate/batch (413), ordre des événements SSE de /chat en streaming (« status », puis « delta »,
+puis « done » avec la réponse complète), et événement « replace » quand le texte affiché est réécrit.
+Le script se termine avec un code non nul si l'un des scénarios échoue.
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+# core.py charge ses données par chemins relatifs
+os.chdir(ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "stub-key")
+# Limite réduite pour vérifier le refus d'un lot trop grand sans envoyer 10 000 textes
+os.environ.setdefault("NENE_API_MAX_BATCH", "20")
+
+import anthropic
+
+from stub_anthropic import DEFAULT_ANSWER, StubConfig, start_in_thread
+
+# (route, corps JSON ou texte brut) : tous doivent être refusés avec une erreur 400
+INVALID_REQUESTS = [
+    ("/translate", "pas du JSON"),
+    ("/translate", ["tana"]),
+    ("/translate", {"source": "soussou", "target": "french"}),
+    ("/translate", {"text": "tana", "source": "klingon", "target": "french"}),
+    ("/translate", {"text": "hello", "source": "english", "target": "french"}),
+    ("/translate/batch", {"texts": "tana", "source": "soussou", "target": "french"}),
+    ("/translate/batch", {"texts": ["tana", 3], "source": "soussou", "target": "french"}),
+    ("/chat", {"question": "  "}),
+    ("/chat", {"question": "Qui a fondé Conakry ?", "language": "latin"}),
+    ("/chat", {"question": "Qui a fondé Conakry ?", "history": [["question seule"]]}),
+    ("/contribute", {"soussou": "tana", "french": ""}),
+]
+
+
+def post(client, path, body):
+    if isinstance(body, str):
+        return client.post(path, content=body, headers={"Content-Type": "application/json"})
+    return client.post(path, json=body)
+
+
+def sse_events(text):
+    """Liste des (événement, données) d'un flux SSE."""
+    events = []
+    for block in text.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields.get("data", "null"))))
+    return events
+
+
+def compressed(names):
+    # Suite des types d'événements, les répétitions consécutives regroupées
+    return [name for i, name in enumerate(names) if i == 0 or names[i - 1] != name]
+
+
+def validation_errors(app, client, config):
+    refused = []
+    for path, body in INVALID_REQUESTS:
+        response = post(client, path, body)
+        if response.status_code == 400 and "error" in response.json():
+            refused.append(path)
+    ok = len(refused) == len(INVALID_REQUESTS)
+    return ok, f"{len(refused)}/{len(INVALID_REQUESTS)} corps invalides refusés (400)"
+
+
+def batch_limit(app, client, config):
+    import api
+    limit = api.MAX_BATCH_TEXTS
+    body = {"source": "soussou", "target": "french"}
+    accepted = post(client, "/translate/batch", dict(body, texts=["tana"] * limit))
+    refused = post(client, "/translate/batch", dict(body, texts=["tana"] * (limit + 1)))
+    ok = accepted.status_code == 200 and len(accepted.json()["translations"]) == limit
+    ok = ok and refused.status_code == 413 and "error" in refused.json()
+    return ok, f"{limit} textes traduits, {limit + 1} refusés ({refused.status_code})"
+
+
+def stream_order(app, client, config):
+    app.response_cache.clear()
+    calls = config.calls
+    response = post(client, "/chat", {"question": "Qui a fondé Conakry ?", "stream": True})
+    events = sse_events(response.text)
+    names = compressed([name for name, _ in events])
+    deltas = "".join(data["text"] for name, data in events if name == "delta")
+    ok = response.headers["content-type"].startswith("text/event-stream") and names == ["status", "delta", "done"]
+    ok = ok and events[-1][1]["answer"] == deltas == DEFAULT_ANSWER and config.calls == calls + 1
+    return ok, f"{' -> '.join(names)}, {sum(name == 'delta' for name, _ in events)} fragments"
+
+
+def stream_replace(app, client, config):
+    # Réponse réécrite en cours de route (par exemple traduite en soussou après le texte français)
+    steps = ["⏳ Claude rédige la réponse...", "Conakry", "Conakry est", "Kɔnakiri nan", "Kɔnakiri nan na"]
+
+    async def scripted(question, history, output_language, session=None):
+        for step in steps:
+            history[-1][1] = step
+            yield history
+
+    process_response = app.process_response
+    app.process_response = scripted
+    try:
+        events = sse_events(post(client, "/chat", {"question": "Qui a fondé Conakry ?", "stream": True}).text)
+    finally:
+        app.process_response = process_response
+    names = [name for name, _ in events]
+    ok = names == ["status", "delta", "delta", "replace", "delta", "done"]
+    ok = ok and events[3][1]["text"] == steps[3] and events[-1][1]["answer"] == steps[-1]
+    return ok, " -> ".join(names)
+
+
+SCENARIOS = [
+    ("validation des corps (400)", validation_errors),
+    ("limite de /translate/batch (413)", batch_limit),
+    ("ordre des événements SSE", stream_order),
+    ("événement replace", stream_replace),
+]
+
+
+def run_all(app, client, config):
+    failures = 0
+    for name, scenario in SCENARIOS:
+        ok, detail = scenario(app, client, config)
+        failures += not ok
+        print(f"{'OK' if ok else 'ÉCHEC':>5}  {name:<34} {detail}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8772)
+    args = parser.parse_args()
+
+    config = StubConfig(latency=0.05, token_delay=0.002)
+    server, base_url = start_in_thread(config, port=args.port)
+
+    import core
+    core.client = anthropic.AsyncAnthropic(api_key="stub-key", base_url=base_url, max_retries=0)
+
+    import api
+    from starlette.testclient import TestClient
+
+    with TestClient(api.app) as client:
+        failures = run_all(core, client, config)
+    server.should_exit = True
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Débit de la traduction par lot (phrases/seconde) pour 10 000 et 100 000 phrases.
+
+    python benchmarks/batch_translation_bench.py --sizes 10000 100000
+
+Les phrases sont composées de 1 à 3 entrées du dictionnaire tirées au hasard, avec quelques
+mots inconnus ou mal orthographiés, dans les deux sens de traduction.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "stub-key")
+
+import core
+
+
+def make_sentences(keys, count, rng):
+    sentences = []
+    for _ in range(count):
+        parts = [rng.choice(keys) for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.3:
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(("konakiri", "wali", "Nènè")))
+        sentences.append(" ".join(parts))
+    return sentences
+
+
+def run(sentences, source, target):
+    start = time.perf_counter()
+    # Le fichier temporaire est supprimé à la fin du générateur
+    for _ in core.translate_texts_to_file(sentences, source, target):
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    directions = [
+        ("Soussou", "Français", list(core.lexicon_state["soussou_to_french"])),
+        ("Français", "Soussou", list(core.lexicon_state["french_to_soussou"])),
+    ]
+
+    print(f"{'sens':>20} {'phrases':>9} {'distinctes':>11} {'durée (s)':>10} {'phrases/s':>10}")
+    for source, target, keys in directions:
+        for size in args.sizes:
+            sentences = make_sentences(keys, size, rng)
+            elapsed = run(sentences, source, target)
+            print(f"{source + ' -> ' + target:>20} {size:>9} {len(set(sentences)):>11} "
+                  f"{elapsed:>10.2f} {size / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Suite de benchmarks reproductible : traduction, aiguillage des questions et tour de chat complet,
+sur des datasets synthétiques de 1x, 10x et 100x la taille des données du dépôt.
+
+    python benchmarks/benchmark_suite.py --scales 1 10 100 --output results.json
+
+Pour chaque échelle, deux processus neufs importent core.py depuis une copie agrandie de data/ :
+  - démarrage à froid : sources JSON analysées, index construits, instantané écrit ;
+  - démarrage à chaud : instantané chargé, puis toutes les mesures ci-dessous.
+Seul l'import de core.py (essentiellement le chargement du lexique) est chronométré : ses dépendances
+externes (SDK Anthropic) sont importées avant (deps_import_s), et App.py, dont l'import de Gradio prend
+plusieurs secondes, n'est importé qu'ensuite pour les tours de chat (ui_import_s). Ces imports
+masqueraient le gain de l'instantané.
+Mesures :
+  - latence par appel de translate_soussou_to_french, translate_french_to_soussou et route_question
+    (l'aiguillage de process_response) : moyenne, p50, p99 en µs ;
+  - débit de translate_batch (textes/s) ;
+  - tour de chat complet (submit_workflow) contre le faux serveur Anthropic (latence réglable) :
+    premier affichage, première réponse, fin du tour, médianes en ms ;
+  - mémoire : RSS du processus avant et après l'import, pic de RSS, taille du lexique en mémoire
+    (allocations suivies par tracemalloc) et de l'instantané sur disque.
+
+Les corpus de test sont tirés avec une graine fixe : deux exécutions sur la même machine comparent
+les mêmes entrées. Le résultat JSON (métadonnées, paramètres, une entrée par échelle) est écrit
+dans --output, ou sur la sortie standard.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(BENCHMARKS, ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCHMARKS)
+
+from lexicon import ENGLISH_SAMPLES_PATH
+
+# Marque de la ligne de résultat d'un processus de mesure (core.py écrit aussi sur la sortie standard)
+RESULT_PREFIX = "BENCHMARK_RESULT "
+
+# Mots absents du lexique ou mal orthographiés, mêlés aux phrases de test
+NOISE_WORDS = ("konakiri", "wali", "Nènè", "Gine", "bonjoure")
+
+# Tours de chat mesurés : (nom, question, langue de sortie) ; "qa" est servi sans appel à Claude
+CHAT_TURNS = [
+    ("qa", None, "Français"),
+    ("french", "Quels sont les grands fleuves de la Guinée?", "Français"),
+    ("soussou", "N nu wali Konakiri ra, i mɛri?", "Français"),
+    ("soussou_output", "Quelle est la langue parlée à Conakry?", "Soussou"),
+]
+
+
+def rss_mb():
+    """Mémoire résidente actuelle du processus (Mo), ou None hors Linux."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def latency_stats(durations):
+    """Moyenne, p50 et p99 (µs) de durées en nanosecondes."""
+    durations = sorted(durations)
+    return {
+        "calls": len(durations),
+        "mean_us": statistics.fmean(durations) / 1000,
+        "p50_us": durations[len(durations) // 2] / 1000,
+        "p99_us": durations[min(len(durations) - 1, int(len(durations) * 0.99))] / 1000,
+    }
+
+
+def time_calls(function, inputs):
+    durations = []
+    for value in inputs:
+        start = time.perf_counter_ns()
+        function(value)
+        durations.append(time.perf_counter_ns() - start)
+    return latency_stats(durations)
+
+
+def make_sentences(keys, count, rng):
+    """Phrases de 1 à 3 entrées du lexique, avec des mots inconnus dans 30 % des cas."""
+    sentences = []
+    for _ in range(count):
+        parts = [rng.choice(keys) for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.3:
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(NOISE_WORDS))
+        sentences.append(" ".join(parts))
+    return sentences
+
+
+def submit_workflow(demo):
+    for block_function in demo.fns.values():
+        if block_function.api_name == "submit":
+            return block_function.fn
+    raise RuntimeError("événement « submit » introuvable")
+
+
+async def one_turn(app, workflow, question, language):
+    # Sans cache : chaque tour qui passe par Claude doit l'appeler
+    app.response_cache.clear()
+    start = time.perf_counter()
+    first_update = answer_time = None
+    async for history, _ in workflow(question, [], language):
+        now = time.perf_counter() - start
+        if first_update is None:
+            first_update = now
+        if answer_time is None and history[-1][1] and not history[-1][1].startswith("⏳"):
+            answer_time = now
+    return first_update, answer_time, time.perf_counter() - start
+
+
+async def chat_turns(app, demo, runs):
+    workflow = submit_workflow(demo)
+    qa_questions = list(app.lexicon_state["qa_pairs"])
+    results = {}
+    for name, question, language in CHAT_TURNS:
+        turns = []
+        for i in range(runs):
+            turns.append(await one_turn(app, workflow, question or qa_questions[i % len(qa_questions)], language))
+        first_update, answer, total = (statistics.median(column) * 1000 for column in zip(*turns))
+        results[name] = {"runs": runs, "first_update_ms": first_update, "answer_ms": answer, "total_ms": total}
+    return results
+
+
+def measure_app(args):
+    """Processus de mesure : importe core.py depuis le dossier courant (dataset synthétique)."""
+    start = time.perf_counter()
+    import anthropic
+    # Importé pour le sortir de la mesure de core.py (qui le charge au démarrage)
+    import dotenv  # noqa: F401
+    result = {"deps_import_s": time.perf_counter() - start, "rss_before_import_mb": rss_mb()}
+    start = time.perf_counter()
+    import core
+    result["import_s"] = time.perf_counter() - start
+    result["rss_after_import_mb"] = rss_mb()
+    result["entries"] = core.lexicon_state["entries"]
+    result["snapshot_mb"] = os.path.getsize("data/lexicon.snapshot") / 1e6
+    if args.cold:
+        result["peak_rss_mb"] = peak_rss_mb()
+        return result
+
+    core.client = anthropic.AsyncAnthropic(api_key="stub-key", base_url=args.base_url, max_retries=0)
+
+    # Taille du lexique en mémoire : un second chargement complet de l'instantané, suivi par tracemalloc
+    tracemalloc.start()
+    state = core.prepare_lexicon(core.load_compiled_lexicon(fuzzy_distance=core.FUZZY_DISTANCE))
+    result["lexicon_mb"] = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    del state
+
+    rng = random.Random(args.seed)
+    soussou = make_sentences(list(core.lexicon_state["soussou_to_french"]), args.lookups, rng)
+    french = make_sentences(list(core.lexicon_state["french_to_soussou"]), args.lookups, rng)
+    qa_questions = list(core.lexicon_state["qa_pairs"])
+    questions = [rng.choice(qa_questions) for _ in range(args.lookups // 4)]
+    questions += rng.sample(soussou, args.lookups // 4) + rng.sample(french, args.lookups // 4)
+    with open(ENGLISH_SAMPLES_PATH, encoding="utf-8") as f:
+        english = [line.strip() for line in f if line.strip()]
+    questions += [rng.choice(english) for _ in range(args.lookups // 4)]
+    rng.shuffle(questions)
+
+    result["lookup"] = {
+        "soussou_to_french": time_calls(core.translate_soussou_to_french, soussou),
+        "french_to_soussou": time_calls(core.translate_french_to_soussou, french),
+        "route_question": time_calls(core.route_question, questions),
+    }
+
+    result["batch"] = {}
+    for name, source, target, keys in [
+        ("soussou_to_french", "Soussou", "Français", list(core.lexicon_state["soussou_to_french"])),
+        ("french_to_soussou", "Français", "Soussou", list(core.lexicon_state["french_to_soussou"])),
+    ]:
+        texts = make_sentences(keys, args.batch_size, rng)
+        start = time.perf_counter()
+        core.translate_batch(texts, source, target)
+        elapsed = time.perf_counter() - start
+        result["batch"][name] = {"texts": len(texts), "distinct": len(set(texts)),
+                                 "seconds": elapsed, "texts_per_s": len(texts) / elapsed}
+
+    # L'interface n'est importée que pour les tours de chat (événement « submit »)
+    start = time.perf_counter()
+    import App
+    result["ui_import_s"] = time.perf_counter() - start
+    result["chat"] = asyncio.run(chat_turns(core, App.demo, args.chat_runs))
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_measure(data_root, args, base_url, cold):
+    command = [sys.executable, os.path.abspath(__file__), "--measure",
+               "--seed", str(args.seed), "--lookups", str(args.lookups),
+               "--batch-size", str(args.batch_size), "--chat-runs", str(args.chat_runs), "--base-url", base_url]
+    if cold:
+        command.append("--cold")
+    env = {**os.environ, "ANTHROPIC_API_KEY": "stub-key", "ANTHROPIC_BASE_URL": base_url,
+           "NENE_FUZZY_DISTANCE": str(args.fuzzy_distance), "PYTHONHASHSEED": "0"}
+    env.pop("NENE_CACHE_DB", None)
+    completed = subprocess.run(command, cwd=data_root, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"échec de la mesure ({data_root}) :\n{completed.stderr}")
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"aucun résultat dans la sortie de la mesure :\n{completed.stdout}")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_scale(scale, args, base_url):
+    from startup_bench import make_dataset
+
+    with tempfile.TemporaryDirectory() as data_root:
+        make_dataset(data_root, scale)
+        cold = run_measure(data_root, args, base_url, cold=True)
+        warm = run_measure(data_root, args, base_url, cold=False)
+    return {
+        "scale": scale,
+        "entries": warm["entries"],
+        "cold_start": {"import_s": cold["import_s"], "peak_rss_mb": cold["peak_rss_mb"]},
+        "warm_start": {"import_s": warm["import_s"], "deps_import_s": warm["deps_import_s"],
+                       "ui_import_s": warm["ui_import_s"]},
+        "memory": {key: warm[key] for key in ("rss_before_import_mb", "rss_after_import_mb",
+                                              "peak_rss_mb", "lexicon_mb", "snapshot_mb")},
+        "lookup": warm["lookup"],
+        "batch": warm["batch"],
+        "chat": warm["chat"],
+    }
+
+
+def print_summary(results):
+    print(f"{'échelle':>8} {'entrées':>9} {'froid (s)':>10} {'chaud (s)':>10} {'lexique (Mo)':>13} "
+          f"{'RSS (Mo)':>9} {'s->f p99':>9} {'f->s p99':>9} {'route p99':>10} {'lot (t/s)':>10}",
+          file=sys.stderr)
+    for scale in results["scales"]:
+        lookup = scale["lookup"]
+        print(f"{scale['scale']:>7}x {scale['entries']:>9} {scale['cold_start']['import_s']:>10.2f} "
+              f"{scale['warm_start']['import_s']:>10.2f} {scale['memory']['lexicon_mb']:>13.1f} "
+              f"{scale['memory']['rss_after_import_mb'] or 0:>9.0f} "
+              f"{lookup['soussou_to_french']['p99_us']:>9.1f} {lookup['french_to_soussou']['p99_us']:>9.1f} "
+              f"{lookup['route_question']['p99_us']:>10.1f} "
+              f"{scale['batch']['soussou_to_french']['texts_per_s']:>10.0f}", file=sys.stderr)
+    print(f"\ntours de chat (médianes en ms, latence simulée {results['parameters']['latency']} s)", file=sys.stderr)
+    for scale in results["scales"]:
+        for name, turn in scale["chat"].items():
+            print(f"{scale['scale']:>7}x {name:>15} premier affichage {turn['first_update_ms']:>8.2f} "
+                  f"réponse {turn['answer_ms']:>8.2f} fin {turn['total_ms']:>8.2f}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--output", help="fichier JSON de résultats (sortie standard par défaut)")
+    parser.add_argument("--latency", type=float, default=0.2, help="latence simulée de l'API (s)")
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lookups", type=int, default=2000, help="appels mesurés par fonction")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--chat-runs", type=int, default=5, help="tours de chat mesurés par type")
+    parser.add_argument("--fuzzy-distance", type=int, default=2)
+    # Processus de mesure lancé par la suite elle-même
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--cold", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(RESULT_PREFIX + json.dumps(measure_app(args)), flush=True)
+        return
+
+    from stub_anthropic import StubConfig, start_in_thread
+
+    config = StubConfig(args.latency, args.token_delay)
+    server, base_url = start_in_thread(config, port=args.port)
+    try:
+        scales = []
+        for scale in args.scales:
+            print(f"échelle {scale}x...", file=sys.stderr)
+            scales.append(run_scale(scale, args, base_url))
+    finally:
+        server.should_exit = True
+
+    results = {
+        "metadata": {
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "parameters": {key: getattr(args, key) for key in ("latency", "token_delay", "seed", "lookups",
+                                                           "batch_size", "chat_runs", "fuzzy_distance")},
+        "scales": scales,
+    }
+    print_summary(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Vérifie le budget de jetons des appels à Claude (budget.py) contre le faux serveur local.
+
+    python benchmarks/budget_check.py
+
+Scénarios : politique par type de requête (modèle, max_tokens) et durée d'un salut comparée à
+celle d'une question factuelle, saluts reconnus seulement quand tout le message en est un, budget
+de session épuisé (réponse locale, les autres sessions continuent), budget global épuisé,
+réservation remplacée par l'usage réel, appels identiques regroupés entre sessions (chaque session réserve son propre budget : une session épuisée ne prive
+pas les autres de la réponse, et l'appel partagé n'est décompté qu'une fois du budget global).
+Le faux serveur renvoie une longue réponse, coupée à max_tokens comme le fait l'API.
+Le script se termine avec un code non nul si l'un des scénarios échoue.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+# core.py charge ses données par chemins relatifs
+os.chdir(ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "stub-key")
+
+import anthropic
+
+from stub_anthropic import StubConfig, start_in_thread
+
+# Réponse de 1200 mots : bien plus longue que max_tokens quel que soit le type de requête
+LONG_ANSWER = " ".join(["Conakry est la capitale de la Guinée."] * 200)
+
+
+def reset(app, budget=None):
+    from budget import TokenBudget
+    from single_flight import SingleFlight
+    app.response_cache.clear()
+    app.claude_flights = SingleFlight()
+    app.token_budget = budget or TokenBudget()
+
+
+async def turn(app, question, session=None, language="Français"):
+    history = [[question, "⏳ Traitement en cours..."]]
+    start = time.perf_counter()
+    async for history in app.process_response(question, history, language, session):
+        pass
+    return history[-1][1], time.perf_counter() - start
+
+
+async def route_policies(app, config):
+    reset(app)
+    _, greeting_time = await turn(app, "Tana")
+    greeting = config.last_request
+    _, factual_time = await turn(app, "Quels sont les grands fleuves de la Guinée ?")
+    factual = config.last_request
+    ok = (greeting["model"] == app.CLAUDE_POLICIES["greeting"]["model"]
+          and greeting["max_tokens"] < factual["max_tokens"] and greeting_time < factual_time)
+    return ok, (f"salut {greeting['model']} {greeting['max_tokens']} jetons en {greeting_time:.2f} s, "
+                f"question {factual['model']} {factual['max_tokens']} jetons en {factual_time:.2f} s")
+
+
+# (message, salut attendu) : un message n'est un salut que s'il n'est fait que de formules de salut
+GREETINGS = [
+    ("Tana", True), ("Bonjour Nènè !", True), ("Merci beaucoup.", True), ("I ni ce", True),
+    ("Merci, comment dit-on bouche ?", False), ("Salut, quelle est la capitale ?", False),
+    ("Bonjour, qui a fondé Conakry ?", False),
+]
+
+
+async def greeting_detection(app, config):
+    from budget import GREETING, request_type
+    wrong = [text for text, greeting in GREETINGS if (request_type(text) == GREETING) != greeting]
+    return not wrong, f"{len(GREETINGS) - len(wrong)}/{len(GREETINGS)} messages bien classés" + (
+        f" (erreurs : {', '.join(wrong)})" if wrong else "")
+
+
+async def session_budget(app, config):
+    from budget import TokenBudget
+    reset(app, TokenBudget(session_per_minute=3000))
+    answers = [(await turn(app, f"Question {i} sur la Guinée ?", session="a"))[0] for i in range(4)]
+    calls = config.calls
+    other, _ = await turn(app, "Question sur Conakry ?", session="b")
+    served_locally = [answer.startswith("Claude est momentanément indisponible") for answer in answers]
+    ok = served_locally[0] is False and served_locally[-1] is True and not other.startswith("Claude est")
+    ok = ok and config.calls == calls + 1
+    return ok, (f"session a : {served_locally.count(False)} réponses de Claude puis réponse locale, "
+                f"session b servie ({app.token_budget.stats()['rejections']} refus)")
+
+
+async def global_budget(app, config):
+    from budget import TokenBudget
+    reset(app, TokenBudget(global_per_minute=2000))
+    await turn(app, "Première question sur la Guinée ?", session="a")
+    calls = config.calls
+    answer, elapsed = await turn(app, "Seconde question sur la Guinée ?", session="b")
+    ok = answer.startswith("Claude est momentanément indisponible") and config.calls == calls
+    return ok, f"réponse locale en {elapsed * 1000:.1f} ms sans appel à Claude"
+
+
+async def settled_usage(app, config):
+    reset(app)
+    input_tokens, output_tokens = config.input_tokens, config.output_tokens
+    await turn(app, "Qui a fondé Conakry ?", session="a")
+    billed = (config.input_tokens - input_tokens) + (config.output_tokens - output_tokens)
+    stats = app.token_budget.stats()
+    ok = stats["reserved"] == 0 and stats["used"] <= billed + config.cache_creation_tokens
+    return ok, f"réservation soldée, {stats['used']:.0f} jetons décomptés"
+
+
+async def shared_flight(app, config):
+    from budget import TokenBudget
+    reset(app, TokenBudget(global_per_minute=100000, session_per_minute=3000))
+    # Session a épuisée : sa question identique ne doit pas faire échouer celle de b
+    app.token_budget.reserve("a", 3000)
+    question = "Quelles sont les langues parlées en Guinée ?"
+    calls = config.calls
+    (exhausted, _), (served, _) = await asyncio.gather(turn(app, question, session="a"), turn(app, question, session="b"))
+    ok = exhausted.startswith("Claude est momentanément indisponible") and not served.startswith("Claude est")
+    ok = ok and config.calls == calls + 1
+    # Deux sessions avec budget : un seul appel, décompté une fois du budget global
+    reset(app, TokenBudget(global_per_minute=100000, session_per_minute=3000))
+    input_tokens, output_tokens = config.input_tokens, config.output_tokens
+    answers = await asyncio.gather(*(turn(app, question, session=session) for session in ("c", "d")))
+    billed = (config.input_tokens - input_tokens) + (config.output_tokens - output_tokens)
+    stats = app.token_budget.stats()
+    ok = ok and config.calls == calls + 2 and app.claude_flights.stats()["followers"] == 1
+    ok = ok and not any(answer.startswith("Claude est") for answer, _ in answers)
+    ok = ok and stats["reserved"] == 0 and 0 < stats["used"] <= billed + config.cache_creation_tokens
+    return ok, (f"session épuisée servie localement, l'autre par Claude ; appel partagé décompté "
+                f"une fois ({stats['used']:.0f} jetons)")
+
+
+SCENARIOS = [
+    ("politique par type de requête", route_policies),
+    ("détection des saluts", greeting_detection),
+    ("budget de session épuisé", session_budget),
+    ("budget global épuisé", global_budget),
+    ("usage réel décompté", settled_usage),
+    ("appels regroupés entre sessions", shared_flight),
+]
+
+
+async def run_all(app, config):
+    failures = 0
+    for name, scenario in SCENARIOS:
+        ok, detail = await scenario(app, config)
+        failures += not ok
+        print(f"{'OK' if ok else 'ÉCHEC':>5}  {name:<32} {detail}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--token-delay", type=float, default=0.002, help="délai entre deux jetons (s)")
+    args = parser.parse_args()
+
+    config = StubConfig(latency=0.05, token_delay=args.token_delay, answer=LONG_ANSWER)
+    server, base_url = start_in_thread(config, port=args.port)
+
+    import core
+    core.client = anthropic.AsyncAnthropic(api_key="stub-key", base_url=base_url, max_retries=0)
+
+    failures = asyncio.run(run_all(core, config))
+    server.should_exit = True
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Latence d'un tour de chat complet (submit_workflow, l'événement « submit » de l'interface) pour
+des questions prédéfinies, servies sans appel à Claude.
+
+    python benchmarks/chat_latency_bench.py --runs 50
+
+Affiche le délai avant le premier affichage (message d'attente), avant la réponse et jusqu'à la
+fin de l'événement, c'est-à-dire le temps pendant lequel le tour occupe une place dans la file.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+# App.py charge ses données par chemins relatifs
+os.chdir(ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "stub-key")
+
+
+def submit_workflow(demo):
+    for block_function in demo.fns.values():
+        if block_function.api_name == "submit":
+            return block_function.fn
+    raise RuntimeError("événement « submit » introuvable")
+
+
+async def one_turn(workflow, question, language):
+    start = time.perf_counter()
+    first_update = answer_time = None
+    async for history, _ in workflow(question, [], language):
+        now = time.perf_counter() - start
+        if first_update is None:
+            first_update = now
+        if answer_time is None and history[-1][1] and not history[-1][1].startswith("⏳"):
+            answer_time = now
+    return first_update, answer_time, time.perf_counter() - start
+
+
+async def run(app, demo, runs, language):
+    workflow = submit_workflow(demo)
+    questions = list(app.lexicon_state["qa_pairs"])
+    results = [await one_turn(workflow, questions[i % len(questions)], language) for i in range(runs)]
+    return [statistics.median(column) * 1000 for column in zip(*results)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--language", default="Français")
+    args = parser.parse_args()
+
+    import App
+    import core
+
+    first_update, answer, total = asyncio.run(run(core, App.demo, args.runs, args.language))
+    print(f"questions prédéfinies ({args.runs} tours, médianes)")
+    print(f"  premier affichage : {first_update:8.2f} ms")
+    print(f"  réponse affichée  : {answer:8.2f} ms")
+    print(f"  fin de l'événement: {total:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Taille du prompt et latence au fil d'une longue conversation, contre le faux serveur Anthropic local.
+
+    python benchmarks/conversation_window_bench.py --turns 50
+
+Compare la fenêtre glissante bornée (NENE_HISTORY_TOKENS) à un historique renvoyé en entier.
+Le serveur simule un temps de lecture du prompt proportionnel au nombre de jetons d'entrée.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+# core.py charge ses données par chemins relatifs
+os.chdir(ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "stub-key")
+
+import anthropic
+
+from stub_anthropic import DEFAULT_ANSWER, StubConfig, start_in_thread
+
+QUESTIONS = [
+    "Quelle est la capitale de la Guinée?",
+    "Et combien d'habitants y vivent?",
+    "Quels sont ses quartiers les plus anciens?",
+    "Parle-moi de son port.",
+    "Quelle est son histoire coloniale?",
+]
+
+
+async def conversation(app, config, turns):
+    """(tour, jetons d'entrée, latence) pour chaque tour d'une même conversation."""
+    history = []
+    results = []
+    for turn in range(1, turns + 1):
+        question = f"{QUESTIONS[turn % len(QUESTIONS)]} ({turn})"
+        history = history + [[question, "⏳ Traitement en cours..."]]
+        # Sans cache local : chaque tour doit appeler Claude
+        app.response_cache.clear()
+        tokens_before = config.input_tokens + config.cache_read_tokens + config.cache_creation_tokens
+        start = time.perf_counter()
+        async for history in app.process_response(question, history, "Français"):
+            pass
+        latency = time.perf_counter() - start
+        tokens = config.input_tokens + config.cache_read_tokens + config.cache_creation_tokens - tokens_before
+        results.append((turn, tokens, latency))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="latence simulée de l'API (s)")
+    parser.add_argument("--prefill-delay", type=float, default=0.05, help="délai par millier de jetons d'entrée (s)")
+    parser.add_argument("--port", type=int, default=8768)
+    args = parser.parse_args()
+
+    # Réponses plus longues que celles du serveur par défaut, comme dans une vraie conversation
+    config = StubConfig(args.latency, token_delay=0.0, answer=" ".join([DEFAULT_ANSWER] * 4),
+                        prefill_delay=args.prefill_delay)
+    server, base_url = start_in_thread(config, port=args.port)
+
+    import core
+    core.client = anthropic.AsyncAnthropic(api_key="stub-key", base_url=base_url, max_retries=0)
+
+    window = core.HISTORY_TOKENS
+    runs = {}
+    for name, budget in [("fenêtre bornée", window), ("historique complet", 10 ** 9)]:
+        core.HISTORY_TOKENS = budget
+        runs[name] = asyncio.run(conversation(core, config, args.turns))
+
+    names = list(runs)
+    print(f"{'tour':>5} " + " ".join(f"{name + ' (jetons / s)':>32}" for name in names))
+    for index in range(args.turns):
+        turn = index + 1
+        if turn != 1 and turn % 10:
+            continue
+        cells = [f"{runs[name][index][1]:>22} / {runs[name][index][2]:>6.3f}" for name in names]
+        print(f"{turn:>5} " + " ".join(f"{cell:>32}" for cell in cells))
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
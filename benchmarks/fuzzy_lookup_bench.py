@@ -0,0 +1,110 @@
+"""
+Benchmark de la recherche approximative : index par suppressions (FuzzyIndex.lookup)
+contre un parcours naïf de tous les mots des dictionnaires (FuzzyIndex.scan).
+
+    python benchmarks/fuzzy_lookup_bench.py --queries 500
+
+Vérifie aussi des phrases de non-régression traduites avec le lexique complet (noms propres non
+corrigés) ; le script se termine avec un code non nul si l'une d'elles est mal traduite.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from fuzzy_lookup import FuzzyIndex
+from lexicon import SNAPSHOT_PATH, load_compiled_lexicon
+from orthography import normalize_soussou
+
+ALPHABET = "abdefgiklmnoprstuwxy"
+
+# Phrases soussou et texte qui doit rester dans leur traduction (un nom propre n'est pas « corrigé »)
+REGRESSION_CASES = [
+    ("Guinée xunyi minden na?", "Guinée"),
+]
+
+
+def load_words():
+    """Mots soussou (forme normalisée) de toutes les entrées des deux dictionnaires."""
+    words = set()
+    for name in ("clean_big_data_soussou_francais.json", os.path.join("data", "soussou_french_dictionary.json")):
+        with open(os.path.join(ROOT, name), encoding="utf-8") as f:
+            for item in json.load(f):
+                words.update(normalize_soussou(item["soussou"]).split())
+    return sorted(words)
+
+
+def misspell(word, rng, edits):
+    for _ in range(edits):
+        position = rng.randrange(len(word))
+        kind = rng.choice(("delete", "insert", "replace", "swap"))
+        if kind == "delete" and len(word) > 1:
+            word = word[:position] + word[position + 1:]
+        elif kind == "insert":
+            word = word[:position] + rng.choice(ALPHABET) + word[position:]
+        elif kind == "swap" and position < len(word) - 1:
+            word = word[:position] + word[position + 1] + word[position] + word[position + 2:]
+        else:
+            word = word[:position] + rng.choice(ALPHABET) + word[position + 1:]
+    return word
+
+
+def timed(function, queries):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(function(query))
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--max-distance", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    entries = load_words()
+
+    start = time.perf_counter()
+    index = FuzzyIndex(entries, max_distance=args.max_distance)
+    build_s = time.perf_counter() - start
+
+    originals = [rng.choice([e for e in entries if len(e) > 5]) for _ in range(args.queries)]
+    queries = [misspell(word, rng, rng.choice((1, 1, 2))) for word in originals]
+
+    index_latencies, index_results = timed(index.lookup, queries)
+    scan_latencies, scan_results = timed(index.scan, queries)
+
+    recovered = sum(1 for original, found in zip(originals, index_results) if found == original)
+    agree = sum(1 for a, b in zip(index_results, scan_results) if a == b)
+
+    print(f"Mots indexés       : {len(entries)} ({len(index.variants)} formes, construction {build_s:.2f} s)")
+    print(f"Requêtes           : {len(queries)} (1 ou 2 fautes)")
+    print(f"Index              : p50 {statistics.median(index_latencies):8.1f} µs, "
+          f"moyenne {statistics.mean(index_latencies):8.1f} µs")
+    print(f"Parcours naïf      : p50 {statistics.median(scan_latencies):8.1f} µs, "
+          f"moyenne {statistics.mean(scan_latencies):8.1f} µs")
+    print(f"Accélération       : x{statistics.mean(scan_latencies) / statistics.mean(index_latencies):.0f}")
+    print(f"Mot d'origine trouvé : {recovered}/{len(queries)}, résultats identiques au parcours : {agree}/{len(queries)}")
+
+    state = load_compiled_lexicon(os.path.join(ROOT, SNAPSHOT_PATH), root=ROOT, fuzzy_distance=args.max_distance)
+    failures = 0
+    for sentence, expected in REGRESSION_CASES:
+        translation = state["soussou_engine"].translate(sentence)
+        ok = expected in translation
+        failures += not ok
+        print(f"{'OK' if ok else 'ÉCHEC':>5}  {sentence!r} -> {translation!r}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Vérifie le rechargement à chaud du lexique (lexicon_watcher.py) sur une copie des données.
+
+    python benchmarks/hot_reload_check.py
+
+Une autre « réplique » (un processus séparé) ajoute une contribution au journal ; le script mesure
+le temps avant qu'elle soit visible dans l'application (lecture du journal, sans reconstruction).
+Puis une rafale de modifications d'une autre source (data/additional_words.json) ne doit déclencher
+qu'une reconstruction ; la latence des traductions pendant celle-ci est comparée à celle au repos.
+Le script se termine avec un code non nul si l'une des vérifications échoue.
+"""
+import json
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "stub-key")
+
+WORD, TRANSLATION = "Kɔrɔxɔnyi", "rechargement à chaud"
+# Mots ajoutés un à un à data/additional_words.json (français -> soussou)
+BURST_WORDS = {f"rafale {i}": f"Rafalexi {i}" for i in range(5)}
+
+
+def copy_data(target):
+    shutil.copytree(os.path.join(ROOT, "data"), os.path.join(target, "data"),
+                    ignore=shutil.ignore_patterns("lexicon.snapshot*", "contributions.jsonl"))
+    shutil.copy(os.path.join(ROOT, "clean_big_data_soussou_francais.json"), target)
+
+
+def lookup_latencies(app, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        app.translate_soussou_to_french("Tana mu xi? I mɛri?")
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.001)
+
+
+def measure_lookups(app, seconds):
+    stop, latencies = threading.Event(), []
+    thread = threading.Thread(target=lookup_latencies, args=(app, stop, latencies))
+    thread.start()
+    time.sleep(seconds)
+    stop.set()
+    thread.join()
+    return latencies
+
+
+def describe(latencies):
+    ordered = sorted(latencies)
+    return f"p50 {statistics.median(ordered):.3f} ms, p99 {ordered[int(len(ordered) * 0.99) - 1]:.3f} ms, max {ordered[-1]:.3f} ms"
+
+
+def wait_for(condition, timeout):
+    start = time.perf_counter()
+    while not condition() and time.perf_counter() - start < timeout:
+        time.sleep(0.01)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interval", type=float, default=0.2)
+    parser.add_argument("--debounce", type=float, default=1.0, help="stabilité des sources avant reconstruction (s)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="nene_reload_")
+    copy_data(workdir)
+    os.chdir(workdir)
+    os.environ["NENE_RELOAD_INTERVAL"] = str(args.interval)
+    os.environ["NENE_RELOAD_DEBOUNCE"] = str(args.debounce)
+
+    import core
+    core.lexicon_watcher.start()
+    print(f"Au repos : {describe(measure_lookups(core, 1.0))}")
+
+    # Contribution écrite par un autre processus, comme une autre réplique
+    subprocess.run([sys.executable, "-c", f"import sys; sys.path.insert(0, {ROOT!r}); "
+                    f"from contributions import append_contribution; "
+                    f"append_contribution({WORD!r}, {TRANSLATION!r})"], check=True)
+    visible = wait_for(lambda: WORD in core.lexicon_state["soussou_to_french"], args.timeout)
+    stats = core.lexicon_watcher.stats()
+    overlay_ok = core.translate_soussou_to_french(WORD) == TRANSLATION and stats["reloads"] == 0
+    print(f"{'OK' if overlay_ok else 'ÉCHEC':>5}  contribution visible après {visible:.2f} s, "
+          f"{stats['overlays']} lecture(s) du journal, {stats['reloads']} reconstruction")
+
+    # Rafale de modifications d'une source : une seule reconstruction, une fois la rafale terminée
+    path = os.path.join("data", "additional_words.json")
+    with open(path, encoding="utf-8") as f:
+        words = json.load(f)
+    stop, latencies = threading.Event(), []
+    thread = threading.Thread(target=lookup_latencies, args=(core, stop, latencies))
+    thread.start()
+    for french, soussou in BURST_WORDS.items():
+        words[french] = soussou
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(words, f, ensure_ascii=False)
+        time.sleep(args.interval)
+    last = list(BURST_WORDS.values())[-1]
+    visible = wait_for(lambda: last in core.lexicon_state["soussou_to_french"], args.timeout)
+    stop.set()
+    thread.join()
+    stats = core.lexicon_watcher.stats()
+    burst_ok = stats["reloads"] == 1 and all(word in core.lexicon_state["soussou_to_french"] for word in BURST_WORDS.values())
+    burst_ok = burst_ok and core.translate_soussou_to_french(WORD) == TRANSLATION
+    print(f"{'OK' if burst_ok else 'ÉCHEC':>5}  {len(BURST_WORDS)} modifications, {stats['reloads']} reconstruction "
+          f"en {stats['last_duration'] or 0:.2f} s, visible {visible:.2f} s après la dernière")
+    print(f"Pendant la reconstruction : {describe(latencies)}")
+    ok = overlay_ok and burst_ok
+
+    core.lexicon_watcher.stop()
+    shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Évaluation de l'identification de la langue (language_id) utilisée pour router les questions.
+
+    python benchmarks/language_id_eval.py --threshold 0.8
+
+1. Routage : sur un jeu de questions étiquetées, compare l'ancienne règle (un mot de la question
+   est une entrée soussou du dictionnaire) au classifieur : questions envoyées à tort vers la
+   traduction soussou (appel à Claude inutile) et questions soussou manquées.
+2. Généralisation : précision sur 10 % du lexique et du corpus anglais mis de côté à l'entraînement.
+3. Latence par question.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from language_id import ENGLISH, FRENCH, SOUSSOU, LanguageIdentifier, training_samples
+from lexicon import build_lexicon
+from qa_match_eval import PARAPHRASES
+
+# Questions étiquetées, dont beaucoup partagent des mots avec le dictionnaire soussou
+LABELED = [(question, SOUSSOU) for question, _ in PARAPHRASES] + [
+    ("Tana", SOUSSOU),
+    ("I mɛri?", SOUSSOU),
+    ("Tana mu xi?", SOUSSOU),
+    ("I tan go?", SOUSSOU),
+    ("Minden?", SOUSSOU),
+    ("Munfera?", SOUSSOU),
+    ("Mali xunyi minden na?", SOUSSOU),
+    ("Sénégal mangɛ nde ra?", SOUSSOU),
+    ("N xili nde?", SOUSSOU),
+    ("I xa wali nde ra?", SOUSSOU),
+    ("Quelle est la capitale de la Guinée?", FRENCH),
+    ("Qui est le président de la Guinée?", FRENCH),
+    ("Combien d'habitants compte la Guinée?", FRENCH),
+    ("Bonjour, comment vas-tu?", FRENCH),
+    ("Comment dit-on merci en soussou?", FRENCH),
+    ("Parle-moi de l'histoire de Conakry.", FRENCH),
+    ("Quels sont les plats traditionnels guinéens?", FRENCH),
+    ("Tana veut dire quoi en français?", FRENCH),
+    ("Je voudrais apprendre le soussou.", FRENCH),
+    ("Où se trouve le Fouta Djallon?", FRENCH),
+    ("Guinée : quelle est la monnaie nationale?", FRENCH),
+    ("Pourquoi la Guinée est-elle appelée le château d'eau de l'Afrique de l'Ouest?", FRENCH),
+    ("What is the capital of Guinea?", ENGLISH),
+    ("Who is the president of Guinea?", ENGLISH),
+    ("I want to learn Soussou.", ENGLISH),
+    ("I would like to know more about Conakry.", ENGLISH),
+    ("How do you say thank you in Soussou?", ENGLISH),
+    ("What does Tana mean?", ENGLISH),
+    ("Tell me about the Niger river.", ENGLISH),
+    ("Which languages are spoken in Guinea?", ENGLISH),
+    ("Is Guinea rich in minerals?", ENGLISH),
+    ("Where is Mount Nimba?", ENGLISH),
+]
+
+
+def old_rule(soussou_to_french, question):
+    return any(word in soussou_to_french for word in question.split())
+
+
+def held_out_accuracy(lexicon, seed=0, fraction=0.1):
+    rng = random.Random(seed)
+    entries = list(lexicon["entries"])
+    english = list(lexicon["english_samples"])
+    rng.shuffle(entries)
+    rng.shuffle(english)
+    cut, english_cut = int(len(entries) * fraction), max(1, int(len(english) * fraction))
+    model = LanguageIdentifier(training_samples(entries[cut:], lexicon["qa_pairs"], english[english_cut:]))
+
+    tests = [(entry[0], SOUSSOU) for entry in entries[:cut]] + [(entry[1], FRENCH) for entry in entries[:cut]]
+    tests += [(text, ENGLISH) for text in english[:english_cut]]
+    results = {}
+    for text, expected in tests:
+        correct, total = results.get(expected, (0, 0))
+        results[expected] = (correct + (model.classify(text)[0] == expected), total + 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=1000, help="répétitions pour la mesure de latence")
+    args = parser.parse_args()
+
+    lexicon, _ = build_lexicon()
+    soussou_to_french = {soussou: francais for soussou, francais, *_ in lexicon["entries"]}
+    model = LanguageIdentifier(training_samples(lexicon["entries"], lexicon["qa_pairs"], lexicon["english_samples"]))
+
+    print(f"Routage sur {len(LABELED)} questions étiquetées ({sum(l == SOUSSOU for _, l in LABELED)} en soussou)")
+    old_errors, new_errors = {"faux soussou": 0, "soussou manqué": 0}, {"faux soussou": 0, "soussou manqué": 0}
+    language_correct = 0
+    for question, expected in LABELED:
+        language, confidence = model.classify(question)
+        language_correct += language == expected
+        for errors, routed in [(old_errors, old_rule(soussou_to_french, question)),
+                               (new_errors, language == SOUSSOU and confidence >= args.threshold)]:
+            if routed and expected != SOUSSOU:
+                errors["faux soussou"] += 1
+            elif not routed and expected == SOUSSOU:
+                errors["soussou manqué"] += 1
+                if errors is new_errors:
+                    print(f"  manqué : {question!r} -> {language} ({confidence:.2f})")
+            if routed and expected != SOUSSOU and errors is new_errors:
+                print(f"  faux soussou : {question!r} ({confidence:.2f})")
+
+    print(f"  ancienne règle : {old_errors['faux soussou']} faux soussou, {old_errors['soussou manqué']} soussou manqués")
+    print(f"  classifieur    : {new_errors['faux soussou']} faux soussou, {new_errors['soussou manqué']} soussou manqués")
+    print(f"  langue exacte  : {language_correct}/{len(LABELED)}")
+
+    print("Précision sur 10 % des corpus mis de côté")
+    for language, (correct, total) in held_out_accuracy(lexicon).items():
+        print(f"  {language:<8} {correct}/{total} ({correct / total:.1%})")
+
+    timings = []
+    for question, _ in LABELED:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            model.classify(question)
+        timings.append((time.perf_counter() - start) / args.repeat * 1e6)
+    print(f"Latence : médiane {statistics.median(timings):.1f} µs, max {max(timings):.1f} µs par question")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Choix de la meilleure traduction quand un texte en a plusieurs (translation_table.py).
+
+    python benchmarks/lexicon_candidates_eval.py
+
+Compare l'ancien dictionnaire « la dernière traduction lue l'emporte » au classement par priorité
+de source puis nombre d'occurrences : textes à plusieurs traductions, choix qui changent, part des
+choix confirmés par plusieurs sources, couverture de la traduction locale et mémoire des chaînes.
+"""
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from lexicon import build_lexicon
+from orthography import normalize_french, normalize_soussou
+from translation_engine import PhraseTranslator
+from translation_table import TranslationTable
+
+
+def string_bytes(strings):
+    """Taille des objets chaîne distincts (par identité)."""
+    unique = {id(text): text for text in strings}
+    return sum(sys.getsizeof(text) for text in unique.values())
+
+
+def compare(name, pairs, normalize, samples):
+    last_write = {}
+    for source, target, _, _ in pairs:
+        last_write[source] = target
+    table = TranslationTable(pairs)
+    best = table.best_mapping()
+
+    multi = [source for source, candidates in table.candidates.items() if len(candidates) > 1]
+    changed = [source for source in multi if best[source] != last_write[source]]
+    confirmed_old = sum(table.candidates[s][[c[0] for c in table.candidates[s]].index(last_write[s])][2] > 1 for s in multi)
+    confirmed_new = sum(table.candidates[s][0][2] > 1 for s in multi)
+
+    old_engine, new_engine = PhraseTranslator(last_write, normalize), PhraseTranslator(best, normalize)
+    old_coverage = sum(old_engine.coverage(text) for text in samples) / len(samples)
+    new_coverage = sum(new_engine.coverage(text) for text in samples) / len(samples)
+
+    print(f"{name}")
+    print(f"  textes distincts            : {len(table)} ({len(multi)} avec plusieurs traductions)")
+    print(f"  choix modifiés              : {len(changed)}")
+    print(f"  choix confirmés par 2 sources: {confirmed_old} -> {confirmed_new} sur {len(multi)}")
+    print(f"  couverture locale           : {old_coverage:.1%} -> {new_coverage:.1%}")
+    for source in changed[:3]:
+        print(f"    {source!r}: {last_write[source]!r} -> {best[source]!r}")
+    return table
+
+
+def main():
+    lexicon, _ = build_lexicon()
+    entries = lexicon["entries"]
+    qa = lexicon["qa_pairs"].values()
+
+    soussou = compare("soussou -> français", [(s, f, p, c) for s, f, p, c in entries], normalize_soussou,
+                      [answers["soussou"] for answers in qa])
+    french = compare("français -> soussou", [(f, s, p, c) for s, f, p, c in entries], normalize_french,
+                     [answers["french"] for answers in qa])
+
+    raw = [text for s, f, _, _ in entries for text in (s, f, f, s)]
+    interned = [text for table in (soussou, french) for source, candidates in table.candidates.items()
+                for text in [source] + [candidate[0] for candidate in candidates]]
+    print(f"Mémoire des chaînes : {string_bytes(raw) / 1024:.0f} Kio sans internement, "
+          f"{string_bytes(interned) / 1024:.0f} Kio internées")
+
+
+if __name__ == "__main__":
+    main()
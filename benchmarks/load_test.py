@@ -0,0 +1,100 @@
+"""
+Test de charge du chemin de chat asynchrone contre le faux serveur Anthropic local.
+
+    python benchmarks/load_test.py --levels 1 10 50 100 200 --requests 400
+
+Affiche, pour chaque niveau de concurrence, le débit (requêtes/s) et les latences p50/p99.
+Chaque conversation pose une question différente (numérotée) et le cache de réponses est vidé
+avant chacune : toutes les requêtes vont jusqu'au faux serveur, sans cache ni regroupement.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+# core.py charge ses données par chemins relatifs
+os.chdir(ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "stub-key")
+
+import anthropic
+
+from stub_anthropic import StubConfig, start_in_thread
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def one_chat(app, question, language):
+    app.response_cache.clear()
+    start = time.perf_counter()
+    history = [[question, "⏳ Traitement en cours..."]]
+    first_token = None
+    async for history in app.process_response(question, history, language):
+        # Le message d'étape « ⏳ ... » n'est pas un fragment de réponse
+        if first_token is None and history[-1][1] and not history[-1][1].startswith("⏳"):
+            first_token = time.perf_counter() - start
+    return time.perf_counter() - start, first_token
+
+
+async def run_level(app, concurrency, total, question, language):
+    # Chaque worker enchaîne les conversations tant qu'il en reste
+    remaining = iter(range(total))
+    latencies, first_tokens = [], []
+
+    async def worker():
+        for i in remaining:
+            latency, first_token = await one_chat(app, f"{question} ({i})", language)
+            latencies.append(latency)
+            first_tokens.append(first_token)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "throughput": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 99),
+        "ttft_p50": statistics.median(first_tokens),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 10, 50, 100, 200])
+    parser.add_argument("--requests", type=int, default=400, help="conversations par niveau")
+    parser.add_argument("--latency", type=float, default=0.5, help="latence simulée de l'API (s)")
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--question", default="Quelle est la capitale de la Guinée?")
+    parser.add_argument("--language", default="Français")
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency, args.token_delay)
+    server, base_url = start_in_thread(config, port=args.port)
+
+    import core
+    core.client = anthropic.AsyncAnthropic(api_key="stub-key", base_url=base_url, max_retries=0)
+
+    print(f"{'concurrence':>11} {'requêtes':>9} {'req/s':>8} {'p50 (s)':>8} {'p99 (s)':>8} {'ttft p50':>9}")
+    calls = config.calls
+    for level in args.levels:
+        total = max(args.requests, level)
+        result = asyncio.run(run_level(core, level, total, args.question, args.language))
+        print(f"{result['concurrency']:>11} {result['requests']:>9} {result['throughput']:>8.1f} "
+              f"{result['p50']:>8.3f} {result['p99']:>8.3f} {result['ttft_p50']:>9.3f}")
+    print(f"{config.calls - calls} appels au faux serveur")
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
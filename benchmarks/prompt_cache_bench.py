@@ -0,0 +1,93 @@
+"""
+Effet du cache de prompts d'Anthropic sur les tours de chat, contre le faux serveur local.
+
+    python benchmarks/prompt_cache_bench.py --turns 30
+
+Le serveur simule le cache (préfixe jusqu'au dernier `cache_control`, 1024 jetons minimum) et un
+temps de lecture du prompt proportionnel aux jetons hors cache. Les jetons facturés sont pondérés
+comme chez Anthropic : écriture en cache x1,25, lecture depuis le cache x0,1.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+# core.py charge ses données par chemins relatifs
+os.chdir(ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "stub-key")
+
+import anthropic
+
+from stub_anthropic import StubConfig, start_in_thread
+
+QUESTIONS = [
+    ("Quelle est la capitale de la Guinée?", "Soussou"),
+    ("Quels sont les grands fleuves de la Guinée?", "Soussou"),
+    ("Qui était Sékou Touré?", "Français"),
+    ("What is the Fouta Djallon?", "English"),
+    ("Quelles langues parle-t-on à Conakry?", "Soussou"),
+]
+
+
+async def run_turns(app, config, turns):
+    before = (config.input_tokens, config.cache_creation_tokens, config.cache_read_tokens)
+    latencies = []
+    for i in range(turns):
+        question, language = QUESTIONS[i % len(QUESTIONS)]
+        # Questions toutes différentes : seul le cache de prompts d'Anthropic peut servir
+        question = f"{question} ({i})"
+        start = time.perf_counter()
+        history = [[question, ""]]
+        async for history in app.process_response(question, history, language):
+            pass
+        latencies.append(time.perf_counter() - start)
+
+    uncached = config.input_tokens - before[0]
+    written = config.cache_creation_tokens - before[1]
+    read = config.cache_read_tokens - before[2]
+    return {
+        "p50": statistics.median(latencies),
+        "input": (uncached + written + read) / turns,
+        "billed": (uncached + 1.25 * written + 0.1 * read) / turns,
+        "read": read / turns,
+    }
+
+
+async def compare(app, config, turns):
+    results = {}
+    for caching in (False, True):
+        state = app.lexicon_state
+        prompts = app.build_prompts(state["soussou_to_french"], state["qa_pairs"], caching=caching)
+        app.install_lexicon({**state, "prompts": prompts})
+        results["avec cache" if caching else "sans cache"] = await run_turns(app, config, turns)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.3, help="latence simulée de l'API (s)")
+    parser.add_argument("--prefill-delay", type=float, default=0.05, help="délai par millier de jetons hors cache (s)")
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency, token_delay=0.001, prefill_delay=args.prefill_delay)
+    server, base_url = start_in_thread(config, port=args.port)
+
+    os.environ["NENE_CACHE_SIZE"] = "0"
+    import core
+    core.client = anthropic.AsyncAnthropic(api_key="stub-key", base_url=base_url, max_retries=0)
+
+    print(f"{'':>11} {'p50 (s)':>8} {'jetons in':>10} {'dont cache':>11} {'facturés':>9}")
+    for name, result in asyncio.run(compare(core, config, args.turns)).items():
+        print(f"{name:>11} {result['p50']:>8.3f} {result['input']:>10.0f} {result['read']:>11.0f} {result['billed']:>9.0f}")
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Évaluation de la recherche de questions prédéfinies proches (qa_index).
+
+    python benchmarks/qa_match_eval.py --threshold 0.75
+
+Pour chaque question de l'ensemble d'évaluation, compare la correspondance exacte (ancien
+comportement) à l'index TF-IDF : nombre d'appels à Claude évités, faux positifs et latence.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from qa_index import DEFAULT_THRESHOLD, QAIndex
+
+# Variantes de questions prédéfinies : (question posée, question attendue)
+PARAPHRASES = [
+    ("Guinée xunyi minden na", "Guinée xunyi minden na?"),
+    ("guinée xunyi minden na ?", "Guinée xunyi minden na?"),
+    ("GUINEE XUNYI MINDEN NA?", "Guinée xunyi minden na?"),
+    ("Guinee xunyi minden na", "Guinée xunyi minden na?"),
+    ("Guinée  xunyi  minden na ?!", "Guinée xunyi minden na?"),
+    ("Guinée mangɛ nde ra", "Guinée mangɛ nde ra?"),
+    ("Guinée mange nde ra?", "Guinée mangɛ nde ra?"),
+    ("guinee mangɛ nde ra", "Guinée mangɛ nde ra?"),
+    ("Mixie yeri na Guinée kui", "Mixie yeri na Guinée kui?"),
+    ("mixie yeri na guinee kui?", "Mixie yeri na Guinée kui?"),
+    ("Mixie yeri na Guinée kui ?", "Mixie yeri na Guinée kui?"),
+    ("Mixi yeri na Guinée kui?", "Mixie yeri na Guinée kui?"),
+    ("Nènè munki ra", "Nènè munki ra?"),
+    ("Nene munki ra?", "Nènè munki ra?"),
+    ("nènè munki ra ?", "Nènè munki ra?"),
+    ("Guinée xulun yeri na", "Guinée xulun yeri na?"),
+    ("Guinée xaranyi xungbe minden na", "Guinée xaranyi xungbe minden na?"),
+    ("Munse Guinée rasabatixi", "Munse Guinée rasabatixi?"),
+    ("Xui mundun falama Guinée kui", "Xui mundun falama Guinée kui?"),
+    ("Xui mundun falama Guinee kui?", "Xui mundun falama Guinée kui?"),
+    ("Xure xungbe mundun kelima Guinée", "Xure xungbe mundun kelima Guinée?"),
+    ("Guinée dɔxɔ sɛgɛ yeri na", "Guinée dɔxɔ sɛgɛ yeri na?"),
+    ("Guinee doxo sege yeri na?", "Guinée dɔxɔ sɛgɛ yeri na?"),
+    ("Boxi mundun na Guinée rabilinma", "Boxi mundun na Guinée rabilinma?"),
+    ("Bɔxi mundun na Guinée rabilinma?", "Boxi mundun na Guinée rabilinma?"),
+    ("Donkin yire fanyi na Guinée", "Donkin yire fanyi na Guinée?"),
+    ("Guinée donma munse ma dunia kui", "Guinée donma munse ma dunia kui?"),
+    ("Guinée xa bɔxi xungbo di", "Guinée xa bɔxi xungbo di?"),
+    ("Gninima mundun na Guinée xa xui xungbe ra", "Gninima mundun na Guinée xa xui xungbe ra?"),
+    ("Manse Guinée xa kurunba kilɔn keren sɔtɔ mu", "Manse Guinée xa kurunba kilɔn keren sɔtɔ mu?"),
+]
+
+# Questions qui ne doivent correspondre à aucune question prédéfinie
+NEGATIVES = [
+    "Tana",
+    "I mɛri?",
+    "Minden?",
+    "Guinée",
+    "Guinée kui",
+    "Quelle est la capitale de la Guinée?",
+    "Qui est le président de la Guinée?",
+    "What is the capital of Guinea?",
+    "Combien d'habitants compte la Guinée?",
+    "Mali xunyi minden na?",
+    "Sénégal mangɛ nde ra?",
+    "I tan go?",
+    "Tana mu xi?",
+    "Bonjour, comment vas-tu?",
+    "Nènè",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--repeat", type=int, default=1000, help="répétitions pour la mesure de latence")
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, "data", "qa_pairs.json"), encoding="utf-8") as f:
+        qa_pairs = json.load(f)
+
+    start = time.perf_counter()
+    index = QAIndex(qa_pairs)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    exact_hits = sum(1 for asked, _ in PARAPHRASES if asked in qa_pairs)
+    correct = sum(1 for asked, expected in PARAPHRASES if index.match(asked, args.threshold) == expected)
+    wrong = sum(1 for asked, expected in PARAPHRASES if index.match(asked, args.threshold) not in (None, expected))
+    false_positives = [q for q in NEGATIVES if index.match(q, args.threshold) is not None]
+
+    latencies = []
+    queries = [asked for asked, _ in PARAPHRASES] + NEGATIVES
+    for _ in range(args.repeat // len(queries) + 1):
+        for query in queries:
+            t = time.perf_counter()
+            index.match(query, args.threshold)
+            latencies.append((time.perf_counter() - t) * 1e6)
+
+    print(f"Questions indexées          : {len(qa_pairs)} (construction {build_ms:.2f} ms)")
+    print(f"Seuil                       : {args.threshold}")
+    print(f"Variantes trouvées (exact)  : {exact_hits}/{len(PARAPHRASES)}")
+    print(f"Variantes trouvées (index)  : {correct}/{len(PARAPHRASES)} ({wrong} mauvaises réponses)")
+    print(f"Appels Claude évités        : {correct - exact_hits}")
+    print(f"Faux positifs               : {len(false_positives)}/{len(NEGATIVES)} {false_positives}")
+    print(f"Latence par recherche       : p50 {statistics.median(latencies):.1f} µs, "
+          f"max {max(latencies):.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
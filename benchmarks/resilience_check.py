@@ -0,0 +1,143 @@
+"""
+Vérifie la couche de résilience des appels à Claude (resilience.py) contre le faux serveur local,
+en injectant des erreurs et de la latence.
+
+    python benchmarks/resilience_check.py
+
+Scénarios : erreurs 529 passagères, 429 avec retry-after, échéance dépassée, disjoncteur ouvert
+(réponse locale immédiate), rétablissement après le délai de réouverture, erreur non retentée.
+Le script se termine avec un code non nul si l'un des scénarios échoue.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+# core.py charge ses données par chemins relatifs
+os.chdir(ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "stub-key")
+
+import anthropic
+
+from stub_anthropic import DEFAULT_ANSWER, StubConfig, start_in_thread
+
+DEADLINE = 1.5
+RESET_TIMEOUT = 1.0
+FAILURE_THRESHOLD = 3
+
+
+def reset(app, config):
+    from resilience import CircuitBreaker, ResilientCaller
+    app.response_cache.clear()
+    app.claude_calls = ResilientCaller(CircuitBreaker(FAILURE_THRESHOLD, RESET_TIMEOUT), max_attempts=3,
+                                       deadline=DEADLINE, base_delay=0.05, max_delay=0.5)
+    config.errors = []
+    config.error_rate = 0.0
+    config.retry_after = None
+    config.latency = 0.05
+
+
+async def ask(app, question, streaming=True):
+    start = time.perf_counter()
+    if streaming:
+        answer = "".join([delta async for delta in app.stream_with_claude(question, "french")])
+    else:
+        answer = await app.process_with_claude(question, "french")
+    return answer, time.perf_counter() - start
+
+
+async def transient_errors(app, config):
+    config.errors = [529, 529]
+    answer, _ = await ask(app, "Question 1 ?")
+    stats = app.claude_calls.stats()
+    return answer == DEFAULT_ANSWER and stats["retries"] == 2, f"{stats['attempts']} tentatives, réponse complète"
+
+
+async def retry_after_header(app, config):
+    config.errors = [429]
+    config.retry_after = 0.8
+    answer, elapsed = await ask(app, "Question 2 ?", streaming=False)
+    return answer == DEFAULT_ANSWER and elapsed >= 0.8, f"réponse après {elapsed:.2f} s (retry-after 0.8 s)"
+
+
+async def deadline_exceeded(app, config):
+    config.latency = 5.0
+    answer, elapsed = await ask(app, "Question 3 ?")
+    stats = app.claude_calls.stats()
+    ok = elapsed < DEADLINE + 0.3 and stats.get("timeouts", 0) >= 1 and "indisponible" in answer
+    return ok, f"réponse locale après {elapsed:.2f} s (échéance {DEADLINE} s)"
+
+
+async def breaker_opens(app, config):
+    config.error_rate = 1.0
+    for i in range(FAILURE_THRESHOLD):
+        await ask(app, f"Question 4.{i} ?")
+    question = next(iter(app.lexicon_state["qa_pairs"]))
+    answer, elapsed = await ask(app, question)
+    stats = app.claude_calls.stats()
+    ok = stats["state"] == "open" and stats.get("short_circuits", 0) >= 1 and elapsed < 0.05
+    ok = ok and app.lexicon_state["qa_pairs"][question]["french"] in answer
+    return ok, f"disjoncteur {stats['state']}, réponse prédéfinie en {elapsed * 1000:.1f} ms"
+
+
+async def breaker_recovers(app, config):
+    config.error_rate = 1.0
+    for i in range(FAILURE_THRESHOLD):
+        await ask(app, f"Question 5.{i} ?")
+    config.error_rate = 0.0
+    await asyncio.sleep(RESET_TIMEOUT)
+    answer, _ = await ask(app, "Question 5 ?")
+    stats = app.claude_calls.stats()
+    ok = answer == DEFAULT_ANSWER and stats["state"] == "closed" and stats["transitions"].get("half_open->closed")
+    return ok, f"transitions {stats['transitions']}"
+
+
+async def client_error(app, config):
+    config.errors = [400]
+    answer, _ = await ask(app, "Question 6 ?")
+    stats = app.claude_calls.stats()
+    ok = stats["attempts"] == 1 and stats["state"] == "closed" and answer.startswith("Erreur")
+    return ok, f"{stats['attempts']} tentative, message d'erreur affiché"
+
+
+SCENARIOS = [
+    ("erreurs 529 passagères", transient_errors),
+    ("429 avec retry-after", retry_after_header),
+    ("échéance dépassée", deadline_exceeded),
+    ("disjoncteur ouvert", breaker_opens),
+    ("rétablissement", breaker_recovers),
+    ("erreur 400 non retentée", client_error),
+]
+
+
+async def run_all(app, config):
+    failures = 0
+    for name, scenario in SCENARIOS:
+        reset(app, config)
+        ok, detail = await scenario(app, config)
+        failures += not ok
+        print(f"{'OK' if ok else 'ÉCHEC':>5}  {name:<26} {detail}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8769)
+    args = parser.parse_args()
+
+    config = StubConfig(latency=0.05, token_delay=0.001)
+    server, base_url = start_in_thread(config, port=args.port)
+
+    import core
+    core.client = anthropic.AsyncAnthropic(api_key="stub-key", base_url=base_url, max_retries=0)
+
+    failures = asyncio.run(run_all(core, config))
+    server.should_exit = True
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
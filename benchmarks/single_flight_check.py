@@ -0,0 +1,123 @@
+"""
+Vérifie le regroupement des appels identiques à Claude (single_flight.py) contre le faux serveur
+local, qui compte les appels reçus.
+
+    python benchmarks/single_flight_check.py --turns 50
+
+Scénarios : tours de chat identiques simultanés (un seul appel), lecteur en streaming qui rejoint
+un appel bloquant en cours, erreur du meneur propagée à tous les appels regroupés (et rien n'est
+mis en cache).
+Le script se termine avec un code non nul si l'un des scénarios échoue.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+# core.py charge ses données par chemins relatifs
+os.chdir(ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "stub-key")
+
+import anthropic
+
+from stub_anthropic import DEFAULT_ANSWER, StubConfig, start_in_thread
+
+# Laisse aux appels suivants le temps de rejoindre le meneur
+LATENCY = 0.3
+
+
+def reset(app, config):
+    from budget import TokenBudget
+    from single_flight import SingleFlight
+    app.response_cache.clear()
+    app.claude_flights = SingleFlight()
+    app.token_budget = TokenBudget()
+    config.errors = []
+    config.latency = LATENCY
+
+
+async def turn(app, question, language="Français"):
+    history = [[question, "⏳ Traitement en cours..."]]
+    async for history in app.process_response(question, history, language):
+        pass
+    return history[-1][1]
+
+
+async def identical_turns(app, config, turns):
+    calls = config.calls
+    answers = await asyncio.gather(*(turn(app, "Quels sont les grands fleuves de la Guinée ?") for _ in range(turns)))
+    stats = app.claude_flights.stats()
+    ok = config.calls == calls + 1 and all(answer == DEFAULT_ANSWER for answer in answers)
+    ok = ok and stats["followers"] == turns - 1 and stats["in_flight"] == 0
+    return ok, f"{turns} tours, {config.calls - calls} appel à Claude, {stats['followers']} appels regroupés"
+
+
+async def streaming_follower(app, config, turns):
+    calls = config.calls
+    question = "Qui a fondé Conakry ?"
+    leader = asyncio.ensure_future(app.fetch_claude_answer(question, "french"))
+    await asyncio.sleep(LATENCY / 3)
+    streamed = "".join([delta async for delta in app.stream_claude_deltas(question, "french")])
+    answer = await leader
+    ok = config.calls == calls + 1 and answer == streamed == DEFAULT_ANSWER
+    return ok, f"{config.calls - calls} appel, réponse bloquante et réponse en streaming identiques"
+
+
+async def leader_error(app, config, turns):
+    calls = config.calls
+    question = "Combien d'habitants compte Kindia ?"
+    config.errors = [400]
+
+    async def streamed():
+        return "".join([delta async for delta in app.stream_claude_deltas(question, "french")])
+
+    leader = asyncio.ensure_future(app.fetch_claude_answer(question, "french"))
+    await asyncio.sleep(LATENCY / 3)
+    followers = [app.fetch_claude_answer(question, "french") for _ in range(turns // 2)]
+    followers += [streamed() for _ in range(turns - turns // 2 - 1)]
+    results = await asyncio.gather(leader, *followers, return_exceptions=True)
+    errors = [result for result in results if isinstance(result, anthropic.BadRequestError)]
+    ok = len(errors) == len(results) and config.calls == calls + 1 and app.claude_flights.in_flight() == 0
+    # L'erreur n'est pas mise en cache : la question suivante repart vers Claude
+    ok = ok and await app.fetch_claude_answer(question, "french") == DEFAULT_ANSWER and config.calls == calls + 2
+    return ok, f"{len(errors)}/{len(results)} appels en erreur 400 pour {config.calls - calls - 1} appel, puis nouvel appel"
+
+
+SCENARIOS = [
+    ("tours identiques simultanés", identical_turns),
+    ("streaming après un appel bloquant", streaming_follower),
+    ("erreur du meneur propagée", leader_error),
+]
+
+
+async def run_all(app, config, turns):
+    failures = 0
+    for name, scenario in SCENARIOS:
+        reset(app, config)
+        ok, detail = await scenario(app, config, turns)
+        failures += not ok
+        print(f"{'OK' if ok else 'ÉCHEC':>5}  {name:<34} {detail}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8771)
+    parser.add_argument("--turns", type=int, default=50, help="appels identiques simultanés")
+    args = parser.parse_args()
+
+    config = StubConfig(latency=LATENCY, token_delay=0.002)
+    server, base_url = start_in_thread(config, port=args.port)
+
+    import core
+    core.client = anthropic.AsyncAnthropic(api_key="stub-key", base_url=base_url, max_retries=0)
+
+    failures = asyncio.run(run_all(core, config, args.turns))
+    server.should_exit = True
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
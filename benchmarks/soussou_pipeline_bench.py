@@ -0,0 +1,103 @@
+"""
+Compare les deux façons de répondre en soussou, contre le faux serveur Anthropic local :
+  - ancienne : réponse de Claude en français, traduite en soussou phrase par phrase par le dictionnaire ;
+  - nouvelle : réponse rédigée directement en soussou, glossaire et exemples du corpus dans le prompt.
+
+    python benchmarks/soussou_pipeline_bench.py --runs 20
+
+Affiche la latence totale, le délai avant le premier texte affiché, le nombre d'appels à Claude
+et les jetons consommés (estimés par le serveur) pour chaque chemin.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+# core.py charge ses données par chemins relatifs
+os.chdir(ROOT)
+os.environ.setdefault("ANTHROPIC_API_KEY", "stub-key")
+
+import anthropic
+
+from stub_anthropic import StubConfig, start_in_thread
+
+QUESTIONS = [
+    "Quelle est la capitale de la Guinée?",
+    "Quels sont les grands fleuves de la Guinée?",
+    "Guinée mangɛ nde ra?",
+]
+
+
+def french_then_translate(app, question):
+    system_prompt = app.system_blocks(app.lexicon_state["prompts"], "guinea_french")
+    return app.claude_answer_stream(question, "french", system_prompt, to_soussou=True)
+
+
+def direct_soussou(app, question):
+    return app.soussou_answer_stream(question, question)
+
+
+async def measure(app, pipeline, question):
+    # Sans cache : chaque passage doit appeler Claude
+    app.response_cache.clear()
+    start = time.perf_counter()
+    first_text = None
+    answer = ""
+    async for answer in pipeline(app, question):
+        if first_text is None and answer:
+            first_text = time.perf_counter() - start
+    return time.perf_counter() - start, first_text, answer
+
+
+async def run_pipeline(app, config, pipeline, runs):
+    calls, input_tokens, output_tokens = config.calls, config.input_tokens, config.output_tokens
+    latencies, first_texts = [], []
+    for i in range(runs):
+        latency, first_text, _ = await measure(app, pipeline, QUESTIONS[i % len(QUESTIONS)])
+        latencies.append(latency)
+        first_texts.append(first_text)
+    return {
+        "p50": statistics.median(latencies),
+        "first_text_p50": statistics.median(first_texts),
+        "calls": (config.calls - calls) / runs,
+        "input_tokens": (config.input_tokens - input_tokens) / runs,
+        "output_tokens": (config.output_tokens - output_tokens) / runs,
+    }
+
+
+async def compare(app, config, runs):
+    # Une seule boucle d'événements : le client HTTP garde ses connexions d'un chemin à l'autre
+    return {
+        name: await run_pipeline(app, config, pipeline, runs)
+        for name, pipeline in [("français + traduction", french_then_translate), ("soussou direct", direct_soussou)]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5, help="latence simulée de l'API (s)")
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency, args.token_delay)
+    server, base_url = start_in_thread(config, port=args.port)
+
+    import core
+    core.client = anthropic.AsyncAnthropic(api_key="stub-key", base_url=base_url, max_retries=0)
+
+    print(f"{'chemin':>22} {'p50 (s)':>8} {'1er texte':>10} {'appels':>7} {'jetons in':>10} {'jetons out':>11}")
+    for name, result in asyncio.run(compare(core, config, args.runs)).items():
+        print(f"{name:>22} {result['p50']:>8.3f} {result['first_text_p50']:>10.3f} {result['calls']:>7.1f} "
+              f"{result['input_tokens']:>10.0f} {result['output_tokens']:>11.0f}")
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
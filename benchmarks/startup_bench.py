@@ -0,0 +1,79 @@
+"""
+Temps de démarrage du lexique : reconstruction depuis les sources JSON contre chargement de
+l'instantané binaire, pour des datasets synthétiques de 1x, 10x et 100x la taille actuelle.
+
+    python benchmarks/startup_bench.py --scales 1 10 100
+
+Chaque mesure est faite dans un processus neuf (import compris) jusqu'à ce que les structures
+de recherche soient prêtes.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, ROOT)
+
+from lexicon import DICTIONARY_SOURCES, SOURCE_PATHS
+
+MEASURE = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import lexicon
+state = lexicon.load_compiled_lexicon(path={snapshot!r}, root={data_root!r}, fuzzy_distance={fuzzy})
+print(time.perf_counter() - start, state["entries"])
+"""
+
+
+def make_dataset(data_root, scale):
+    """Copie les sources en multipliant les entrées des dictionnaires par `scale`."""
+    os.makedirs(os.path.join(data_root, "data"), exist_ok=True)
+    for source in SOURCE_PATHS:
+        src = os.path.join(ROOT, source)
+        dst = os.path.join(data_root, source)
+        if source in DICTIONARY_SOURCES:
+            with open(src, encoding="utf-8") as f:
+                items = json.load(f)
+            scaled = list(items)
+            for copy in range(1, scale):
+                scaled.extend({"soussou": f"{item['soussou']} {copy}", "francais": f"{item['francais']} {copy}"}
+                              for item in items)
+            with open(dst, "w", encoding="utf-8") as f:
+                json.dump(scaled, f, ensure_ascii=False, indent=2)
+        elif os.path.exists(src):
+            shutil.copy(src, dst)
+
+
+def measure(data_root, snapshot, fuzzy):
+    code = MEASURE.format(root=ROOT, snapshot=snapshot, data_root=data_root, fuzzy=fuzzy)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    seconds, entries = output.split()
+    return float(seconds), int(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--fuzzy-distance", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'échelle':>8} {'entrées':>9} {'JSON (s)':>9} {'instantané (s)':>15} {'taille (Mo)':>12}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as data_root:
+            make_dataset(data_root, scale)
+            snapshot = os.path.join(data_root, "lexicon.snapshot")
+            # Premier démarrage : sources JSON analysées et index construits (puis instantané écrit)
+            cold, entries = measure(data_root, snapshot, args.fuzzy_distance)
+            # Démarrages suivants : l'instantané est valide et chargé en une fois
+            warm, _ = measure(data_root, snapshot, args.fuzzy_distance)
+            size = os.path.getsize(snapshot) / 1e6
+        print(f"{scale:>7}x {entries:>9} {cold:>9.2f} {warm:>15.2f} {size:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
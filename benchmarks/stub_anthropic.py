@@ -0,0 +1,199 @@
+"""
+Serveur local qui imite l'API Messages d'Anthropic (réponses simples et streaming SSE).
+
+Utilisé par les benchmarks pour mesurer le chemin de requête de Nènè sans appeler Claude:
+    python benchmarks/stub_anthropic.py --port 8765 --latency 0.5
+puis ANTHROPIC_BASE_URL=http://127.0.0.1:8765
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+# Texte renvoyé par défaut, découpé en fragments pour le streaming
+DEFAULT_ANSWER = (
+    "La capitale de la Guinée est Conakry. "
+    "Elle est située sur la côte atlantique du pays. "
+    "C'est aussi la plus grande ville de Guinée."
+)
+
+
+class StubConfig:
+    def __init__(self, latency=0.2, token_delay=0.01, answer=DEFAULT_ANSWER, min_cache_tokens=1024,
+                 prefill_delay=0.0, error_rate=0.0, error_status=529, retry_after=None):
+        # Délai avant le premier fragment (ou avant la réponse complète)
+        self.latency = latency
+        # Délai entre deux fragments en streaming
+        self.token_delay = token_delay
+        self.answer = answer
+        # Délai supplémentaire par millier de jetons d'entrée lus hors cache
+        self.prefill_delay = prefill_delay
+        # Erreurs injectées : codes HTTP des prochains appels (dans l'ordre), puis une part aléatoire
+        self.errors = []
+        self.error_rate = error_rate
+        self.error_status = error_status
+        # En-tête retry-after (s) joint aux erreurs injectées
+        self.retry_after = retry_after
+        self.calls = 0
+        # Corps de la dernière requête reçue (modèle, max_tokens...)
+        self.last_request = None
+        self.failed_calls = 0
+        # Jetons simulés cumulés (environ 4 caractères par jeton en entrée)
+        self.input_tokens = 0
+        self.output_tokens = 0
+        # Cache de prompts simulé : préfixes vus (jusqu'au dernier point d'arrêt `cache_control`)
+        self.min_cache_tokens = min_cache_tokens
+        self.cached_prefixes = set()
+        self.cache_creation_tokens = 0
+        self.cache_read_tokens = 0
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _count_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def _cache_usage(config, system):
+    """(jetons écrits en cache, jetons lus depuis le cache) pour un system prompt en blocs."""
+    if not isinstance(system, list):
+        return 0, 0
+    breakpoints = [i for i, block in enumerate(system) if block.get("cache_control")]
+    if not breakpoints:
+        return 0, 0
+    prefix = "".join(block["text"] for block in system[:breakpoints[-1] + 1])
+    tokens = _count_tokens(prefix)
+    if tokens < config.min_cache_tokens:
+        return 0, 0
+    if prefix in config.cached_prefixes:
+        return 0, tokens
+    config.cached_prefixes.add(prefix)
+    return tokens, 0
+
+
+_ERROR_TYPES = {
+    429: "rate_limit_error",
+    500: "api_error",
+    503: "api_error",
+    529: "overloaded_error",
+}
+
+
+def _error(config, status):
+    config.failed_calls += 1
+    headers = {"retry-after": str(config.retry_after)} if config.retry_after is not None else {}
+    error_type = _ERROR_TYPES.get(status, "invalid_request_error")
+    body = {"type": "error", "error": {"type": error_type, "message": f"Injected {status}"}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def _injected_status(config):
+    if config.errors:
+        return config.errors.pop(0)
+    if config.error_rate and random.random() < config.error_rate:
+        return config.error_status
+    return None
+
+
+def _message(model, text, input_tokens, output_tokens, cache_creation=0, cache_read=0):
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                  "cache_creation_input_tokens": cache_creation, "cache_read_input_tokens": cache_read},
+    }
+
+
+def create_app(config):
+    async def messages(request):
+        payload = await request.json()
+        config.calls += 1
+        config.last_request = payload
+        status = _injected_status(config)
+        if status:
+            await asyncio.sleep(config.latency)
+            return _error(config, status)
+        model = payload.get("model", "stub")
+        system = payload.get("system", "")
+        system_text = "".join(block["text"] for block in system) if isinstance(system, list) else system
+        prompt = json.dumps(payload.get("messages", []), ensure_ascii=False) + system_text
+        # Comme l'API, input_tokens ne compte que la partie du prompt hors cache
+        cache_creation, cache_read = _cache_usage(config, system)
+        input_tokens = max(1, _count_tokens(prompt) - cache_creation - cache_read)
+        # Comme l'API, la réponse s'arrête à max_tokens (un mot par jeton)
+        tokens = config.answer.split(" ")[:payload.get("max_tokens")]
+        output_tokens = len(tokens)
+        config.input_tokens += input_tokens
+        config.output_tokens += output_tokens
+        config.cache_creation_tokens += cache_creation
+        config.cache_read_tokens += cache_read
+        latency = config.latency + config.prefill_delay * (input_tokens + cache_creation) / 1000
+
+        if not payload.get("stream"):
+            await asyncio.sleep(latency)
+            return JSONResponse(_message(model, " ".join(tokens), input_tokens, output_tokens, cache_creation, cache_read))
+
+        async def events():
+            await asyncio.sleep(latency)
+            start = _message(model, "", input_tokens, 0, cache_creation, cache_read)
+            start["content"] = []
+            yield _sse("message_start", {"type": "message_start", "message": start})
+            yield _sse("content_block_start", {"type": "content_block_start", "index": 0,
+                                               "content_block": {"type": "text", "text": ""}})
+            for i, token in enumerate(tokens):
+                text = token if i == len(tokens) - 1 else token + " "
+                yield _sse("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                   "delta": {"type": "text_delta", "text": text}})
+                await asyncio.sleep(config.token_delay)
+            yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+            yield _sse("message_delta", {"type": "message_delta",
+                                         "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                         "usage": {"output_tokens": output_tokens}})
+            yield _sse("message_stop", {"type": "message_stop"})
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/v1/messages", messages, methods=["POST"])])
+
+
+def start_in_thread(config, host="127.0.0.1", port=8765):
+    """Démarre le serveur dans un thread et renvoie (server, base_url) une fois prêt."""
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host=host, port=port,
+                                           log_level="warning", backlog=4096))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://{host}:{port}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Faux serveur Anthropic pour les tests de charge")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="part des appels en erreur")
+    parser.add_argument("--error-status", type=int, default=529)
+    parser.add_argument("--retry-after", type=float)
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency, args.token_delay, error_rate=args.error_rate,
+                        error_status=args.error_status, retry_after=args.retry_after)
+    uvicorn.run(create_app(config),
+                host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,160 @@
+"""
+Budget de jetons des appels à Claude.
+
+Chaque type de requête a sa politique (modèle et max_tokens) : un salut comme « Tana » n'a pas
+besoin de 1000 jetons de réponse ni du plus gros modèle, et une génération plus courte répond
+plus vite et coûte moins.
+
+Deux seaux à jetons (« token bucket ») limitent la consommation par minute : un pour toute
+l'application et un par session. Avant un appel, l'estimation du coût (prompt + max_tokens) est
+réservée ; après, la réservation est ajustée à l'usage réel renvoyé par l'API (response.usage).
+Si un seau est vide, BudgetExceededError est levée et l'application répond localement.
+Les jetons lus depuis le cache de prompts comptent pour un dixième, comme dans leur tarif.
+"""
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+GREETING, FACTUAL, TRANSLATION = "greeting", "factual", "translation"
+
+# Saluts, remerciements et formules de politesse (français, anglais, soussou), en mots ou groupes de mots ;
+# un message n'est un salut que s'il n'est fait que de ces formules (et de ponctuation)
+GREETING_WORDS = {
+    "bonjour", "bonsoir", "salut", "coucou", "merci", "merci beaucoup", "au revoir", "à bientôt",
+    "à tous", "à vous", "bonne journée", "bonne soirée",
+    "hello", "hi", "hey", "thanks", "thank you", "bye", "good morning", "good evening",
+    "tana", "tana mu xi", "tana mu na", "i ni", "i ni ce", "i ni wali", "i nu wali", "i kena", "wo kena",
+    "i nunmare", "ala tantun", "alhamdulilahi",
+    "nènè", "nene",
+}
+
+# Nombre maximal de mots d'une formule de GREETING_WORDS
+GREETING_MAX_WORDS = max(len(phrase.split()) for phrase in GREETING_WORDS)
+
+# Part du tarif d'entrée facturée pour un jeton lu depuis le cache de prompts
+CACHE_READ_WEIGHT = 0.1
+
+
+class BudgetExceededError(Exception):
+    """Budget de jetons épuisé : l'appel à Claude n'a pas été tenté."""
+
+
+def _words(text):
+    text = unicodedata.normalize("NFC", text or "").casefold()
+    return "".join(c if c.isalnum() or c in "'’" else " " for c in text).split()
+
+
+def _is_greeting(words):
+    # Découpage en formules de salut, la plus longue d'abord à chaque position
+    position = 0
+    while position < len(words):
+        for size in range(min(GREETING_MAX_WORDS, len(words) - position), 0, -1):
+            if " ".join(words[position:position + size]) in GREETING_WORDS:
+                position += size
+                break
+        else:
+            return False
+    return True
+
+
+def request_type(text, soussou=False):
+    """Type de requête : salut, question en soussou (aide à la traduction) ou question factuelle."""
+    words = _words(text)
+    if words and _is_greeting(words):
+        return GREETING
+    return TRANSLATION if soussou else FACTUAL
+
+
+def billed_tokens(usage):
+    """Jetons décomptés du budget pour un usage {input, output, cache_creation, cache_read}."""
+    return (usage.get("input", 0) + usage.get("output", 0) + usage.get("cache_creation", 0)
+            + usage.get("cache_read", 0) * CACHE_READ_WEIGHT)
+
+
+class TokenBucket:
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def available(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+    def allows(self, amount):
+        # Une requête plus grosse que le seau passe quand il est plein (sinon elle ne passerait jamais)
+        return self.available() >= min(amount, self.capacity)
+
+    def consume(self, amount):
+        """Retire `amount` jetons (négatif : restitution) ; le solde peut devenir négatif."""
+        self.available()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class TokenBudget:
+    def __init__(self, global_per_minute=0, session_per_minute=0, max_sessions=10000):
+        """Limites en jetons par minute (0 : pas de limite) ; au plus `max_sessions` seaux de session."""
+        self.global_bucket = TokenBucket(global_per_minute) if global_per_minute else None
+        self.session_per_minute = session_per_minute
+        self.max_sessions = max_sessions
+        # Session -> seau, du moins au plus récemment utilisé
+        self.sessions = OrderedDict()
+        self.reserved = 0.0
+        self.used = 0.0
+        self.rejections = 0
+        self._lock = threading.Lock()
+
+    def _session_bucket(self, session):
+        if not self.session_per_minute or session is None:
+            return None
+        bucket = self.sessions.get(session)
+        if bucket is None:
+            bucket = self.sessions[session] = TokenBucket(self.session_per_minute)
+            if len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        else:
+            self.sessions.move_to_end(session)
+        return bucket
+
+    def reserve(self, session, tokens):
+        """Réserve `tokens` jetons pour un appel ; BudgetExceededError si un seau est vide."""
+        with self._lock:
+            buckets = {"global": self.global_bucket, "session": self._session_bucket(session)}
+            for scope, bucket in buckets.items():
+                if bucket and not bucket.allows(tokens):
+                    self.rejections += 1
+                    raise BudgetExceededError(f"Budget de jetons ({scope}) épuisé pour la minute en cours")
+            for bucket in buckets.values():
+                if bucket:
+                    bucket.consume(tokens)
+            self.reserved += tokens
+        return tokens
+
+    def settle(self, session, reserved, used, shared=False):
+        """Remplace la réservation par l'usage réel (restitue la différence).
+
+        `shared` : réponse d'un appel identique déjà décompté pour un autre appelant ; l'usage est
+        imputé à la session, mais le seau global récupère toute la réservation.
+        """
+        with self._lock:
+            if self.global_bucket:
+                self.global_bucket.consume((0 if shared else used) - reserved)
+            bucket = self.sessions.get(session)
+            if bucket:
+                bucket.consume(used - reserved)
+            self.reserved -= reserved
+            self.used += 0 if shared else used
+
+    def stats(self):
+        with self._lock:
+            return {
+                "global_available": self.global_bucket.available() if self.global_bucket else None,
+                "sessions": len(self.sessions),
+                "reserved": self.reserved,
+                "used": self.used,
+                "rejections": self.rejections,
+            }
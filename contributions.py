@@ -0,0 +1,160 @@
+"""
+Journal des contributions au dictionnaire.
+
+Chaque traduction proposée dans l'onglet "Contribuer" est ajoutée en une ligne JSON à la fin de
+data/contributions.jsonl, sous verrou exclusif : le coût d'une contribution ne dépend plus de la
+taille du dataset et plusieurs processus peuvent écrire en même temps sans s'écraser.
+Le journal est régulièrement compacté dans data/contributions.json, une source à part qui garde
+la priorité des contributions sur les autres sources du lexique (voir lexicon.py).
+Le journal et sa version compactée sont des données locales de l'instance, ignorées par git
+(.gitignore) : ni une contribution ni un compactage ne modifient les fichiers suivis du dépôt.
+
+    python contributions.py --compact
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+JOURNAL_PATH = os.path.join("data", "contributions.jsonl")
+DATASET_PATH = os.path.join("data", "contributions.json")
+
+
+@contextlib.contextmanager
+def locked(f):
+    """Verrou exclusif sur un fichier ouvert, partagé entre processus."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield f
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield f
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def append_contribution(soussou_text, french_text, path=JOURNAL_PATH):
+    """Ajoute une contribution à la fin du journal."""
+    record = {"soussou": soussou_text, "francais": french_text, "time": time.time()}
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with open(path, "a", encoding="utf-8") as f:
+        with locked(f):
+            # En mode ajout, chaque écriture se fait à la fin du fichier, même après une compaction
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def read_contributions(path=JOURNAL_PATH):
+    """Contributions du journal, dans l'ordre ; une dernière ligne incomplète est ignorée."""
+    if not os.path.exists(path):
+        return []
+    contributions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            contributions.append(record)
+    return contributions
+
+
+def read_new_contributions(offset, path=JOURNAL_PATH):
+    """Contributions écrites dans le journal après la position `offset` (en octets), et la position
+    atteinte ; une dernière ligne incomplète est laissée pour la lecture suivante."""
+    if not os.path.exists(path):
+        return [], offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    contributions = []
+    for line in data[:end].splitlines():
+        try:
+            contributions.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return contributions, offset + end
+
+
+def journal_size(path=JOURNAL_PATH):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def drop_superseded(records):
+    """Retire les contributions qui ne sont plus la plus récente ni pour leur texte soussou ni pour
+    leur texte français : elles ne seraient retenues dans aucun sens de traduction."""
+    latest_soussou, latest_french = {}, {}
+    for i, record in enumerate(records):
+        latest_soussou[record["soussou"]] = i
+        latest_french[record["francais"]] = i
+    return [
+        record for i, record in enumerate(records)
+        if latest_soussou[record["soussou"]] == i or latest_french[record["francais"]] == i
+    ]
+
+
+def compact(dataset_path=DATASET_PATH, journal_path=JOURNAL_PATH):
+    """Intègre le journal aux contributions compactées puis le vide. Renvoie le nombre de contributions intégrées."""
+    if not os.path.exists(journal_path):
+        return 0
+
+    with open(journal_path, "r+", encoding="utf-8") as journal:
+        with locked(journal):
+            contributions = []
+            for line in journal:
+                try:
+                    contributions.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+            if not contributions:
+                return 0
+
+            try:
+                with open(dataset_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                data = []
+
+            # Les contributions restent dans l'ordre : à priorité égale, la plus récente l'emporte
+            # dans les deux sens de traduction (voir translation_table.py)
+            records = [
+                {"soussou": record["soussou"], "francais": record["francais"], "time": record.get("time")}
+                for record in data + contributions
+            ]
+            data = drop_superseded(records)
+
+            # Écriture atomique : un lecteur voit l'ancien ou le nouveau fichier, jamais un fichier partiel
+            tmp_path = dataset_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, dataset_path)
+
+            journal.seek(0)
+            journal.truncate()
+            return len(contributions)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gestion du journal des contributions")
+    parser.add_argument("--compact", action="store_true", help="intégrer le journal aux contributions compactées")
+    args = parser.parse_args()
+
+    if args.compact:
+        print(f"{compact()} contribution(s) intégrée(s) dans {DATASET_PATH}")
+    else:
+        print(f"{len(read_contributions())} contribution(s) en attente dans {JOURNAL_PATH}")
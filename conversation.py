@@ -0,0 +1,85 @@
+"""
+Contexte de conversation envoyé à Claude.
+
+Les tours précédents du chat sont renvoyés à Claude dans une fenêtre glissante limitée en jetons :
+les tours les plus récents sont gardés tels quels, les plus anciens sont condensés en un court
+résumé (première phrase de chaque question et de chaque réponse). La taille du prompt reste ainsi
+bornée quelle que soit la longueur de la conversation, sans appel supplémentaire à Claude.
+"""
+import re
+
+# Réponses à ne pas renvoyer comme contexte : attente ou échec de l'appel à Claude
+_SKIPPED_ANSWERS = ("⏳", "Erreur lors de la communication avec Claude", "Error communicating with Claude")
+
+_FIRST_SENTENCE = re.compile(r"(.+?[.!?])(?:\s|$)", re.S)
+
+
+def estimate_tokens(text):
+    """Estimation rapide du nombre de jetons (environ 4 caractères par jeton)."""
+    return len(text) // 4 + 1
+
+
+def completed_turns(history):
+    """Paires (question, réponse) terminées de l'historique du chatbot, sans le tour en cours."""
+    turns = []
+    for turn in history or []:
+        if len(turn) < 2:
+            continue
+        question, answer = turn[0], turn[1]
+        if not isinstance(question, str) or not isinstance(answer, str):
+            continue
+        if not question.strip() or not answer.strip() or answer.startswith(_SKIPPED_ANSWERS):
+            continue
+        turns.append((question.strip(), answer.strip()))
+    return turns
+
+
+def first_sentence(text, limit=160):
+    text = " ".join(text.split())
+    match = _FIRST_SENTENCE.match(text)
+    sentence = match.group(1) if match else text
+    return sentence if len(sentence) <= limit else sentence[:limit].rstrip() + "…"
+
+
+def summarize(turns, budget):
+    """Résumé des tours les plus anciens, du plus récent au plus ancien jusqu'à épuisement du budget."""
+    lines = []
+    used = 0
+    for question, answer in reversed(turns):
+        line = f"- Q : {first_sentence(question)} R : {first_sentence(answer)}"
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+    if not lines:
+        return None
+    omitted = len(turns) - len(lines)
+    header = "Résumé des échanges précédents de la conversation"
+    if omitted:
+        header += f" ({omitted} échange(s) plus ancien(s) omis)"
+    return header + " :\n" + "\n".join(reversed(lines))
+
+
+def build_context(history, budget=1500, summary_budget=300):
+    """(résumé ou None, messages) des tours précédents, dans la limite de `budget` jetons."""
+    turns = completed_turns(history)
+    kept = []
+    used = 0
+    for question, answer in reversed(turns):
+        cost = estimate_tokens(question) + estimate_tokens(answer)
+        if used + cost > budget:
+            break
+        kept.append((question, answer))
+        used += cost
+    kept.reverse()
+
+    older = turns[:len(turns) - len(kept)]
+    summary = summarize(older, summary_budget) if older else None
+
+    messages = []
+    for question, answer in kept:
+        messages.append({"role": "user", "content": question})
+        messages.append({"role": "assistant", "content": answer})
+    return summary, messages
+
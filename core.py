@@ -0,0 +1,840 @@
+"""
+Cœur de Nènè, sans interface : lexique, traduction, aiguillage des questions et réponses de Claude.
+
+Importé par l'interface Gradio (App.py) et par l'API HTTP (api.py), qui appellent les mêmes
+fonctions. Le module ne dépend pas de Gradio : un processus de l'API ne construit jamais l'interface.
+"""
+import anthropic
+import asyncio
+import csv
+import os
+import re
+import tempfile
+import threading
+import time
+import weakref
+from dotenv import load_dotenv
+
+from budget import FACTUAL, GREETING, TRANSLATION, BudgetExceededError, TokenBudget, billed_tokens, request_type
+from conversation import build_context, estimate_tokens
+from contributions import append_contribution, compact as compact_contributions, journal_size
+from language_id import FRENCH, SOUSSOU
+from lexicon import CONTRIBUTION_PRIORITY, compile_lexicon, load_compiled_lexicon
+from lexicon_watcher import LexiconWatcher
+from metrics import Metrics
+from prompts import build_prompts, system_blocks, system_text, text_block
+from qa_index import DEFAULT_THRESHOLD as QA_DEFAULT_THRESHOLD, QAIndex
+from resilience import CircuitBreaker, CircuitOpenError, ResilientCaller, is_retryable
+from response_cache import ResponseCache, make_key
+from single_flight import SingleFlight
+
+# Charger les variables d'environnement du fichier .env
+load_dotenv()
+
+# Récupérer la clé API
+api_key = os.getenv("ANTHROPIC_API_KEY")
+if not api_key:
+    raise ValueError("La clé API ANTHROPIC_API_KEY n'est pas définie dans le fichier .env")
+
+# Initialiser le client Claude (asynchrone : un appel en cours ne bloque aucun thread)
+# Les nouvelles tentatives sont gérées par claude_calls, pas par le SDK
+client = anthropic.AsyncAnthropic(api_key=api_key, max_retries=0)
+
+# Nombre maximal d'appels simultanés vers Claude
+MAX_INFLIGHT_REQUESTS = int(os.getenv("NENE_MAX_INFLIGHT_REQUESTS", "200"))
+
+# Mesures exposées sur /metrics (NENE_METRICS=0 pour désactiver la route, NENE_JSON_LOGS=1 pour un journal JSON)
+METRICS_ENABLED = os.getenv("NENE_METRICS", "1") != "0"
+metrics = Metrics(json_logs=os.getenv("NENE_JSON_LOGS", "0") == "1")
+metrics.describe("translation_seconds", "Durée d'une traduction locale")
+metrics.describe("stage_seconds", "Durée des étapes d'un tour de chat hors appel à Claude")
+metrics.describe("turn_seconds", "Durée totale d'un tour de chat")
+metrics.describe("turn_first_answer_seconds", "Délai avant le premier texte de réponse d'un tour de chat")
+metrics.describe("claude_seconds", "Durée d'un appel à Claude, nouvelles tentatives comprises")
+metrics.describe("claude_first_token_seconds", "Délai avant le premier fragment d'une réponse de Claude en streaming")
+metrics.describe("claude_requests_total", "Appels à Claude par mode et par issue")
+metrics.describe("claude_tokens_total", "Jetons facturés par Claude (usage de la réponse)")
+metrics.describe("errors_total", "Erreurs par étape et par classe d'exception")
+metrics.describe("local_answers_total", "Réponses locales servies parce que Claude était indisponible")
+metrics.describe("contribution_seconds", "Durée de l'ajout d'une traduction")
+
+# Cache des réponses de Claude (NENE_CACHE_DB active un niveau SQLite persistant, borné par NENE_CACHE_DB_SIZE)
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("NENE_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("NENE_CACHE_TTL", str(24 * 3600))),
+    db_path=os.getenv("NENE_CACHE_DB") or None,
+    max_disk_entries=int(os.getenv("NENE_CACHE_DB_SIZE", "100000")),
+)
+metrics.register_stats("response_cache", response_cache.stats)
+
+# Regroupement des appels identiques en cours vers Claude
+claude_flights = SingleFlight()
+metrics.register_stats("claude_flights", claude_flights.stats)
+
+# Échéance, nouvelles tentatives et disjoncteur autour de chaque appel à Claude
+claude_calls = ResilientCaller(
+    CircuitBreaker(
+        failure_threshold=int(os.getenv("NENE_BREAKER_FAILURES", "5")),
+        reset_timeout=float(os.getenv("NENE_BREAKER_RESET", "30")),
+    ),
+    max_attempts=int(os.getenv("NENE_CLAUDE_ATTEMPTS", "3")),
+    deadline=float(os.getenv("NENE_CLAUDE_DEADLINE", "60")),
+    base_delay=float(os.getenv("NENE_RETRY_BASE_DELAY", "0.5")),
+    max_delay=float(os.getenv("NENE_RETRY_MAX_DELAY", "8")),
+)
+metrics.register_stats("claude_calls", claude_calls.stats)
+
+# Modèle et longueur maximale de réponse par type de requête (voir budget.py)
+CLAUDE_MODEL = os.getenv("NENE_CLAUDE_MODEL", "claude-3-7-sonnet-20250219")
+CLAUDE_POLICIES = {
+    GREETING: {
+        "model": os.getenv("NENE_GREETING_MODEL", "claude-3-5-haiku-20241022"),
+        "max_tokens": int(os.getenv("NENE_GREETING_MAX_TOKENS", "200")),
+    },
+    FACTUAL: {
+        "model": CLAUDE_MODEL,
+        "max_tokens": int(os.getenv("NENE_FACTUAL_MAX_TOKENS", "1000")),
+    },
+    TRANSLATION: {
+        "model": CLAUDE_MODEL,
+        "max_tokens": int(os.getenv("NENE_TRANSLATION_MAX_TOKENS", "800")),
+    },
+}
+
+# Jetons par minute autorisés pour toute l'application et pour chaque session (0 pour ne pas limiter)
+token_budget = TokenBudget(
+    global_per_minute=int(os.getenv("NENE_GLOBAL_TOKENS_PER_MINUTE", "400000")),
+    session_per_minute=int(os.getenv("NENE_SESSION_TOKENS_PER_MINUTE", "20000")),
+)
+metrics.register_stats("token_budget", token_budget.stats)
+
+# Un sémaphore par boucle d'événements (un asyncio.Semaphore est lié à la boucle qui l'utilise)
+_claude_slots = weakref.WeakKeyDictionary()
+
+def claude_slots():
+    loop = asyncio.get_running_loop()
+    if loop not in _claude_slots:
+        _claude_slots[loop] = asyncio.Semaphore(MAX_INFLIGHT_REQUESTS)
+    return _claude_slots[loop]
+
+# Distance d'édition maximale tolérée pour rapprocher un mot mal orthographié (0 pour désactiver)
+FUZZY_DISTANCE = int(os.getenv("NENE_FUZZY_DISTANCE", "2"))
+
+# Charger le lexique compilé (dictionnaires, questions-réponses, clavier) et ses index de recherche
+# L'instantané data/lexicon.snapshot n'est reconstruit que si l'une des sources de data/ a changé
+try:
+    lexicon_state = load_compiled_lexicon(fuzzy_distance=FUZZY_DISTANCE)
+    print(f"Lexique chargé avec succès: {lexicon_state['entries']} entrées, {len(lexicon_state['qa_pairs'])} questions-réponses")
+except Exception as e:
+    print(f"Erreur lors du chargement du lexique: {e}")
+    # Dataset minimal pour démonstration si le chargement échoue
+    minimal_entries = [
+        ["Tana", "Bonjour", 0, 1],
+        ["I mɛri?", "Comment vas-tu?", 0, 1],
+        ["Minden?", "Où?", 0, 1],
+        ["Munfera?", "Pourquoi?", 0, 1],
+    ]
+    minimal_chars = ["ɛ", "ɔ", "ɲ", "ŋ", "Ɛ", "Ɔ", "Ɲ", "Ŋ"]
+    lexicon_state = compile_lexicon(
+        {"entries": minimal_entries, "qa_pairs": {}, "special_chars": minimal_chars}, FUZZY_DISTANCE
+    )
+
+# Confiance minimale pour traiter une question comme du soussou (traduction locale d'abord)
+LANGID_THRESHOLD = float(os.getenv("NENE_LANGID_THRESHOLD", "0.8"))
+
+# Seuil de correspondance avec les questions prédéfinies (casse, accents, ponctuation, fautes légères)
+QA_MATCH_THRESHOLD = float(os.getenv("NENE_QA_THRESHOLD", str(QA_DEFAULT_THRESHOLD)))
+
+# Les blocs statiques des system prompts sont mis en cache côté Anthropic (désactivable via NENE_PROMPT_CACHING=0)
+PROMPT_CACHING = os.getenv("NENE_PROMPT_CACHING", "1") != "0"
+REFERENCE_GLOSSARY_SIZE = int(os.getenv("NENE_REFERENCE_GLOSSARY_SIZE", "300"))
+
+# Structures construites à partir du lexique compilé, en plus de celles de l'instantané
+def prepare_lexicon(state):
+    return {
+        **state,
+        "qa_index": QAIndex(state["qa_pairs"]),
+        "prompts": build_prompts(
+            state["soussou_to_french"],
+            state["qa_pairs"],
+            glossary_size=REFERENCE_GLOSSARY_SIZE,
+            caching=PROMPT_CACHING,
+        ),
+    }
+
+# État du lexique : un seul dictionnaire (lexicon_state), remplacé d'une seule affectation à chaque
+# rechargement. Chaque lecture commence par `state = lexicon_state` et n'utilise que cette référence :
+# une requête ne mélange jamais deux versions du lexique.
+#   soussou_to_french / french_to_soussou : meilleures traductions des entrées exactes
+#   soussou_index / french_index : index normalisés (orthographe ancienne "E"/"ç", tons, casse, ponctuation)
+#   soussou_engine / french_engine : moteurs de traduction, un trie par direction
+#   language_id : identification de la langue des questions (n-grammes de caractères, voir language_id.py)
+#   qa_pairs / qa_index : questions prédéfinies et leur index de recherche
+#   prompts : system prompts (consignes et glossaire de référence)
+lexicon_lock = threading.Lock()
+
+# Contributions reçues par ce processus (instant, soussou, français), jusqu'au rechargement qui les inclut
+recent_contributions = []
+
+# Ajouter une contribution aux structures d'un état du lexique
+# (une contribution a la priorité la plus haute : elle devient la meilleure traduction ; comme à la
+# construction du lexique, une paire déjà vue est remplacée et non cumulée, la réappliquer est sans effet)
+def apply_contribution(state, soussou_text, french_text):
+    state["soussou_table"].add(soussou_text, french_text, CONTRIBUTION_PRIORITY, merge=False)
+    state["french_table"].add(french_text, soussou_text, CONTRIBUTION_PRIORITY, merge=False)
+    state["soussou_to_french"][soussou_text] = french_text
+    state["french_to_soussou"][french_text] = soussou_text
+    state["soussou_index"].add(soussou_text, french_text)
+    state["french_index"].add(french_text, soussou_text)
+    state["soussou_engine"].add(soussou_text, french_text)
+    state["french_engine"].add(french_text, soussou_text)
+
+# Installer un nouveau lexique (au démarrage et à chaque rechargement)
+# Le nouveau lexique est entièrement construit avant l'échange : une requête en cours garde l'ancien
+# `since` : instant (time.monotonic) où la lecture des sources a commencé ; les contributions reçues
+# depuis ne sont peut-être pas dans `state` et y sont ajoutées avant l'échange
+def install_lexicon(state, since=None):
+    global lexicon_state
+    
+    with lexicon_lock:
+        if since is not None:
+            recent_contributions[:] = [item for item in recent_contributions if item[0] >= since]
+            for _, soussou_text, french_text in recent_contributions:
+                apply_contribution(state, soussou_text, french_text)
+        lexicon_state = state
+
+install_lexicon(prepare_lexicon(lexicon_state))
+
+# Ajouter au lexique courant les contributions lues dans le journal, dans leur ordre d'écriture
+# (celles de ce processus y sont déjà : les réappliquer dans l'ordre du journal ne change rien)
+def overlay_contributions(records):
+    with lexicon_lock:
+        state = lexicon_state
+        for record in records:
+            apply_contribution(state, record["soussou"], record["francais"])
+
+# Rechargement à chaud quand les sources changent sur disque (toutes les NENE_RELOAD_INTERVAL secondes, 0 pour désactiver) ;
+# reconstruction une fois les sources stables depuis NENE_RELOAD_DEBOUNCE secondes
+lexicon_watcher = LexiconWatcher(
+    lambda state, since: install_lexicon(prepare_lexicon(state), since),
+    on_contributions=overlay_contributions,
+    fuzzy_distance=FUZZY_DISTANCE,
+    interval=float(os.getenv("NENE_RELOAD_INTERVAL", "5")),
+    debounce=float(os.getenv("NENE_RELOAD_DEBOUNCE", "1")),
+)
+metrics.register_stats("lexicon_reload", lexicon_watcher.stats)
+metrics.register_stats("lexicon", lambda: {"entries": lexicon_state["entries"], "qa_pairs": len(lexicon_state["qa_pairs"])})
+
+# Système de traduction avancé soussou-français
+@metrics.timed("translation_seconds", direction="soussou_to_french")
+def translate_soussou_to_french(text):
+    state = lexicon_state
+    
+    # Vérifier d'abord les phrases complètes
+    if text in state["soussou_to_french"]:
+        return state["soussou_to_french"][text]
+    
+    # Puis la phrase complète sous sa forme normalisée ("hɛri xi" pour "HEri xi?")
+    normalized_match = state["soussou_index"].get(text)
+    if normalized_match is not None:
+        return normalized_match
+    
+    # Segmentation au plus long : expressions connues, puis mots, puis texte recopié
+    return state["soussou_engine"].translate(text)
+
+# Système de traduction français-soussou
+@metrics.timed("translation_seconds", direction="french_to_soussou")
+def translate_french_to_soussou(text):
+    state = lexicon_state
+    
+    # Vérifier d'abord les phrases complètes
+    if text in state["french_to_soussou"]:
+        return state["french_to_soussou"][text]
+    
+    # Puis la phrase complète sous sa forme normalisée
+    normalized_match = state["french_index"].get(text)
+    if normalized_match is not None:
+        return normalized_match
+    
+    # Segmentation au plus long : expressions connues, puis mots, puis texte recopié
+    return state["french_engine"].translate(text)
+
+# Fonction de traduction correspondant à une paire de langues (None si la langue ne change pas)
+def translation_function(source, target):
+    if source == "Soussou" and target == "Français":
+        return translate_soussou_to_french
+    elif source == "Français" and target == "Soussou":
+        return translate_french_to_soussou
+    return None
+
+# Traduction par lot : chaque texte distinct n'est traduit qu'une fois
+def translate_batch(texts, source, target):
+    translate = translation_function(source, target)
+    if translate is None:
+        return list(texts)
+    
+    translations = {}
+    results = []
+    for text in texts:
+        if text not in translations:
+            translations[text] = translate(text) if text.strip() else text
+        results.append(translations[text])
+    return results
+
+# Lire les textes d'un fichier : .csv (colonne "texte"/"text" ou première colonne) ou une phrase par ligne
+def read_texts_from_file(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if not path.lower().endswith(".csv"):
+            return [line.rstrip("\r\n") for line in f]
+        
+        rows = list(csv.reader(f))
+    
+    if not rows:
+        return []
+    header = [cell.strip().lower() for cell in rows[0]]
+    for name in ("texte", "text", "source"):
+        if name in header:
+            column = header.index(name)
+            return [row[column] if column < len(row) else "" for row in rows[1:]]
+    return [row[0] if row else "" for row in rows]
+
+# Traduire une liste de textes vers un fichier CSV téléchargeable, en signalant la progression
+# Le fichier n'existe que jusqu'à la reprise du générateur après le dernier résultat (ou sa fermeture) :
+# Gradio en a alors déjà fait une copie dans son cache, l'original temporaire est supprimé
+def translate_texts_to_file(texts, source, target, chunk_size=2000):
+    output = tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", newline="", suffix=".csv", prefix="nene_traductions_", delete=False
+    )
+    try:
+        with output:
+            writer = csv.writer(output)
+            writer.writerow(["source", "traduction"])
+            
+            for start in range(0, len(texts), chunk_size):
+                chunk = texts[start:start + chunk_size]
+                writer.writerows(zip(chunk, translate_batch(chunk, source, target)))
+                done = start + len(chunk)
+                if done < len(texts):
+                    yield f"⏳ {done}/{len(texts)} textes traduits...", None
+        
+        yield f"✅ {len(texts)} textes traduits", output.name
+    finally:
+        os.remove(output.name)
+
+# Activer la diffusion des réponses de Claude au fil de l'eau (désactivable via NENE_STREAMING=0)
+STREAMING_ENABLED = os.getenv("NENE_STREAMING", "1") != "0"
+
+# Fin de phrase suivie d'un espace : on peut traduire tout ce qui précède sans couper un nombre ("13.5")
+SENTENCE_END = re.compile(r'[.!?](?=\s)')
+
+# Message par défaut si le texte est vide
+def empty_question_message(language="french"):
+    if language == "english":
+        return "I need more information to help you. Could you please provide more details?"
+    return "J'ai besoin de plus d'informations pour vous aider. Pourriez-vous fournir plus de détails?"
+
+# Message d'erreur renvoyé à l'utilisateur si l'appel à Claude échoue
+def claude_error_message(error, language="french"):
+    if language == "english":
+        return f"Error communicating with Claude: {str(error)}"
+    return f"Erreur lors de la communication avec Claude: {str(error)}"
+
+# Seuil plus tolérant pour proposer une réponse prédéfinie quand Claude est indisponible
+QA_FALLBACK_THRESHOLD = float(os.getenv("NENE_QA_FALLBACK_THRESHOLD", "0.5"))
+
+# L'API est saturée ou injoignable, ou le budget de jetons est épuisé (par opposition à une requête invalide)
+def is_degraded(error):
+    return isinstance(error, (CircuitOpenError, BudgetExceededError)) or is_retryable(error)
+
+# Erreur comptée par étape et par classe d'exception (route /metrics)
+def record_error(stage, error):
+    metrics.inc("errors_total", stage=stage, error=type(error).__name__)
+
+# Réponse locale quand Claude est indisponible : la question prédéfinie la plus proche, s'il y en a une
+def local_answer(text, language="french"):
+    metrics.inc("local_answers_total", language=language)
+    state = lexicon_state
+    matched_question = state["qa_index"].match(text, QA_FALLBACK_THRESHOLD)
+    if language == "english":
+        notice = "Claude is temporarily unavailable."
+        if matched_question is None:
+            return notice + " Please try again in a few moments."
+        return f"{notice} Closest answer from our knowledge base:\n\n{state['qa_pairs'][matched_question]['english']}"
+    
+    notice = "Claude est momentanément indisponible."
+    if matched_question is None:
+        return notice + " Veuillez réessayer dans quelques instants."
+    return f"{notice} Réponse la plus proche de notre base :\n\n{state['qa_pairs'][matched_question][language]}"
+
+# Plan d'un appel à Claude : type de requête, modèle, max_tokens et session débitée
+def claude_plan(question, soussou=False, session=None):
+    kind = request_type(question, soussou)
+    return {"type": kind, **CLAUDE_POLICIES[kind], "session": session}
+
+# Paramètres communs aux appels Claude (bloquant ou en streaming)
+# `conversation` : (résumé, messages) des tours précédents, voir conversation.build_context
+# `plan` : voir claude_plan (par défaut, question factuelle sans session)
+def build_claude_request(text, language="french", system_prompt=None, conversation=None, plan=None):
+    # Configuration du message pour Claude
+    if language == "english" and not isinstance(system_prompt, list):
+        # Pour avoir des réponses en anglais (les prompts du registre le précisent déjà)
+        if system_prompt:
+            system_prompt += " Please respond in English."
+        else:
+            system_prompt = "Please respond in English."
+    
+    summary, previous_messages = conversation or (None, [])
+    policy = plan or CLAUDE_POLICIES[FACTUAL]
+    request = {
+        "model": policy["model"],
+        "max_tokens": policy["max_tokens"],
+        "messages": previous_messages + [{"role": "user", "content": text}],
+    }
+    
+    # Le résumé des anciens échanges suit les blocs en cache du system prompt
+    if summary:
+        if isinstance(system_prompt, list):
+            system_prompt = system_prompt + [text_block(summary)]
+        elif system_prompt:
+            system_prompt = [text_block(system_prompt), text_block(summary)]
+        else:
+            system_prompt = summary
+    
+    # Ajouter un system prompt si fourni
+    if system_prompt:
+        request["system"] = system_prompt
+    
+    return request
+
+# Clé de cache d'une requête Claude (question normalisée, langue, system prompt, modèle, tours précédents)
+def claude_cache_key(text, language, request):
+    context = "\n".join(f"{message['role']}: {message['content']}" for message in request["messages"][:-1])
+    return make_key(text, language, system_text(request.get("system")), request["model"], context)
+
+# Jetons facturés pour une réponse de Claude (response.usage), comptés par type
+def record_usage(usage, model):
+    tokens = {
+        "input": usage.input_tokens,
+        "output": usage.output_tokens,
+        "cache_creation": getattr(usage, "cache_creation_input_tokens", None) or 0,
+        "cache_read": getattr(usage, "cache_read_input_tokens", None) or 0,
+    }
+    for kind, count in tokens.items():
+        if count:
+            metrics.inc("claude_tokens_total", count, model=model, type=kind)
+    return tokens
+
+# Durée et issue d'un appel à Claude commencé à `start` (time.perf_counter)
+def record_claude_call(mode, model, start, error=None, tokens=None, first_token=None):
+    duration = time.perf_counter() - start
+    if error is None:
+        outcome = "ok"
+    elif isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+        outcome = "cancelled"
+    else:
+        outcome = type(error).__name__
+    metrics.observe("claude_seconds", duration, mode=mode)
+    metrics.inc("claude_requests_total", mode=mode, outcome=outcome)
+    metrics.event("claude_call", mode=mode, model=model, outcome=outcome, seconds=round(duration, 4),
+                  first_token_seconds=None if first_token is None else round(first_token, 4), tokens=tokens)
+
+# Réserver dans le budget le coût maximal d'une requête : prompt estimé et max_tokens
+def reserve_budget(request, session):
+    prompt = (system_text(request.get("system")) or "") + "".join(message["content"] for message in request["messages"])
+    return token_budget.reserve(session, estimate_tokens(prompt) + request["max_tokens"])
+
+# Remplacer la réservation d'un appelant par l'usage réel de l'appel (rien n'est facturé pour un
+# appel en échec) ; un appel regroupé est imputé à chaque session, mais une seule fois au budget global
+def settle_budget(session, reserved, usage):
+    tokens = usage.get("tokens")
+    token_budget.settle(session, reserved, billed_tokens(tokens) if tokens else 0, shared=usage.get("shared", False))
+
+# Appel bloquant à Claude (le résultat complet est mis en cache, l'usage est noté dans `usage`)
+async def create_claude_answer(request, cache_key, usage):
+    async def attempt():
+        async with claude_slots():
+            return await client.messages.create(**request)
+    
+    tokens = None
+    start = time.perf_counter()
+    try:
+        response = await claude_calls.call(attempt)
+        tokens = usage["tokens"] = record_usage(response.usage, request["model"])
+    except BaseException as e:
+        record_claude_call("blocking", request["model"], start, e)
+        raise
+    record_claude_call("blocking", request["model"], start, tokens=tokens)
+    answer = response.content[0].text
+    await response_cache.aset(cache_key, answer)
+    return answer
+
+# Appel à Claude en streaming (seules les réponses complètes sont mises en cache, l'usage est noté dans `usage`)
+async def stream_claude_answer(request, cache_key, usage):
+    async def attempt():
+        async with claude_slots():
+            async with client.messages.stream(**request) as stream:
+                async for delta in stream.text_stream:
+                    yield delta
+                usage["tokens"] = record_usage((await stream.get_final_message()).usage, request["model"])
+    
+    start = time.perf_counter()
+    first_token = None
+    received = []
+    try:
+        async for delta in claude_calls.stream(attempt):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+                metrics.observe("claude_first_token_seconds", first_token)
+            received.append(delta)
+            yield delta
+    except BaseException as e:
+        record_claude_call("stream", request["model"], start, e, first_token=first_token)
+        raise
+    record_claude_call("stream", request["model"], start, tokens=usage.get("tokens"), first_token=first_token)
+    await response_cache.aset(cache_key, "".join(received))
+
+# Réponse complète de Claude, depuis le cache ou en partageant un appel identique déjà en cours
+# (les erreurs sont propagées à l'appelant)
+async def fetch_claude_answer(text, language="french", system_prompt=None, conversation=None, plan=None):
+    request = build_claude_request(text, language, system_prompt, conversation, plan)
+    cache_key = claude_cache_key(text, language, request)
+    with metrics.timer("stage_seconds", stage="cache"):
+        cached = await response_cache.aget(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Chaque appelant réserve son budget avant de rejoindre un appel identique déjà en cours
+    session = plan["session"] if plan else None
+    reserved = reserve_budget(request, session)
+    usage = {}
+    try:
+        return await claude_flights.run(cache_key, lambda: create_claude_answer(request, cache_key, usage), usage)
+    finally:
+        settle_budget(session, reserved, usage)
+
+# Fragments de la réponse de Claude, depuis le cache ou en partageant un appel identique déjà en cours
+# (les erreurs sont propagées à l'appelant)
+async def stream_claude_deltas(text, language="french", system_prompt=None, conversation=None, plan=None):
+    request = build_claude_request(text, language, system_prompt, conversation, plan)
+    cache_key = claude_cache_key(text, language, request)
+    with metrics.timer("stage_seconds", stage="cache"):
+        cached = await response_cache.aget(cache_key)
+    if cached is not None:
+        yield cached
+        return
+    
+    # Chaque appelant réserve son budget, puis reçoit les fragments d'un appel identique déjà en cours
+    session = plan["session"] if plan else None
+    reserved = reserve_budget(request, session)
+    usage = {}
+    try:
+        async for delta in claude_flights.stream(cache_key, lambda: stream_claude_answer(request, cache_key, usage), usage):
+            yield delta
+    finally:
+        settle_budget(session, reserved, usage)
+
+# Traitement avec Claude (version corrigée)
+async def process_with_claude(text, language="french", system_prompt=None, conversation=None, plan=None):
+    try:
+        # Vérifier que le texte n'est pas vide
+        if not text or text.strip() == "":
+            # Retourner un message par défaut si le texte est vide
+            return empty_question_message(language)
+        
+        return await fetch_claude_answer(text, language, system_prompt, conversation, plan)
+    except Exception as e:
+        record_error("claude", e)
+        if is_degraded(e):
+            print(f"Claude indisponible, réponse locale: {e!r}")
+            return local_answer(text, language)
+        return claude_error_message(e, language)
+
+# Traitement avec Claude en streaming : produit les fragments de texte au fur et à mesure
+async def stream_with_claude(text, language="french", system_prompt=None, conversation=None, plan=None):
+    if not text or text.strip() == "":
+        yield empty_question_message(language)
+        return
+    
+    received = False
+    try:
+        async for delta in stream_claude_deltas(text, language, system_prompt, conversation, plan):
+            received = True
+            yield delta
+    except Exception as e:
+        record_error("claude", e)
+        # Ne pas mélanger un message d'erreur avec une réponse partielle déjà affichée
+        if received:
+            yield "\n\n"
+        elif is_degraded(e):
+            print(f"Claude indisponible, réponse locale: {e!r}")
+            yield local_answer(text, language)
+            return
+        yield claude_error_message(e, language)
+
+# Produire une valeur unique sous forme de flux asynchrone
+async def single_value_stream(value):
+    yield value
+
+# Traduire un flux de fragments français en soussou, phrase par phrase
+async def stream_french_to_soussou(deltas):
+    buffer = ""
+    translated = []
+    
+    async for delta in deltas:
+        buffer += delta
+        
+        # Traduire chaque phrase complète présente dans le tampon
+        start = 0
+        for match in SENTENCE_END.finditer(buffer):
+            translated.append(translate_french_to_soussou(buffer[start:match.end()].strip()))
+            start = match.end()
+        
+        if start:
+            buffer = buffer[start:]
+            yield " ".join(translated)
+    
+    # Traduire le reste du texte une fois le flux terminé
+    if buffer.strip():
+        translated.append(translate_french_to_soussou(buffer.strip()))
+    yield " ".join(translated)
+
+# Obtenir la réponse de Claude sous forme de textes partiels de plus en plus complets
+async def claude_answer_stream(text, language="french", system_prompt=None, to_soussou=False, conversation=None,
+                               plan=None):
+    if STREAMING_ENABLED:
+        deltas = stream_with_claude(text, language, system_prompt, conversation, plan)
+    else:
+        deltas = single_value_stream(await process_with_claude(text, language, system_prompt, conversation, plan))
+    
+    if to_soussou:
+        async for partial in stream_french_to_soussou(deltas):
+            yield partial
+        return
+    
+    answer = ""
+    async for delta in deltas:
+        answer += delta
+        yield answer
+
+# Budget en jetons des tours précédents renvoyés à Claude, et du résumé des plus anciens
+HISTORY_TOKENS = int(os.getenv("NENE_HISTORY_TOKENS", "1500"))
+HISTORY_SUMMARY_TOKENS = int(os.getenv("NENE_HISTORY_SUMMARY_TOKENS", "300"))
+
+# Nombre maximal d'entrées du glossaire propre à chaque question
+SOUSSOU_GLOSSARY_SIZE = int(os.getenv("NENE_SOUSSOU_GLOSSARY_SIZE", "30"))
+
+# Entrées du dictionnaire présentes telles quelles dans la question, sous forme de paires (soussou, français).
+# Seul le moteur de la langue détectée est consulté, sans correction approchée.
+def glossary_for(question, limit=SOUSSOU_GLOSSARY_SIZE):
+    state = lexicon_state
+    language, _ = state["language_id"].classify(question)
+    pairs = []
+    if language == SOUSSOU:
+        for _, source, value in state["soussou_engine"].segment(question, fuzzy=False):
+            if value is not None and value != source:
+                pairs.append((source, value))
+    elif language == FRENCH:
+        for _, source, value in state["french_engine"].segment(question, fuzzy=False):
+            if value is not None and value != source:
+                pairs.append((value, source))
+
+    # Garder l'ordre d'apparition sans doublons
+    return list(dict.fromkeys(pairs))[:limit]
+
+# System prompt soussou : consignes et glossaire de référence (en cache), puis glossaire de la question
+def soussou_system_prompt(question):
+    glossary = glossary_for(question)
+    context = None
+    if glossary:
+        context = "Glossaire soussou - français utile pour cette question :\n"
+        context += "\n".join(f"- {soussou} : {francais}" for soussou, francais in glossary)
+    return system_blocks(lexicon_state["prompts"], "soussou", context)
+
+# Réponse en soussou en un seul appel à Claude ; en cas d'échec, réponse française traduite localement
+async def soussou_answer_stream(question, fallback_question, conversation=None, plan=None):
+    system_prompt = soussou_system_prompt(question)
+    answer = ""
+    try:
+        if STREAMING_ENABLED:
+            async for delta in stream_claude_deltas(question, "soussou", system_prompt, conversation, plan):
+                answer += delta
+                yield answer
+        else:
+            answer = await fetch_claude_answer(question, "soussou", system_prompt, conversation, plan)
+            yield answer
+        return
+    except Exception as e:
+        record_error("claude", e)
+        # Une réponse partielle déjà affichée est conservée avec le message d'erreur
+        if answer:
+            yield answer + "\n\n" + claude_error_message(e)
+            return
+        # API saturée : inutile de la solliciter à nouveau pour la réponse en français
+        if is_degraded(e):
+            print(f"Claude indisponible, réponse locale: {e!r}")
+            yield local_answer(question, "soussou")
+            return
+        print(f"Réponse directe en soussou impossible, traduction locale: {e}")
+    
+    fallback_prompt = system_blocks(lexicon_state["prompts"], "guinea_french")
+    async for partial in claude_answer_stream(fallback_question, "french", fallback_prompt, True, conversation, plan):
+        yield partial
+
+# Fonction principale pour les questions-réponses avec effet de chargement
+def multilingual_chat_with_loading(question, history, output_language):
+    if not question.strip():  # Ignorer les messages vides
+        return history
+    
+    # Créer une nouvelle copie de l'historique pour éviter de modifier l'original
+    new_history = history.copy() if history else []
+    
+    # Ajouter la question de l'utilisateur à l'historique
+    new_history.append([question, "⏳ Traitement en cours..."])
+    
+    # Retourner immédiatement l'historique avec le message de chargement
+    return new_history
+
+# Aiguillage d'une question : (question prédéfinie équivalente ou None, question en soussou ?)
+# `state` : état du lexique déjà retenu par l'appelant (par défaut, l'état courant)
+@metrics.timed("stage_seconds", stage="routing")
+def route_question(question, state=None):
+    state = state or lexicon_state
+    
+    # Chercher une question prédéfinie équivalente
+    matched_question = state["qa_index"].match(question, QA_MATCH_THRESHOLD)
+
+    # Détecter si la question est en soussou
+    detected_language, confidence = state["language_id"].classify(question)
+    is_soussou = matched_question is not None or (detected_language == SOUSSOU and confidence >= LANGID_THRESHOLD)
+    return matched_question, is_soussou
+
+# Fonction pour traiter la réponse réelle avec support multilingue
+# (générateur asynchrone : produit l'historique mis à jour à chaque nouveau fragment de réponse)
+# `session` : identifiant de la session Gradio, débitée dans le budget de jetons
+async def process_response(question, history, output_language, session=None):
+    if not history:
+        yield history
+        return
+    
+    start = time.perf_counter()
+    state = lexicon_state
+    qa_pairs, prompts = state["qa_pairs"], state["prompts"]
+    matched_question, is_soussou = route_question(question, state)
+    route = "qa" if matched_question is not None else "soussou" if is_soussou else "direct"
+    
+    # Tours précédents de la conversation, dans une fenêtre bornée en jetons
+    with metrics.timer("stage_seconds", stage="context"):
+        conversation = build_context(history[:-1], HISTORY_TOKENS, HISTORY_SUMMARY_TOKENS)
+    
+    # Modèle, longueur maximale de réponse et session débitée selon le type de requête
+    plan = claude_plan(question, is_soussou, session)
+    
+    # Préparer la réponse
+    answers = single_value_stream("")
+    
+    # Questions prédéfinies
+    if matched_question is not None:
+        if output_language == "Français":
+            answers = single_value_stream(qa_pairs[matched_question]["french"])
+        elif output_language == "English":
+            answers = single_value_stream(qa_pairs[matched_question]["english"])
+        elif output_language == "Soussou":
+            answers = single_value_stream(qa_pairs[matched_question]["soussou"])
+    
+    # Traitement pour les questions en soussou
+    elif is_soussou:
+        # Traduire la question en français
+        french_question = translate_soussou_to_french(question)
+        
+        # Obtenir la réponse dans la langue demandée
+        if output_language == "Français":
+            answers = claude_answer_stream(french_question, "french", system_blocks(prompts, "guinea_french"),
+                                           conversation=conversation, plan=plan)
+        elif output_language == "English":
+            answers = claude_answer_stream(french_question, "english", system_blocks(prompts, "guinea_english"),
+                                           conversation=conversation, plan=plan)
+        elif output_language == "Soussou":
+            # Répondre directement en soussou, avec le glossaire et des exemples du corpus
+            # (repli : réponse en français traduite localement phrase par phrase)
+            answers = soussou_answer_stream(question, french_question, conversation, plan)
+    
+    # Pour les questions en français ou anglais (on les passe directement à Claude)
+    else:
+        if output_language == "Français":
+            answers = claude_answer_stream(question, "french", system_blocks(prompts, "guinea_french"),
+                                           conversation=conversation, plan=plan)
+        elif output_language == "English":
+            answers = claude_answer_stream(question, "english", system_blocks(prompts, "guinea_english"),
+                                           conversation=conversation, plan=plan)
+        elif output_language == "Soussou":
+            # Répondre directement en soussou (repli : réponse en français traduite localement)
+            answers = soussou_answer_stream(question, question, conversation, plan)
+    
+    # Indiquer l'étape en cours avant l'appel à Claude (les réponses prédéfinies s'affichent directement)
+    if matched_question is None:
+        if is_soussou and output_language != "Soussou":
+            history[-1][1] = "⏳ Question traduite, Claude rédige la réponse..."
+        else:
+            history[-1][1] = "⏳ Claude rédige la réponse..."
+        yield history
+    
+    # Mettre à jour le dernier message à chaque fragment reçu
+    first_answer = None
+    try:
+        async for partial in answers:
+            if first_answer is None and partial:
+                first_answer = time.perf_counter() - start
+                metrics.observe("turn_first_answer_seconds", first_answer, route=route)
+            history[-1][1] = partial
+            yield history
+    finally:
+        duration = time.perf_counter() - start
+        metrics.observe("turn_seconds", duration, route=route, language=output_language)
+        metrics.event("chat_turn", route=route, type=plan["type"], language=output_language,
+                      seconds=round(duration, 4),
+                      first_answer_seconds=None if first_answer is None else round(first_answer, 4),
+                      previous_turns=len(history) - 1)
+
+# Taille du journal des contributions (en octets) au-delà de laquelle il est compacté (data/contributions.json)
+COMPACT_JOURNAL_BYTES = int(os.getenv("NENE_COMPACT_JOURNAL_BYTES", str(256 * 1024)))
+
+# Ajouter une traduction au lexique en mémoire et au journal des contributions
+# (ValueError si l'un des textes est vide ; une erreur d'écriture du journal est propagée)
+@metrics.timed("contribution_seconds")
+def contribute(soussou_text, french_text):
+    if not soussou_text or not french_text:
+        raise ValueError("Les deux champs doivent être remplis")
+    
+    # Enregistrer dans le journal des contributions (ajout en fin de fichier, coût constant)
+    # Les autres processus la chargent au prochain rechargement à chaud du lexique
+    try:
+        append_contribution(soussou_text, french_text)
+    except Exception as e:
+        record_error("contribution", e)
+        raise
+    
+    # Ajouter au lexique en mémoire, sous le verrou des rechargements : la contribution est écrite dans
+    # l'état courant, et reportée dans le suivant s'il a été lu avant l'écriture du journal
+    with lexicon_lock:
+        recent_contributions.append((time.monotonic(), soussou_text, french_text))
+        apply_contribution(lexicon_state, soussou_text, french_text)
+    
+    # Compacter régulièrement le journal (les contributions compactées gardent leur priorité)
+    if journal_size() > COMPACT_JOURNAL_BYTES:
+        try:
+            compact_contributions()
+        except Exception as e:
+            record_error("compaction", e)
+            print(f"Erreur lors de la compaction des contributions: {e}")
+
+# Fonction pour ajouter une nouvelle traduction au dictionnaire
+def add_translation_pair(soussou_text, french_text):
+    """Ajoute une nouvelle paire de traduction au dictionnaire"""
+    try:
+        contribute(soussou_text, french_text)
+    except ValueError as e:
+        return str(e)
+    except Exception as e:
+        return f"Erreur lors de l'enregistrement : {str(e)}"
+    
+    return "Traduction ajoutée avec succès !"
@@ -0,0 +1,99 @@
+"""
+Recherche approximative de mots du dictionnaire (fautes de frappe, lettres oubliées).
+
+Index à la manière de SymSpell : chaque mot est enregistré sous toutes les formes obtenues en
+supprimant jusqu'à `max_distance` caractères. Une requête génère ses propres suppressions, ce qui
+donne en quelques accès dictionnaire une courte liste de candidats, vérifiés ensuite par une
+distance d'édition bornée (transpositions comprises).
+"""
+from itertools import combinations
+
+
+def edit_distance(a, b, limit):
+    """Distance de Damerau-Levenshtein (transpositions adjacentes), ou limit + 1 si elle dépasse `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_minimum = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_minimum = min(row_minimum, value)
+        if row_minimum > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+def allowed_distance(word, max_distance):
+    """Distance tolérée selon la longueur du mot : aucune faute sur les mots courts (5 lettres ou moins)."""
+    if len(word) <= 5:
+        return 0
+    if len(word) <= 7:
+        return min(1, max_distance)
+    return max_distance
+
+
+def deletes(word, distance):
+    """Toutes les formes de `word` privées de 1 à `distance` caractères."""
+    variants = set()
+    for count in range(1, min(distance, len(word) - 1) + 1):
+        for positions in combinations(range(len(word)), count):
+            variants.add("".join(ch for i, ch in enumerate(word) if i not in positions))
+    return variants
+
+
+class FuzzyIndex:
+    def __init__(self, words=(), max_distance=2):
+        self.max_distance = max_distance
+        self.words = set()
+        self.variants = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if not word or word in self.words:
+            return
+        self.words.add(word)
+        for variant in deletes(word, self.max_distance) | {word}:
+            self.variants.setdefault(variant, []).append(word)
+
+    def lookup(self, word):
+        """Mot connu le plus proche de `word` dans la distance tolérée, ou None."""
+        if word in self.words:
+            return word
+        limit = allowed_distance(word, self.max_distance)
+        if limit == 0:
+            return None
+
+        candidates = set()
+        for variant in deletes(word, limit) | {word}:
+            candidates.update(self.variants.get(variant, ()))
+
+        best, best_distance = None, limit + 1
+        # Tri pour un choix déterministe entre candidats à égale distance
+        for candidate in sorted(candidates):
+            distance = edit_distance(word, candidate, limit)
+            if distance < best_distance:
+                best, best_distance = candidate, distance
+        return best
+
+    def scan(self, word):
+        """Même résultat que `lookup`, par comparaison avec tous les mots (référence des benchmarks)."""
+        if word in self.words:
+            return word
+        limit = allowed_distance(word, self.max_distance)
+        if limit == 0:
+            return None
+        best, best_distance = None, limit + 1
+        for candidate in sorted(self.words):
+            distance = edit_distance(word, candidate, limit)
+            if distance < best_distance:
+                best, best_distance = candidate, distance
+        return best
@@ -0,0 +1,89 @@
+"""
+Identification de la langue d'une question : soussou, français ou anglais.
+
+Classifieur bayésien naïf sur les n-grammes de caractères (1 à 3 caractères, mots entourés
+d'espaces), entraîné sur les corpus du dépôt : les deux côtés du dictionnaire, les réponses
+prédéfinies et un petit corpus anglais (data/english_samples.txt). Les lettres propres au
+soussou (ɛ, ɔ, ɲ...) et les terminaisons typiques de chaque langue suffisent à départager des
+mots courts partagés comme « Guinée », « Tana » ou « I ».
+
+La classification d'une question prend quelques dizaines de microsecondes et renvoie une
+confiance (probabilité a posteriori, priors uniformes).
+"""
+import math
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+SOUSSOU, FRENCH, ENGLISH = "soussou", "french", "english"
+
+
+def normalize_text(text):
+    return " ".join(unicodedata.normalize("NFC", text or "").casefold().split())
+
+
+def text_ngrams(text, max_n=3):
+    """N-grammes de caractères de 1 à `max_n` du texte normalisé, bordé d'espaces."""
+    text = f" {normalize_text(text)} "
+    return [text[i:i + n] for n in range(1, max_n + 1) for i in range(len(text) - n + 1)]
+
+
+class LanguageIdentifier:
+    def __init__(self, samples, max_n=3, alpha=0.5):
+        """`samples` : textes d'entraînement par langue, {langue: [texte, ...]}."""
+        self.max_n = max_n
+        counts = {}
+        for language, texts in samples.items():
+            counter = Counter()
+            for text in texts:
+                counter.update(text_ngrams(text, max_n))
+            if counter:
+                counts[language] = counter
+        self.languages = list(counts)
+
+        vocabulary = sorted(set().union(*counts.values())) if counts else []
+        self.rows = {ngram: row for row, ngram in enumerate(vocabulary)}
+        # Log-probabilités lissées (Laplace) de chaque n-gramme, une colonne par langue
+        self.weights = np.zeros((len(vocabulary), len(self.languages)), dtype=np.float32)
+        for column, language in enumerate(self.languages):
+            counter = counts[language]
+            denominator = math.log(sum(counter.values()) + alpha * len(vocabulary))
+            self.weights[:, column] = [math.log(counter[ngram] + alpha) - denominator for ngram in vocabulary]
+
+    def scores(self, text):
+        """Log-vraisemblance du texte pour chaque langue (n-grammes jamais vus ignorés)."""
+        rows = [self.rows[ngram] for ngram in text_ngrams(text, self.max_n) if ngram in self.rows]
+        if not rows:
+            return None
+        return self.weights[rows].sum(axis=0, dtype=np.float64)
+
+    def probabilities(self, text):
+        """Probabilité a posteriori de chaque langue, {langue: probabilité}, ou {} si rien n'est reconnu."""
+        scores = self.scores(text)
+        if scores is None:
+            return {}
+        exp = np.exp(scores - scores.max())
+        return dict(zip(self.languages, (exp / exp.sum()).tolist()))
+
+    def classify(self, text):
+        """(langue la plus probable, confiance), ou (None, 0.0) si le texte n'a aucun n-gramme connu."""
+        scores = self.scores(text)
+        if scores is None:
+            return None, 0.0
+        best = int(scores.argmax())
+        confidence = 1.0 / float(np.exp(scores - scores[best]).sum())
+        return self.languages[best], confidence
+
+
+def training_samples(entries, qa_pairs, english_samples=()):
+    """Textes d'entraînement par langue à partir du lexique."""
+    samples = {SOUSSOU: [], FRENCH: [], ENGLISH: list(english_samples)}
+    for soussou, francais, *_ in entries:
+        samples[SOUSSOU].append(soussou)
+        samples[FRENCH].append(francais)
+    for question, answers in qa_pairs.items():
+        samples[SOUSSOU] += [question, answers.get("soussou", "")]
+        samples[FRENCH].append(answers.get("french", ""))
+        samples[ENGLISH].append(answers.get("english", ""))
+    return samples
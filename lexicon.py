@@ -0,0 +1,295 @@
+"""
+Construction du lexique compilé de Nènè.
+
+Fusionne toutes les sources de données du dépôt en un seul lexique compact :
+  - data/soussou_french_dictionary.json  (dictionnaire de référence)
+  - clean_big_data_soussou_francais.json (dataset nettoyé et contributions)
+  - data/additional_words.json           (mots ajoutés à la main, français -> soussou)
+  - data/qa_pairs.json                   (questions-réponses prédéfinies)
+  - data/special_chars.json              (caractères du clavier soussou)
+  - data/english_samples.txt             (phrases anglaises pour l'identification de la langue)
+  - data/contributions.json              (contributions compactées, voir contributions.py)
+  - data/contributions.jsonl             (contributions pas encore compactées)
+Les deux fichiers de contributions sont propres à chaque instance et ignorés par git ; absents,
+ils sont simplement sautés.
+
+Les paires identiques sont dédoublonnées en comptant le nombre de sources où elles apparaissent ;
+un même mot avec plusieurs traductions garde toutes ses traductions et est signalé comme conflit.
+Les sources sont listées par priorité croissante : l'application retient la traduction de la
+source la plus prioritaire, puis la plus fréquente (voir translation_table.py).
+
+Au démarrage, App.py charge un instantané binaire (data/lexicon.snapshot) qui contient le lexique
+et toutes les structures de recherche déjà construites (dictionnaires, index normalisés, tries).
+L'instantané porte l'empreinte SHA-256 des sources : il n'est reconstruit que si l'une d'elles change.
+
+    python lexicon.py [--report conflits.json]   # écrit aussi data/lexicon.json pour consultation
+    python lexicon.py --snapshot [--fuzzy-distance 2]   # met à jour l'instantané (voir lexicon_watcher.py)
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import re
+
+from contributions import DATASET_PATH as CONTRIBUTIONS_PATH, JOURNAL_PATH, read_contributions
+from language_id import LanguageIdentifier, training_samples
+from orthography import NormalizedIndex, normalize_french, normalize_soussou, strip_marks
+from translation_engine import PhraseTranslator
+from translation_table import TranslationTable
+
+LEXICON_PATH = os.path.join("data", "lexicon.json")
+LEXICON_VERSION = 3
+
+SNAPSHOT_PATH = os.path.join("data", "lexicon.snapshot")
+# À incrémenter dès que le contenu de compile_lexicon change
+SNAPSHOT_VERSION = 5
+
+DICTIONARY_SOURCES = [
+    os.path.join("data", "soussou_french_dictionary.json"),
+    "clean_big_data_soussou_francais.json",
+]
+ADDITIONAL_WORDS_PATH = os.path.join("data", "additional_words.json")
+QA_PAIRS_PATH = os.path.join("data", "qa_pairs.json")
+SPECIAL_CHARS_PATH = os.path.join("data", "special_chars.json")
+ENGLISH_SAMPLES_PATH = os.path.join("data", "english_samples.txt")
+
+SOURCE_PATHS = DICTIONARY_SOURCES + [
+    ADDITIONAL_WORDS_PATH, CONTRIBUTIONS_PATH, JOURNAL_PATH, QA_PAIRS_PATH, SPECIAL_CHARS_PATH, ENGLISH_SAMPLES_PATH,
+]
+
+# Priorité des sources de traductions, croissante : les contributions, compactées ou non, passent avant tout
+CONTRIBUTION_SOURCES = [CONTRIBUTIONS_PATH, JOURNAL_PATH]
+SOURCE_PRIORITY = {source: priority for priority, source in enumerate(
+    DICTIONARY_SOURCES + [ADDITIONAL_WORDS_PATH] + CONTRIBUTION_SOURCES
+)}
+CONTRIBUTION_PRIORITY = SOURCE_PRIORITY[JOURNAL_PATH]
+
+
+def clean_text(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def _read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _read_lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _collect_conflicts(entries, key_index, value_index):
+    table = TranslationTable()
+    sources = {}
+    for entry in entries:
+        soussou, francais, source, count = entry
+        table.add(entry[key_index], entry[value_index], SOURCE_PRIORITY[source], count)
+        sources[(entry[key_index], entry[value_index])] = source
+    return [
+        {
+            "text": text,
+            "translations": [{"translation": t, "source": sources[(text, t)]} for t in table.translations(text)],
+            "kept": table.best(text),
+        }
+        for text in table.candidates
+        if len(table.candidates[text]) > 1
+    ]
+
+
+def build_lexicon(root="."):
+    """Fusionne les sources et renvoie (lexique, rapport)."""
+    entries = []
+    seen = {}
+    report = {"sources": {}, "duplicates": 0, "skipped": 0}
+
+    def add(soussou, francais, source):
+        soussou, francais = clean_text(soussou), clean_text(francais)
+        if not soussou or not francais:
+            report["skipped"] += 1
+            return
+        pair = (soussou, francais)
+        count = 1
+        if pair in seen:
+            # La paire déjà vue prend la priorité de la source la plus récente et compte une occurrence de plus ;
+            # une contribution n'hérite pas des occurrences : entre contributions, la plus récente l'emporte
+            report["duplicates"] += 1
+            if source not in CONTRIBUTION_SOURCES:
+                count += entries[seen[pair]][3]
+            entries[seen[pair]] = None
+        seen[pair] = len(entries)
+        entries.append([soussou, francais, source, count])
+
+    for source in DICTIONARY_SOURCES:
+        items = _read_json(os.path.join(root, source), [])
+        report["sources"][source] = len(items)
+        for item in items:
+            add(item.get("soussou"), item.get("francais") or item.get("français"), source)
+
+    additional_words = _read_json(os.path.join(root, ADDITIONAL_WORDS_PATH), {})
+    report["sources"][ADDITIONAL_WORDS_PATH] = len(additional_words)
+    for francais, soussou in additional_words.items():
+        add(soussou, francais, ADDITIONAL_WORDS_PATH)
+
+    compacted = _read_json(os.path.join(root, CONTRIBUTIONS_PATH), [])
+    contributions = read_contributions(os.path.join(root, JOURNAL_PATH))
+    for source, records in ((CONTRIBUTIONS_PATH, compacted), (JOURNAL_PATH, contributions)):
+        report["sources"][source] = len(records)
+        for record in records:
+            add(record.get("soussou"), record.get("francais"), source)
+
+    entries = [entry for entry in entries if entry is not None]
+    qa_pairs = _read_json(os.path.join(root, QA_PAIRS_PATH), {})
+    special_chars = _read_json(os.path.join(root, SPECIAL_CHARS_PATH), [])
+    report["sources"][QA_PAIRS_PATH] = len(qa_pairs)
+    english_samples = _read_lines(os.path.join(root, ENGLISH_SAMPLES_PATH))
+    report["sources"][SPECIAL_CHARS_PATH] = len(special_chars)
+    report["sources"][ENGLISH_SAMPLES_PATH] = len(english_samples)
+
+    report["entries"] = len(entries)
+    report["soussou_conflicts"] = _collect_conflicts(entries, 0, 1)
+    report["french_conflicts"] = _collect_conflicts(entries, 1, 0)
+
+    lexicon = {
+        "version": LEXICON_VERSION,
+        # [soussou, français, priorité de la source, nombre d'occurrences]
+        "entries": [
+            [soussou, francais, SOURCE_PRIORITY[source], count] for soussou, francais, source, count in entries
+        ],
+        "qa_pairs": qa_pairs,
+        "special_chars": special_chars,
+        "english_samples": english_samples,
+    }
+    return lexicon, report
+
+
+def write_lexicon(lexicon, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(lexicon, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def sources_digest(root="."):
+    """Empreinte SHA-256 du contenu de toutes les sources."""
+    digest = hashlib.sha256()
+    for source in SOURCE_PATHS:
+        digest.update(source.encode("utf-8"))
+        path = os.path.join(root, source)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def sources_stamp(root="."):
+    """Date de modification et taille de chaque source : un changement déclenche le rechargement."""
+    stamp = []
+    for source in SOURCE_PATHS:
+        try:
+            info = os.stat(os.path.join(root, source))
+            stamp.append((source, info.st_mtime_ns, info.st_size))
+        except OSError:
+            stamp.append((source, None, None))
+    return tuple(stamp)
+
+
+def compile_lexicon(lexicon, fuzzy_distance=0):
+    """Construit les structures de recherche utilisées par l'application."""
+    entries = lexicon["entries"]
+    soussou_table = TranslationTable((soussou, francais, priority, count) for soussou, francais, priority, count in entries)
+    french_table = TranslationTable((francais, soussou, priority, count) for soussou, francais, priority, count in entries)
+    # Meilleure traduction de chaque texte, insérée par rang croissant dans les index normalisés
+    soussou_to_french = soussou_table.best_mapping()
+    french_to_soussou = french_table.best_mapping()
+    return {
+        "entries": len(entries),
+        "soussou_table": soussou_table,
+        "french_table": french_table,
+        "soussou_to_french": soussou_to_french,
+        "french_to_soussou": french_to_soussou,
+        "soussou_index": NormalizedIndex(soussou_to_french, normalize_soussou),
+        # Accents ignorés seulement si la forme accentuée est inconnue ("ecole" trouve "école")
+        "french_index": NormalizedIndex(french_to_soussou, normalize_french, fallback=strip_marks),
+        "soussou_engine": PhraseTranslator(soussou_to_french, normalize_soussou, fuzzy_distance),
+        "french_engine": PhraseTranslator(french_to_soussou, normalize_french, fuzzy_distance),
+        "qa_pairs": lexicon["qa_pairs"],
+        "special_chars": lexicon["special_chars"],
+        "language_id": LanguageIdentifier(
+            training_samples(entries, lexicon["qa_pairs"], lexicon.get("english_samples", []))
+        ),
+    }
+
+
+def _read_snapshot(path, fingerprint):
+    try:
+        with open(path, "rb") as f:
+            # L'en-tête est lu seul : inutile de charger un instantané périmé
+            if pickle.load(f) != fingerprint:
+                return None
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+
+def write_snapshot(state, fingerprint, path):
+    # Fichier temporaire propre au processus : plusieurs répliques peuvent reconstruire en même temps
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(fingerprint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_compiled_lexicon(path=SNAPSHOT_PATH, root=".", fuzzy_distance=0):
+    """Charge l'instantané du lexique, ou le reconstruit à partir des sources si elles ont changé."""
+    fingerprint = f"{SNAPSHOT_VERSION}:{fuzzy_distance}:{sources_digest(root)}"
+    state = _read_snapshot(path, fingerprint)
+    if state is not None:
+        return state
+
+    lexicon, _ = build_lexicon(root)
+    state = compile_lexicon(lexicon, fuzzy_distance)
+    try:
+        write_snapshot(state, fingerprint, path)
+    except OSError as e:
+        print(f"Impossible d'écrire l'instantané du lexique: {e}")
+    return state
+
+
+def print_report(report):
+    for source, count in report["sources"].items():
+        print(f"  {source}: {count}")
+    print(f"Entrées fusionnées : {report['entries']} ({report['duplicates']} doublons, {report['skipped']} vides)")
+    print(f"Conflits soussou -> français : {len(report['soussou_conflicts'])}")
+    print(f"Conflits français -> soussou : {len(report['french_conflicts'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construit le lexique compilé à partir des sources de données")
+    parser.add_argument("--output", default=LEXICON_PATH)
+    parser.add_argument("--report", help="fichier JSON où écrire le détail des conflits")
+    parser.add_argument("--snapshot", action="store_true", help="mettre à jour l'instantané si les sources ont changé")
+    parser.add_argument("--fuzzy-distance", type=int, default=0, help="distance de l'index approximatif (--snapshot)")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        state = load_compiled_lexicon(fuzzy_distance=args.fuzzy_distance)
+        print(f"Instantané à jour dans {SNAPSHOT_PATH} ({state['entries']} entrées)")
+        raise SystemExit(0)
+
+    lexicon, report = build_lexicon()
+    write_lexicon(lexicon, args.output)
+    print(f"Lexique écrit dans {args.output}")
+    print_report(report)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Rapport des conflits écrit dans {args.report}")
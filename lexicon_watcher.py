@@ -0,0 +1,149 @@
+"""
+Rechargement à chaud du lexique, sans redémarrer le serveur.
+
+Un thread surveille les sources du lexique (date de modification et taille). Quand l'une d'elles
+change (fichier JSON modifié, contribution ou compaction faite par une autre réplique), l'instantané
+est reconstruit dans un processus séparé, pour ne pas prendre le GIL aux requêtes en cours, puis
+chargé et passé à `on_reload(state, since)`, qui remplace d'un bloc les structures de recherche ;
+`since` (time.monotonic) est l'instant où la lecture des sources a commencé. Jusque-là, les requêtes
+continuent d'utiliser l'ancien lexique, qui n'est jamais modifié par le rechargement.
+
+Plusieurs répliques partageant le même dossier data/ se synchronisent ainsi : la première qui
+reconstruit l'instantané l'écrit, les autres le trouvent à jour et n'ont plus qu'à le lire.
+
+Les contributions ajoutées au journal par d'autres processus ne demandent pas de reconstruction :
+seules les lignes nouvelles sont lues et passées à `on_contributions(records)`, qui les ajoute au
+lexique courant. Les autres changements (compaction comprise) reconstruisent l'instantané, une fois
+les sources stables depuis `debounce` secondes : une rafale de modifications ne coûte qu'une
+reconstruction.
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from contributions import read_new_contributions
+from lexicon import JOURNAL_PATH, load_compiled_lexicon, sources_stamp
+
+LEXICON_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicon.py")
+
+
+def _journal_size(stamp):
+    return dict((source, size) for source, _, size in stamp)[JOURNAL_PATH] or 0
+
+
+def _without_journal(stamp):
+    return tuple(item for item in stamp if item[0] != JOURNAL_PATH)
+
+
+class LexiconWatcher:
+    def __init__(self, on_reload, on_contributions=None, fuzzy_distance=0, interval=5.0, debounce=1.0, root="."):
+        self.on_reload = on_reload
+        self.on_contributions = on_contributions
+        self.fuzzy_distance = fuzzy_distance
+        self.interval = interval
+        self.debounce = debounce
+        self.root = root
+        self.stamp = sources_stamp(root)
+        # Position dans le journal jusqu'à laquelle les contributions sont déjà dans le lexique
+        self.journal_offset = _journal_size(self.stamp)
+        # Relevé des sources (hors journal) en attente de reconstruction, et instant où il a été vu
+        self._pending = None
+        self._pending_since = None
+        self.reloads = 0
+        self.overlays = 0
+        self.failures = 0
+        self.last_duration = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def rebuild_snapshot(self):
+        """Reconstruit l'instantané dans un processus séparé."""
+        command = [sys.executable, LEXICON_SCRIPT, "--snapshot", "--fuzzy-distance", str(self.fuzzy_distance)]
+        result = subprocess.run(command, cwd=self.root, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"lexicon.py a échoué ({result.returncode})")
+
+    def reload(self):
+        start = time.perf_counter()
+        since = time.monotonic()
+        try:
+            self.rebuild_snapshot()
+            # L'instantané est à jour : le chargement se limite à sa lecture
+            state = load_compiled_lexicon(root=self.root, fuzzy_distance=self.fuzzy_distance)
+            self.on_reload(state, since)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"Erreur lors du rechargement du lexique: {e}")
+            return False
+        self.reloads += 1
+        self.last_duration = time.perf_counter() - start
+        print(f"Lexique rechargé en {self.last_duration:.2f} s: {state['entries']} entrées")
+        return True
+
+    def apply_journal(self):
+        """Ajoute au lexique courant les contributions écrites dans le journal depuis la dernière lecture."""
+        try:
+            records, self.journal_offset = read_new_contributions(
+                self.journal_offset, os.path.join(self.root, JOURNAL_PATH)
+            )
+            if records:
+                self.on_contributions(records)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"Erreur lors de la lecture du journal des contributions: {e}")
+            return False
+        self.overlays += 1
+        return True
+
+    def check(self):
+        """Met à jour le lexique si une source a changé depuis le dernier passage."""
+        stamp = sources_stamp(self.root)
+        if stamp == self.stamp:
+            return False
+
+        # Journal seul agrandi : lecture des nouvelles lignes, sans reconstruction
+        journal_only = _without_journal(stamp) == _without_journal(self.stamp)
+        if (journal_only and self.on_contributions is not None and self._pending is None
+                and _journal_size(stamp) >= self.journal_offset):
+            self.stamp = stamp
+            return self.apply_journal()
+
+        # Autres changements : reconstruction quand les sources sont stables depuis `debounce` secondes
+        now = time.monotonic()
+        pending = _without_journal(stamp), _journal_size(stamp) < self.journal_offset
+        if pending != self._pending:
+            self._pending, self._pending_since = pending, now
+        if now - self._pending_since < self.debounce:
+            return False
+        self._pending = None
+        # Relevé pris avant la reconstruction : une modification pendant celle-ci sera vue au passage suivant
+        self.stamp = stamp
+        self.journal_offset = _journal_size(stamp)
+        return self.reload()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="lexicon-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            "reloads": self.reloads,
+            "overlays": self.overlays,
+            "failures": self.failures,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+        }
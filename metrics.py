@@ -0,0 +1,177 @@
+"""
+Mesures de l'application, exportées au format texte de Prometheus (route /metrics).
+
+Compteurs et histogrammes de durées tenus en mémoire, avec étiquettes, protégés par un verrou :
+une mesure coûte de l'ordre de la microseconde, négligeable devant une traduction ou un appel à
+Claude. Les statistiques déjà tenues par d'autres composants (cache des réponses, appels regroupés,
+disjoncteur, rechargement du lexique) ne sont pas dupliquées : elles sont lues au moment de
+l'export, via les fonctions enregistrées avec `register_stats`.
+
+Avec `json_logs`, chaque événement (tour de chat, appel à Claude...) est aussi écrit sur la sortie
+d'erreur sous forme d'une ligne JSON (journal "nene.metrics").
+"""
+import bisect
+import functools
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Bornes (s) des histogrammes : de 50 µs (recherche dans le lexique) à 60 s (échéance d'un appel à Claude)
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger("nene.metrics")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _number(value):
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class Metrics:
+    def __init__(self, namespace="nene", buckets=DEFAULT_BUCKETS, json_logs=False):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self.json_logs = json_logs
+        self.descriptions = {}
+        # Nom -> {étiquettes: valeur}
+        self.counters = {}
+        # Nom -> {étiquettes: [effectif de chaque intervalle (dernier : au-delà de la plus grande borne)..., somme]}
+        self.histograms = {}
+        self.stats_sources = []
+        self._lock = threading.Lock()
+        if json_logs and not logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+
+    def describe(self, name, description):
+        self.descriptions[name] = description
+
+    def inc(self, name, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        self._observe(name, tuple(sorted(labels.items())), seconds)
+
+    def _observe(self, name, key, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            values = series.get(key)
+            if values is None:
+                values = series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            values[index] += 1
+            values[-1] += seconds
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name, **labels):
+        """Décorateur : durée de chaque appel de la fonction (exceptions comprises)."""
+        key = tuple(sorted(labels.items()))
+
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self._observe(name, key, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def event(self, name, **fields):
+        """Événement écrit en une ligne JSON si les journaux JSON sont activés."""
+        if self.json_logs:
+            record = {"event": name, "time": round(time.time(), 3), **fields}
+            logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+    def register_stats(self, name, stats):
+        """`stats()` renvoie {clé: valeur} ; chaque valeur est exportée en jauge `<namespace>_<name>_<clé>`.
+
+        Une valeur dict devient une série par clé (étiquette "key"), une chaîne une série à 1
+        (étiquette "value") ; None est ignoré.
+        """
+        self.stats_sources.append((name, stats))
+
+    def _header(self, lines, name, metric_type):
+        description = self.descriptions.get(name)
+        full_name = f"{self.namespace}_{name}"
+        if description:
+            lines.append(f"# HELP {full_name} {description}")
+        lines.append(f"# TYPE {full_name} {metric_type}")
+        return full_name
+
+    def render(self):
+        """Toutes les mesures au format texte de Prometheus."""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self.counters.items()}
+            histograms = {name: {labels: list(values) for labels, values in series.items()}
+                          for name, series in self.histograms.items()}
+
+        lines = []
+        for name, series in sorted(counters.items()):
+            full_name = self._header(lines, name, "counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{full_name}{_labels_text(labels)} {_number(value)}")
+
+        bounds = self.buckets + (math.inf,)
+        for name, series in sorted(histograms.items()):
+            full_name = self._header(lines, name, "histogram")
+            for labels, values in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(bounds, values):
+                    cumulative += count
+                    lines.append(f"{full_name}_bucket{_labels_text(labels + (('le', _number(bound)),))} {cumulative}")
+                lines.append(f"{full_name}_sum{_labels_text(labels)} {_number(values[-1])}")
+                lines.append(f"{full_name}_count{_labels_text(labels)} {cumulative}")
+
+        for source, stats in self.stats_sources:
+            try:
+                values = stats()
+            except Exception as e:
+                logger.warning("statistiques %s indisponibles : %r", source, e)
+                continue
+            for key, value in values.items():
+                name = f"{source}_{key}"
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    full_name = self._header(lines, name, "gauge")
+                    lines.append(f"{full_name} {_number(value)}")
+                elif isinstance(value, dict):
+                    full_name = self._header(lines, name, "gauge")
+                    for label, item in sorted(value.items()):
+                        lines.append(f"{full_name}{_labels_text((('key', label),))} {_number(item)}")
+                elif isinstance(value, str):
+                    full_name = self._header(lines, name, "gauge")
+                    lines.append(f"{full_name}{_labels_text((('value', value),))} 1")
+        return "\n".join(lines) + "\n"
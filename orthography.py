@@ -0,0 +1,98 @@
+"""
+Normalisation orthographique pour la recherche dans le dictionnaire.
+
+Le dataset soussou utilise souvent d'anciennes substitutions ASCII ("I kEna", "dçxç", "fE¯En")
+alors que le clavier de l'interface produit "ɛ", "ɔ", "ɲ" et des tons combinants. Les deux
+écritures sont ramenées à une même forme de recherche, appliquée une fois aux clés du
+dictionnaire au chargement puis à chaque requête.
+
+En français, les accents distinguent des mots différents ("ou" / "où", "marche" / "marché") : la
+forme de recherche les garde, et l'index normalisé ne les ignore qu'en dernier recours.
+"""
+import re
+import unicodedata
+
+# Anciennes substitutions du dataset (à appliquer avant la décomposition : "ç" perdrait sa cédille)
+_LEGACY_SOUSSOU = str.maketrans({
+    "ç": "ɔ",
+    "Ç": "Ɔ",
+    "¯": "ɲ",
+})
+
+# Lettres soussou ramenées à leur forme latine de base
+_SOUSSOU_FOLDING = str.maketrans({
+    "ɛ": "e",
+    "ɔ": "o",
+    "ɲ": "ny",
+    "ŋ": "n",
+    "ɗ": "d",
+    "ƴ": "y",
+    "ǝ": "e",
+    "ʔ": "",
+})
+
+# Apostrophes typographiques
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'", "ʼ": "'"})
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+_SPACES = re.compile(r"\s+")
+
+
+def strip_marks(text):
+    """Supprime les accents et les tons (marques combinantes)."""
+    decomposed = unicodedata.normalize("NFD", text)
+    return unicodedata.normalize("NFC", "".join(ch for ch in decomposed if not unicodedata.combining(ch)))
+
+
+def _fold_spacing(text):
+    text = _PUNCTUATION.sub(" ", text.translate(_APOSTROPHES))
+    return _SPACES.sub(" ", text).strip(" '")
+
+
+def normalize_soussou(text):
+    """Forme de recherche d'un texte soussou ("HEri xi?" et "hɛ́ri xi" donnent "heri xi")."""
+    text = unicodedata.normalize("NFC", text or "").translate(_LEGACY_SOUSSOU)
+    text = strip_marks(text).casefold().translate(_SOUSSOU_FOLDING)
+    return _fold_spacing(text)
+
+
+def normalize_french(text):
+    """Forme de recherche d'un texte français ("École !" et "école" donnent "école", pas "ecole")."""
+    text = unicodedata.normalize("NFC", text or "").casefold()
+    return _fold_spacing(text)
+
+
+class NormalizedIndex:
+    """Dictionnaire dont les clés sont comparées sous leur forme normalisée.
+
+    Avec `fallback` (par exemple strip_marks), une clé absente est encore cherchée sous cette
+    seconde forme, plus permissive, appliquée à la forme normalisée.
+    """
+
+    def __init__(self, mapping, normalize, fallback=None):
+        self.normalize = normalize
+        self.fallback = fallback
+        self.entries = {}
+        self.fallback_entries = {}
+        for key, value in mapping.items():
+            self.add(key, value)
+
+    def add(self, key, value):
+        normalized = self.normalize(key)
+        if normalized:
+            self.entries[normalized] = value
+            if self.fallback is not None:
+                self.fallback_entries[self.fallback(normalized)] = value
+
+    def get(self, text, default=None):
+        normalized = self.normalize(text)
+        value = self.entries.get(normalized)
+        if value is None and self.fallback is not None:
+            value = self.fallback_entries.get(self.fallback(normalized))
+        return default if value is None else value
+
+    def __contains__(self, text):
+        return self.get(text) is not None
+
+    def __len__(self):
+        return len(self.entries)
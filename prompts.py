@@ -0,0 +1,85 @@
+"""
+Registre des system prompts envoyés à Claude.
+
+Les consignes fixes et le glossaire de référence sont assemblés une seule fois au démarrage, sous
+forme de blocs de texte prêts à l'emploi. Les blocs statiques portent un point d'arrêt de cache
+(`cache_control`) : l'API garde en cache le préfixe du prompt et ne facture à nouveau que la partie
+propre à chaque question (glossaire extrait de la question). Anthropic ne met en cache que les
+préfixes assez longs (environ 1024 jetons) ; en dessous, le point d'arrêt est simplement ignoré.
+"""
+from collections import Counter
+
+from translation_engine import tokenize
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+GUINEA_FRENCH = """Tu es un assistant spécialisé dans la culture, l'histoire et la géographie de la Guinée.
+Fournis des réponses précises, complètes et actualisées. Si tu ne connais pas la réponse exacte, indique-le clairement."""
+
+GUINEA_ENGLISH = """You are an assistant specialized in the culture, history, and geography of Guinea.
+Provide accurate, complete, and up-to-date answers. If you don't know the exact answer, clearly state it.
+Please respond in English."""
+
+# Consignes pour une réponse rédigée directement en soussou
+SOUSSOU = """Tu es un assistant spécialisé dans la culture, l'histoire et la géographie de la Guinée.
+Réponds directement en soussou (sosoxui), de façon précise et concise, sans traduction en français.
+Écris le soussou avec l'orthographe usuelle (ɛ, ɔ, ɲ). Si tu ne connais pas la réponse exacte, dis-le clairement en soussou."""
+
+
+def text_block(text, cached=False):
+    block = {"type": "text", "text": text}
+    if cached:
+        block["cache_control"] = CACHE_CONTROL
+    return block
+
+
+def frequent_words(soussou_to_french, size):
+    """Entrées d'un seul mot, des plus fréquentes aux plus rares dans les phrases soussou du dictionnaire."""
+    counts = Counter()
+    for soussou in soussou_to_french:
+        counts.update(token.lower() for token, _, _ in tokenize(soussou))
+    words = [soussou for soussou in soussou_to_french if len(tokenize(soussou)) == 1]
+    # Tri stable : à fréquence égale, l'ordre du dictionnaire est conservé
+    words.sort(key=lambda word: -counts[word.lower()])
+    return [(word, soussou_to_french[word]) for word in words[:size]]
+
+
+def reference_glossary(soussou_to_french, qa_pairs, size):
+    """Bloc de référence commun à toutes les questions : vocabulaire courant et questions-réponses du corpus."""
+    lines = ["Vocabulaire soussou - français courant :"]
+    lines += [f"- {soussou} : {francais}" for soussou, francais in frequent_words(soussou_to_french, size)]
+    if qa_pairs:
+        lines.append("")
+        lines.append("Exemples de réponses en soussou :")
+        for question, answers in qa_pairs.items():
+            lines.append(f"Question : {question}")
+            lines.append(f"Réponse : {answers['soussou']}")
+    return "\n".join(lines)
+
+
+def build_prompts(soussou_to_french, qa_pairs, glossary_size=300, caching=True):
+    """Blocs statiques de chaque system prompt, par nom."""
+    return {
+        "guinea_french": (text_block(GUINEA_FRENCH, caching),),
+        "guinea_english": (text_block(GUINEA_ENGLISH, caching),),
+        "soussou": (
+            text_block(SOUSSOU),
+            # Un seul point d'arrêt après le glossaire : il couvre aussi les consignes qui le précèdent
+            text_block(reference_glossary(soussou_to_french, qa_pairs, glossary_size), caching),
+        ),
+    }
+
+
+def system_blocks(prompts, name, context=None):
+    """System prompt `name`, suivi d'un bloc propre à la question (jamais mis en cache)."""
+    blocks = list(prompts[name])
+    if context:
+        blocks.append(text_block(context))
+    return blocks
+
+
+def system_text(system):
+    """Texte brut d'un system prompt (chaîne ou liste de blocs), pour les clés de cache locales."""
+    if system is None or isinstance(system, str):
+        return system
+    return "\n\n".join(block["text"] for block in system)
@@ -0,0 +1,93 @@
+"""
+Recherche des questions prédéfinies proches d'une question utilisateur.
+
+Chaque question de `qa_pairs` est représentée par un vecteur TF-IDF de n-grammes de caractères
+calculé sur sa forme normalisée (sans casse, sans accents ni tons, sans ponctuation). Une requête
+est comparée à toutes les questions en un seul produit matrice-vecteur (similarité cosinus).
+"""
+import math
+import re
+import unicodedata
+
+import numpy as np
+
+# Seuil de similarité par défaut au-dessus duquel une question est considérée comme identique
+# (en dessous, "Mali xunyi minden na?" serait confondu avec la question sur la Guinée)
+DEFAULT_THRESHOLD = 0.88
+
+# Lettres soussou souvent remplacées par leur équivalent latin au clavier
+_LETTER_FOLDING = str.maketrans({"ɛ": "e", "ɔ": "o", "Ɛ": "e", "Ɔ": "o"})
+
+
+def normalize_for_matching(text):
+    """Minuscules, sans diacritiques ni ponctuation, espaces réduits."""
+    text = unicodedata.normalize("NFD", (text or "").translate(_LETTER_FOLDING))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.casefold()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def char_ngrams(text, ngram_range=(2, 4)):
+    """N-grammes de caractères d'un texte normalisé, bordé d'espaces."""
+    padded = f" {text} "
+    low, high = ngram_range
+    return [padded[i:i + n] for n in range(low, high + 1) for i in range(len(padded) - n + 1)]
+
+
+class QAIndex:
+    def __init__(self, questions, ngram_range=(2, 4)):
+        self.questions = list(questions)
+        self.ngram_range = ngram_range
+        self.vocabulary = {}
+
+        documents = []
+        for question in self.questions:
+            counts = {}
+            for gram in char_ngrams(normalize_for_matching(question), ngram_range):
+                index = self.vocabulary.setdefault(gram, len(self.vocabulary))
+                counts[index] = counts.get(index, 0) + 1
+            documents.append(counts)
+
+        # Fréquence documentaire lissée, comme dans scikit-learn
+        document_frequency = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for counts in documents:
+            document_frequency[list(counts)] += 1
+        total = len(documents)
+        self.idf = np.log((1 + total) / (1 + document_frequency)) + 1
+
+        self.matrix = np.zeros((total, len(self.vocabulary)), dtype=np.float32)
+        for row, counts in enumerate(documents):
+            self.matrix[row, list(counts)] = list(counts.values())
+        self.matrix *= self.idf
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        self.matrix /= np.where(norms == 0, 1, norms)
+
+        # Correspondances exactes après normalisation, sans calcul vectoriel
+        self.exact = {normalize_for_matching(q): q for q in self.questions}
+
+    def vectorize(self, text):
+        indexes = [self.vocabulary[g] for g in char_ngrams(text, self.ngram_range) if g in self.vocabulary]
+        vector = np.bincount(indexes, minlength=len(self.vocabulary)).astype(np.float32) * self.idf
+        norm = math.sqrt(float(vector @ vector))
+        return vector / norm if norm else vector
+
+    def search(self, text, top_k=1):
+        """Renvoie les `top_k` questions les plus proches sous forme de (question, score)."""
+        if not self.questions:
+            return []
+        scores = self.matrix @ self.vectorize(normalize_for_matching(text))
+        best = np.argsort(-scores)[:top_k]
+        return [(self.questions[i], float(scores[i])) for i in best]
+
+    def match(self, text, threshold=DEFAULT_THRESHOLD):
+        """Question prédéfinie équivalente à `text`, ou None si aucune n'atteint le seuil."""
+        normalized = normalize_for_matching(text)
+        if not normalized:
+            return None
+        if normalized in self.exact:
+            return self.exact[normalized]
+        results = self.search(text)
+        if results and results[0][1] >= threshold:
+            return results[0][0]
+        return None
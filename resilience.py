@@ -0,0 +1,200 @@
+"""
+Appels à Claude résistants aux pannes passagères.
+
+Chaque appel a une échéance globale (toutes tentatives comprises). Les erreurs passagères
+(429, 529 « overloaded », 5xx, coupure réseau, délai dépassé) sont retentées avec un délai
+exponentiel aléatoire (« full jitter »), ou le délai `retry-after` indiqué par l'API s'il est plus long.
+Un disjoncteur compte les échecs consécutifs : au-delà d'un seuil il s'ouvre et les appels échouent
+immédiatement (CircuitOpenError) pour que l'application réponde localement ; après `reset_timeout`
+secondes, un seul appel d'essai est laissé passer pour savoir si l'API est rétablie.
+
+Une réponse en streaming n'est retentée que si aucun fragment n'a encore été transmis.
+"""
+import asyncio
+import random
+import time
+from collections import Counter
+
+import anthropic
+
+# Codes HTTP d'une erreur passagère côté API
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """L'API est considérée comme indisponible : l'appel n'a pas été tenté."""
+
+
+def is_retryable(error):
+    if isinstance(error, (asyncio.TimeoutError, anthropic.APIConnectionError)):
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUSES
+
+
+def retry_after(error):
+    """Délai (s) demandé par l'API via les en-têtes retry-after(-ms), ou None."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def backoff_delay(attempt, base_delay, max_delay):
+    """Délai aléatoire entre 0 et base_delay * 2^attempt, plafonné à max_delay."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.transitions = Counter()
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.transitions[f"{self.state}->{state}"] += 1
+            self.state = state
+
+    def allow(self):
+        """True si un appel peut être tenté maintenant."""
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.probing = False
+        self._set_state(CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def release(self):
+        """Fin d'un appel d'essai sans verdict sur l'état de l'API (erreur de la requête elle-même)."""
+        self.probing = False
+
+
+class ResilientCaller:
+    def __init__(self, breaker=None, max_attempts=3, deadline=60.0, base_delay=0.5, max_delay=8.0):
+        self.breaker = breaker or CircuitBreaker()
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = Counter()
+
+    def _check_breaker(self):
+        if not self.breaker.allow():
+            self.metrics["short_circuits"] += 1
+            raise CircuitOpenError("Claude est momentanément indisponible")
+        self.metrics["attempts"] += 1
+
+    def _record_error(self, error):
+        if isinstance(error, asyncio.TimeoutError):
+            self.metrics["timeouts"] += 1
+        if is_retryable(error):
+            self.metrics["failures"] += 1
+            self.breaker.record_failure()
+        else:
+            self.metrics["errors"] += 1
+            self.breaker.release()
+
+    def _retry_delay(self, error, attempt, deadline):
+        """Délai avant la tentative suivante, ou None s'il ne faut pas retenter."""
+        if not is_retryable(error) or attempt + 1 >= self.max_attempts:
+            return None
+        delay = max(backoff_delay(attempt, self.base_delay, self.max_delay), retry_after(error) or 0)
+        if time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    async def call(self, function):
+        """Résultat de `await function()`, avec échéance, nouvelles tentatives et disjoncteur."""
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self._check_breaker()
+            try:
+                result = await asyncio.wait_for(function(), max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                self._record_error(e)
+                delay = self._retry_delay(e, attempt, deadline)
+                if delay is None:
+                    raise
+                self.metrics["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Appel annulé : ni succès ni échec
+                self.breaker.release()
+                raise
+            self.metrics["successes"] += 1
+            self.breaker.record_success()
+            return result
+
+    async def stream(self, factory):
+        """Fragments de `factory()` (générateur asynchrone), avec échéance, nouvelles tentatives et disjoncteur."""
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self._check_breaker()
+            produced = False
+            chunks = factory()
+            try:
+                while True:
+                    remaining = max(0.0, deadline - time.monotonic())
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+                    except StopAsyncIteration:
+                        break
+                    produced = True
+                    yield chunk
+            except Exception as e:
+                self._record_error(e)
+                delay = None if produced else self._retry_delay(e, attempt, deadline)
+                if delay is None:
+                    raise
+            except BaseException:
+                # Lecture interrompue par l'appelant ou annulée : ni succès ni échec
+                self.breaker.release()
+                raise
+            else:
+                self.metrics["successes"] += 1
+                self.breaker.record_success()
+                return
+            finally:
+                # Libérer la connexion (et la place du sémaphore) avant d'attendre
+                await chunks.aclose()
+            self.metrics["retries"] += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def stats(self):
+        stats = dict(self.metrics)
+        stats["state"] = self.breaker.state
+        stats["transitions"] = dict(self.breaker.transitions)
+        return stats
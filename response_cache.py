@@ -0,0 +1,185 @@
+"""
+Cache des réponses de Claude.
+
+Une réponse est identifiée par la question normalisée, la langue de sortie, le system prompt
+et le modèle. Le cache garde les entrées récentes en mémoire (LRU) et peut aussi les écrire
+dans une base SQLite pour qu'elles survivent à un redémarrage. Chaque entrée expire après
+`ttl` secondes.
+
+Depuis la boucle d'événements, utiliser `aget` / `aset` : les requêtes SQLite (et le commit, qui
+écrit sur disque) passent alors dans un thread, sans bloquer les autres conversations. Les entrées
+expirées de la base sont purgées régulièrement, et sa taille peut être bornée (`max_disk_entries`).
+"""
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# Ponctuation et espaces ignorés au début et à la fin d'une question
+_EDGE_PUNCTUATION = " \t\n\r.,;:!?¿¡…\"'«»"
+
+
+def normalize_question(text):
+    """Forme canonique d'une question : NFC, sans casse, espaces réduits, sans ponctuation finale."""
+    text = unicodedata.normalize("NFC", text or "").casefold()
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(_EDGE_PUNCTUATION)
+
+
+def make_key(question, language, system_prompt, model, context=None):
+    """Clé de cache pour une requête Claude (`context` : tours précédents de la conversation)."""
+    parts = [normalize_question(question), language or "", system_prompt or "", model or ""]
+    if context:
+        parts.append(context)
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, max_entries=1024, ttl=24 * 3600, db_path=None, max_disk_entries=0, purge_interval=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Nombre maximal d'entrées de la base (0 : seulement la purge des entrées expirées)
+        self.max_disk_entries = max_disk_entries
+        self.purge_interval = purge_interval
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        # Verrou propre à la base : une requête SQLite ne bloque pas les lectures en mémoire
+        self._db_lock = threading.Lock()
+        self._next_purge = 0.0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.purged = 0
+
+        # Niveau disque optionnel
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+            self._db.commit()
+            with self._db_lock:
+                self._purge(time.time())
+
+    def _memory_get(self, key, now):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created = entry
+                if now - created < self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+            if self._db is None:
+                self.misses += 1
+            return None
+
+    def _disk_get(self, key, now):
+        with self._db_lock:
+            row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] >= self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            value, created = row
+            self._remember(key, value, created)
+            self.disk_hits += 1
+            return value
+
+    def _memory_set(self, key, value, created):
+        with self._lock:
+            self._remember(key, value, created)
+            self.stores += 1
+
+    def _disk_set(self, key, value, created):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)",
+                (key, value, created),
+            )
+            self._db.commit()
+            if created >= self._next_purge:
+                self._purge(created)
+
+    def _purge(self, now):
+        """Supprime les entrées expirées de la base, puis les plus anciennes au-delà de `max_disk_entries`."""
+        deleted = self._db.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,)).rowcount
+        if self.max_disk_entries:
+            deleted += self._db.execute(
+                "DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses ORDER BY created DESC LIMIT ?)",
+                (self.max_disk_entries,),
+            ).rowcount
+        self._db.commit()
+        self.purged += deleted
+        self._next_purge = now + self.purge_interval
+
+    def get(self, key):
+        """Renvoie la réponse en cache ou None (bloquant si le niveau disque est actif : voir aget)."""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is None and self._db is not None:
+            value = self._disk_get(key, now)
+        return value
+
+    async def aget(self, key):
+        """Comme `get`, la requête SQLite éventuelle s'exécutant dans un thread."""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._disk_get, key, now)
+        return value
+
+    def set(self, key, value):
+        """Enregistre une réponse dans le cache (bloquant si le niveau disque est actif : voir aset)."""
+        created = time.time()
+        self._memory_set(key, value, created)
+        if self._db is not None:
+            self._disk_set(key, value, created)
+
+    async def aset(self, key, value):
+        """Comme `set`, l'écriture SQLite éventuelle s'exécutant dans un thread."""
+        created = time.time()
+        self._memory_set(key, value, created)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, value, created)
+
+    def _remember(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        """Compteurs de succès et d'échecs du cache."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "purged": self.purged,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
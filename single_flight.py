@@ -0,0 +1,97 @@
+"""
+Regroupement des appels identiques en cours (single-flight).
+
+Quand plusieurs utilisateurs posent la même question au même moment, seul le premier appel
+(le « meneur ») part vers Claude ; les suivants lisent les mêmes fragments de réponse au fur et
+à mesure qu'ils arrivent. La production tourne dans sa propre tâche : si le client du meneur se
+déconnecte, les autres reçoivent quand même la réponse complète.
+"""
+import asyncio
+
+
+class _Flight:
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.event = asyncio.Event()
+        self.task = None
+        self.info = {}
+
+    def notify(self):
+        # Réveiller les lecteurs en attente puis préparer l'événement suivant
+        self.event.set()
+        self.event = asyncio.Event()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def in_flight(self):
+        return len(self._flights)
+
+    def _start(self, key, factory):
+        flight = _Flight()
+
+        async def produce():
+            try:
+                async for chunk in factory():
+                    flight.chunks.append(chunk)
+                    flight.notify()
+            except Exception as e:
+                flight.error = e
+            finally:
+                flight.done = True
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.notify()
+
+        self._flights[key] = flight
+        flight.task = asyncio.ensure_future(produce())
+        return flight
+
+    async def stream(self, key, factory, info=None):
+        """Fragments produits par `factory()` (générateur asynchrone), partagés entre appels identiques.
+
+        `info` : dictionnaire de l'appelant. Celui du meneur est partagé avec l'appel (sa `factory` peut
+        y noter l'usage, par exemple) ; à la fin de l'appel, les suivants en reçoivent une copie,
+        avec `shared=True`.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            self.leaders += 1
+            flight = self._start(key, factory)
+            if info is not None:
+                flight.info = info
+        else:
+            self.followers += 1
+
+        index = 0
+        while True:
+            event = flight.event
+            if index < len(flight.chunks):
+                chunk = flight.chunks[index]
+                index += 1
+                yield chunk
+                continue
+            if flight.done:
+                if info is not None and info is not flight.info:
+                    info.update(flight.info, shared=True)
+                if flight.error is not None:
+                    raise flight.error
+                return
+            await event.wait()
+
+    async def run(self, key, function, info=None):
+        """Résultat de `await function()`, partagé entre appels identiques (`info` : voir stream)."""
+        async def single_result():
+            yield await function()
+
+        chunks = [chunk async for chunk in self.stream(key, single_result, info)]
+        return "".join(chunks)
+
+    def stats(self):
+        return {"leaders": self.leaders, "followers": self.followers, "in_flight": self.in_flight()}
@@ -0,0 +1,133 @@
+"""
+Traduction par segmentation gloutonne au plus long (longest match) sur un trie de mots.
+
+Toutes les entrées du dictionnaire sont découpées en jetons (mots et ponctuation) et insérées
+une seule fois dans un trie. Une phrase est ensuite parcourue de gauche à droite : à chaque
+position on suit le trie aussi loin que possible et on retient la plus longue entrée connue,
+sinon le jeton est recopié tel quel. Les expressions de plusieurs mots sont ainsi trouvées
+à l'intérieur des phrases plus longues, en un seul passage.
+
+Un mot inconnu peut enfin être rapproché du mot du dictionnaire le plus proche (fuzzy_lookup),
+sauf s'il commence par une majuscule : un nom propre ("Guinée", "Kindia") ne doit pas devenir une
+entrée voisine sans rapport ("Guinè", « épouse »).
+"""
+import re
+
+from fuzzy_lookup import FuzzyIndex
+
+# Un mot (avec apostrophes et traits d'union internes) ou un signe de ponctuation isolé.
+# Les marques combinantes (tons) et les substituts "¯" / "ʔ" du dataset font partie du mot.
+_WORD_CHAR = r"(?:[^\W_]|[\u0300-\u036f¯ʔ])"
+TOKEN_PATTERN = re.compile(rf"{_WORD_CHAR}+(?:['’\-]{_WORD_CHAR}+)*|\S")
+
+# Clé réservée du trie pour la traduction d'une entrée complète (aucun jeton n'est vide)
+_VALUE = ""
+
+
+def tokenize(text):
+    """Liste de (jeton, début, fin) d'un texte."""
+    return [(m.group(), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(text)]
+
+
+def _is_punctuation(token):
+    return re.match(_WORD_CHAR, token) is None
+
+
+class PhraseTranslator:
+    def __init__(self, mapping=None, normalize=None, fuzzy_distance=0):
+        self.root = {}
+        self.max_length = 0
+        self.entries = 0
+        # Forme de comparaison des mots (orthographe, casse) ; la ponctuation reste telle quelle
+        self.normalize = normalize
+        # Index approximatif des entrées d'un seul mot (désactivé si fuzzy_distance vaut 0)
+        self.fuzzy = FuzzyIndex(max_distance=fuzzy_distance) if fuzzy_distance else None
+        for source, target in (mapping or {}).items():
+            self.add(source, target)
+
+    def key(self, token):
+        if self.normalize is None:
+            return token
+        return self.normalize(token) or token
+
+    def _insert(self, keys, target, replace=True):
+        node = self.root
+        for key in keys:
+            node = node.setdefault(key, {})
+        if replace or _VALUE not in node:
+            node[_VALUE] = target
+        self.max_length = max(self.max_length, len(keys))
+        if self.fuzzy is not None and len(keys) == 1 and not _is_punctuation(keys[0]):
+            self.fuzzy.add(keys[0])
+
+    def add(self, source, target):
+        """Ajoute (ou remplace) une entrée du dictionnaire."""
+        keys = [self.key(token) for token, _, _ in tokenize(source)]
+        if not keys:
+            return
+        self.entries += 1
+        self._insert(keys, target)
+
+        # "Tana mu xi?" est aussi trouvé sans sa ponctuation finale, sans écraser une vraie entrée ;
+        # la traduction perd alors la sienne, c'est la ponctuation du texte qui sera recopiée
+        while keys and _is_punctuation(keys[-1]):
+            keys = keys[:-1]
+            if keys:
+                self._insert(keys, target.rstrip(" .!?…"), replace=False)
+
+    def longest_match(self, keys, start):
+        """(fin, traduction) de la plus longue entrée commençant à `start`, ou (start, None)."""
+        node = self.root
+        best_end, best_value = start, None
+        for position in range(start, min(len(keys), start + self.max_length)):
+            node = node.get(keys[position])
+            if node is None:
+                break
+            if _VALUE in node:
+                best_end, best_value = position + 1, node[_VALUE]
+        return best_end, best_value
+
+    def closest_word(self, token, key):
+        """Traduction du mot du dictionnaire le plus proche de `token` (forme de recherche `key`), ou None."""
+        if self.fuzzy is None or _is_punctuation(key) or token[:1].isupper():
+            return None
+        near = self.fuzzy.lookup(key)
+        return self.root[near][_VALUE] if near is not None else None
+
+    def segment(self, text, fuzzy=True):
+        """Découpe `text` en segments (source, traduction ou None), avec l'espace qui les précède.
+
+        Avec `fuzzy=False`, seules les correspondances exactes du dictionnaire sont traduites.
+        """
+        tokens = tokenize(text)
+        keys = [self.key(token) for token, _, _ in tokens]
+        segments = []
+        position = 0
+        previous_end = 0
+        while position < len(tokens):
+            end, value = self.longest_match(keys, position)
+            if value is None:
+                end = position + 1
+                value = self.closest_word(tokens[position][0], keys[position]) if fuzzy else None
+            start_offset = tokens[position][1]
+            end_offset = tokens[end - 1][2]
+            segments.append((text[previous_end:start_offset], text[start_offset:end_offset], value))
+            previous_end = end_offset
+            position = end
+        return segments
+
+    def translate(self, text):
+        """Traduit `text` ; les passages inconnus sont recopiés tels quels."""
+        pieces = []
+        for spacing, source, value in self.segment(text):
+            if pieces:
+                pieces.append(" " if spacing else "")
+            pieces.append(source if value is None else value)
+        return "".join(pieces)
+
+    def coverage(self, text):
+        """Part des jetons de `text` couverts par une entrée du dictionnaire."""
+        segments = self.segment(text)
+        total = sum(len(tokenize(source)) for _, source, _ in segments)
+        known = sum(len(tokenize(source)) for _, source, value in segments if value is not None)
+        return known / total if total else 0.0
@@ -0,0 +1,65 @@
+"""
+Correspondances un-à-plusieurs du lexique.
+
+Un même texte peut avoir plusieurs traductions (sources différentes, variantes de casse ou
+d'orthographe). Au lieu d'un dictionnaire où la dernière traduction lue écrase les autres, chaque
+paire garde son rang :
+  1. la priorité de sa source (contributions > mots ajoutés > dataset > dictionnaire de référence) ;
+  2. le nombre de sources où la paire apparaît ;
+  3. l'ordre de lecture (la plus récente l'emporte à égalité).
+La meilleure traduction est ainsi choisie de façon déterministe, les autres restent disponibles.
+
+Les textes sont internés : une chaîne présente dans plusieurs entrées, ou des deux côtés du
+lexique, n'est stockée qu'une fois en mémoire (et dans l'instantané).
+"""
+import sys
+
+
+def _rank(candidate):
+    _, priority, count, order = candidate
+    return priority, count, order
+
+
+class TranslationTable:
+    def __init__(self, pairs=()):
+        """`pairs` : (source, traduction, priorité, occurrences)."""
+        # Source -> candidats (traduction, priorité, occurrences, ordre), du meilleur au moins bon
+        self.candidates = {}
+        self._order = 0
+        for source, target, priority, count in pairs:
+            self.add(source, target, priority, count)
+
+    def add(self, source, target, priority=0, count=1, merge=True):
+        """Ajoute une paire ; déjà présente, elle cumule ses occurrences et garde la meilleure priorité,
+        ou, avec `merge=False`, est remplacée (comme une contribution relue, voir lexicon.py)."""
+        source, target = sys.intern(source), sys.intern(target)
+        self._order += 1
+        candidates = {candidate[0]: candidate for candidate in self.candidates.get(source, ())}
+        if merge and target in candidates:
+            _, previous_priority, previous_count, _ = candidates[target]
+            priority, count = max(priority, previous_priority), count + previous_count
+        candidates[target] = (target, priority, count, self._order)
+        self.candidates[source] = tuple(sorted(candidates.values(), key=_rank, reverse=True))
+
+    def best(self, source, default=None):
+        candidates = self.candidates.get(source)
+        return candidates[0][0] if candidates else default
+
+    def translations(self, source):
+        """Toutes les traductions connues de `source`, de la meilleure à la moins bonne."""
+        return [candidate[0] for candidate in self.candidates.get(source, ())]
+
+    def best_mapping(self):
+        """{source: meilleure traduction}, du rang le plus faible au plus élevé.
+
+        Un index qui ramène plusieurs sources à la même clé normalisée ("Fan" et "fan") et garde
+        la dernière valeur insérée retient ainsi la traduction la mieux classée.
+        """
+        ranked = sorted(self.candidates.items(), key=lambda item: _rank(item[1][0]))
+        return {source: candidates[0][0] for source, candidates in ranked}
+
+    def __contains__(self, source):
+        return source in self.candidates
+
+    def __len__(self):
+        return len(self.candidates)